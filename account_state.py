@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import Counter
+
+# Order statuses that are still working (see alpaca.trading.enums.OrderStatus)
+OPEN_ORDER_STATUSES = {
+    'new', 'accepted', 'pending_new', 'accepted_for_bidding', 'partially_filled',
+    'held', 'pending_cancel', 'pending_replace', 'calculated',
+}
+# Trade update events that change positions
+FILL_EVENTS = {'fill', 'partial_fill'}
+
+
+def _value(field):
+    """Plain string of an alpaca-py enum (or an already plain value)"""
+    return getattr(field, 'value', field)
+
+
+class AccountState:
+    """Alpaca account, positions and open orders, cached between trade updates.
+
+    While a trade_updates stream is running, reads are served from the cache:
+    order events patch the open orders in place and mark the account stale,
+    fills also mark the positions stale, and anything stale (or older than
+    `max_age`, which keeps position marks roughly current) is fetched again
+    on the next read. Without a running stream every read goes to REST.
+    """
+
+    ITEMS = ('account', 'positions', 'orders')
+
+    def __init__(self, trading_client, max_age=60):
+        self.trading_client = trading_client
+        self.max_age = max_age
+        self.stream = None
+        self.fetches = Counter()
+        self.events = 0
+        self._entries = {}  # name -> (value, generation, fetched_at)
+        self._generations = dict.fromkeys(self.ITEMS, 0)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def streaming(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, stream):
+        """Follow an alpaca-py TradingStream (or anything with its interface) on a background thread"""
+        self.stream = stream
+        stream.subscribe_trade_updates(self._on_trade_update)
+        self._thread = threading.Thread(target=stream.run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self.stream is not None:
+            self.stream.stop()
+        self.invalidate()
+
+    def invalidate(self, *names):
+        """Mark items (all by default) stale, e.g. right after submitting or cancelling orders"""
+        with self._lock:
+            for name in names or self.ITEMS:
+                self._generations[name] += 1
+
+    def _get(self, name, fetch):
+        with self._lock:
+            generation = self._generations[name]
+            entry = self._entries.get(name)
+            if (self.streaming and entry is not None and entry[1] == generation
+                    and time.monotonic() - entry[2] < self.max_age):
+                return entry[0]
+        value = fetch()
+        self.fetches[name] += 1
+        with self._lock:
+            # An update that arrived during the fetch has bumped the generation, so it is fetched again
+            self._entries[name] = (value, generation, time.monotonic())
+        return value
+
+    def account(self):
+        return self._get('account', self.trading_client.get_account)
+
+    def positions(self):
+        return list(self._get('positions', self.trading_client.get_all_positions))
+
+    def open_orders(self):
+        orders = self._get('orders', lambda: {
+            str(order.id): order for order in self.trading_client.get_orders()
+            if _value(order.status) in OPEN_ORDER_STATUSES
+        })
+        return list(orders.values())
+
+    def apply(self, update):
+        """Apply one trade update (alpaca.trading.models.TradeUpdate)"""
+        event = _value(update.event)
+        order = update.order
+        with self._lock:
+            self.events += 1
+            entry = self._entries.get('orders')
+            current = entry is not None and entry[1] == self._generations['orders']
+            for name in ('orders', 'account') + (('positions',) if event in FILL_EVENTS else ()):
+                self._generations[name] += 1
+            if current:
+                # The event carries the whole order, so patch the open orders instead of refetching
+                orders = dict(entry[0])
+                if _value(order.status) in OPEN_ORDER_STATUSES:
+                    orders[str(order.id)] = order
+                else:
+                    orders.pop(str(order.id), None)
+                self._entries['orders'] = (orders, self._generations['orders'], entry[2])
+
+    async def _on_trade_update(self, update):
+        self.apply(update)
@@ -1,6 +1,6 @@
 from alpaca.data.historical import CryptoHistoricalDataClient
 from alpaca.data.requests import CryptoBarsRequest, CryptoLatestQuoteRequest
-from alpaca.data.timeframe import TimeFrame
+from alpaca.data.timeframe import TimeFrame, TimeFrameUnit
 from alpaca.trading.client import TradingClient
 from alpaca.trading.requests import (
     MarketOrderRequest,
@@ -13,6 +13,11 @@ import pandas as pd
 from datetime import datetime, timedelta, timezone
 from config import ALPACA_API_KEY, ALPACA_API_SECRET, SYMBOL, INTERVAL, USE_PAPER
 import time
+from bar_resampler import RESAMPLED_INTERVALS, resample_frame
+from kline_store import interval_ms
+from account_state import AccountState
+from quote_cache import QuoteCache
+from watchlist import Watchlist, split_by_symbol, alpaca_bars_frame
 
 class AlpacaClient:
     def __init__(self):
@@ -33,10 +38,39 @@ class AlpacaClient:
             '1h': TimeFrame.Hour,
             '1d': TimeFrame.Day
         }
+        # Other intervals are resampled locally from 1m bars
+        self.resampled_intervals = [interval for interval in RESAMPLED_INTERVALS if interval not in self.timeframe_map]
+        # Account, positions and open orders; cached while the trade update stream runs
+        self.account_state = AccountState(self.trading_client)
+        # Best bid/ask per symbol; current while the quote stream runs
+        self.quote_cache = QuoteCache()
+
+    def start_account_stream(self):
+        """Keep account data current from Alpaca's trade_updates stream instead of polling it"""
+        from alpaca.trading.stream import TradingStream
+        stream = TradingStream(ALPACA_API_KEY, ALPACA_API_SECRET, paper=USE_PAPER)
+        return self.account_state.start(stream)
+
+    def stop_account_stream(self):
+        self.account_state.stop()
+
+    def start_quote_stream(self, symbols=None):
+        """Keep the best bid/ask current from Alpaca's crypto quote stream instead of requesting it"""
+        from alpaca.data.live.crypto import CryptoDataStream
+        stream = CryptoDataStream(ALPACA_API_KEY, ALPACA_API_SECRET, feed=CryptoFeed.US)
+        return self.quote_cache.start(stream, symbols or [SYMBOL])
+
+    def stop_quote_stream(self):
+        self.quote_cache.stop()
         
     def get_current_price(self):
         """Get the current market price from latest quote"""
         try:
+            # Streamed quotes are a memory read; fall back to REST when missing or stale
+            current_price = self.quote_cache.mid(SYMBOL)
+            if current_price is not None:
+                return current_price
+
             # Get latest quote (keep the / for crypto quotes)
             request = CryptoLatestQuoteRequest(
                 symbol_or_symbols=SYMBOL,  # Keep BTC/USD format
@@ -46,6 +80,7 @@ class AlpacaClient:
             
             if quotes and SYMBOL in quotes:
                 quote = quotes[SYMBOL]
+                self.quote_cache.apply(quote)
                 # Use mid price (average of bid and ask) for current price
                 current_price = (float(quote.ask_price) + float(quote.bid_price)) / 2
                 print(f"Latest price from Alpaca: ${current_price:,.2f}")
@@ -70,6 +105,7 @@ class AlpacaClient:
             )
             
             order = self.trading_client.submit_order(order_data)
+            self.account_state.invalidate()
             print(f"\nPlaced {'PAPER' if USE_PAPER else 'LIVE'} market order:")
             print(f"Side: {side}, Quantity: {quantity} {SYMBOL}")
             return order
@@ -90,6 +126,7 @@ class AlpacaClient:
             )
             
             order = self.trading_client.submit_order(order_data)
+            self.account_state.invalidate()
             print(f"\nPlaced {'PAPER' if USE_PAPER else 'LIVE'} limit order:")
             print(f"Side: {side}, Quantity: {quantity}, Limit Price: {limit_price}")
             return order
@@ -110,6 +147,7 @@ class AlpacaClient:
             )
             
             order = self.trading_client.submit_order(order_data)
+            self.account_state.invalidate()
             print(f"\nPlaced {'PAPER' if USE_PAPER else 'LIVE'} stop order:")
             print(f"Side: {side}, Quantity: {quantity}, Stop Price: {stop_price}")
             return order
@@ -150,6 +188,7 @@ class AlpacaClient:
             )
             
             order = self.trading_client.submit_order(order_data)
+            self.account_state.invalidate()
             
             print(f"\nBracket order submitted:")
             print(f"Entry Order ID: {order.id}")
@@ -166,7 +205,7 @@ class AlpacaClient:
         """Get the current position for the symbol"""
         try:
             # Get all positions
-            positions = self.trading_client.get_all_positions()
+            positions = self.account_state.positions()
             
             # Convert BTC/USD to BTCUSD for position lookup
             trading_symbol = SYMBOL.replace('/', '')
@@ -207,8 +246,8 @@ class AlpacaClient:
     def get_account_balance(self):
         """Get account balance and positions"""
         try:
-            account = self.trading_client.get_account()
-            positions = self.trading_client.get_all_positions()
+            account = self.account_state.account()
+            positions = self.account_state.positions()
             
             # Format balances
             balances = {
@@ -234,14 +273,14 @@ class AlpacaClient:
     def get_open_orders(self):
         """Get all open orders"""
         try:
-            # Get all orders
-            orders = self.trading_client.get_orders()
+            # Get all working orders
+            orders = self.account_state.open_orders()
             
-            # Filter for our symbol and open status
+            # Filter for our symbol
             trading_symbol = SYMBOL.replace('/', '')
             open_orders = [
                 order for order in orders 
-                if order.symbol == trading_symbol and order.status == 'open'
+                if order.symbol == trading_symbol
             ]
             
             return [{
@@ -263,7 +302,7 @@ class AlpacaClient:
     def get_account(self):
         """Get account information"""
         try:
-            return self.trading_client.get_account()
+            return self.account_state.account()
         except Exception as e:
             print(f"Error getting account info: {str(e)}")
             return None
@@ -272,6 +311,7 @@ class AlpacaClient:
         """Cancel all open orders"""
         try:
             cancelled = self.trading_client.cancel_orders()
+            self.account_state.invalidate()
             print(f"Cancelled {len(cancelled)} orders")
             return cancelled
         except Exception as e:
@@ -315,6 +355,7 @@ class AlpacaClient:
             
             # Submit the order
             order = self.trading_client.submit_order(order_data)
+            self.account_state.invalidate()
             print(f"\nPlaced {'PAPER' if USE_PAPER else 'LIVE'} market order:")
             print(f"Side: {side}, Quantity: {quantity}")
             
@@ -338,7 +379,7 @@ class AlpacaClient:
         """Check if we should exit based on price levels"""
         try:
             # Get all positions
-            positions = self.trading_client.get_all_positions()
+            positions = self.account_state.positions()
             position = None
             
             # Find our position
@@ -358,6 +399,7 @@ class AlpacaClient:
                 print(f"\nStop loss triggered at ${current_price:,.2f}")
                 print(f"P&L: ${float(position.unrealized_pl):,.2f} ({float(position.unrealized_plpc) * 100:.2f}%)")
                 self.trading_client.close_position(SYMBOL.replace('/', ''))
+                self.account_state.invalidate()
                 return True
                 
             # Check take profit
@@ -365,6 +407,7 @@ class AlpacaClient:
                 print(f"\nTake profit triggered at ${current_price:,.2f}")
                 print(f"P&L: ${float(position.unrealized_pl):,.2f} ({float(position.unrealized_plpc) * 100:.2f}%)")
                 self.trading_client.close_position(SYMBOL.replace('/', ''))
+                self.account_state.invalidate()
                 return True
                 
             return None
@@ -378,9 +421,16 @@ class AlpacaClient:
         try:
             # Convert our interval to Alpaca's TimeFrame
             timeframe = self.timeframe_map.get(INTERVAL)
+            minutes_per_bar = 1
+            bars_wanted = limit
             if not timeframe:
-                print(f"Unsupported interval: {INTERVAL}")
-                return None
+                if INTERVAL not in self.resampled_intervals:
+                    print(f"Unsupported interval: {INTERVAL}")
+                    return None
+                # Fetch 1m bars and build the interval from them (plus one bar for a partial leading bucket)
+                timeframe = TimeFrame.Minute
+                minutes_per_bar = interval_ms(INTERVAL) // 60_000
+                limit = (limit + 1) * minutes_per_bar
 
             # Convert BTC/USD to BTCUSD for Alpaca
             trading_symbol = SYMBOL.replace('/', '')
@@ -428,6 +478,9 @@ class AlpacaClient:
             
             # Set time as index
             df = df.set_index('time')
+
+            if minutes_per_bar > 1:
+                df = resample_frame(df, INTERVAL).tail(bars_wanted)
             
             # Print first and last bars for debugging
             print(f"\nRetrieved {len(df)} bars")
@@ -445,4 +498,43 @@ class AlpacaClient:
             
         except Exception as e:
             print(f"Error getting historical bars: {str(e)}")
-            return None 
\ No newline at end of file
+            return None
+
+    def get_historical_bars_batch(self, symbols, interval=INTERVAL, limit=100):
+        """Get the last `limit` bars of many symbols in one paginated request.
+
+        Returns {symbol: bar frame} for the symbols with bars, each frame a
+        slice of the batch result. Bars of any interval are requested natively
+        (e.g. TimeFrame(4, Hour)), so each symbol costs about `limit` bars and
+        up to 10,000 bars come back per page: 50 symbols x 100 bars is one
+        request. Symbols without trades in the window (Alpaca skips empty
+        bars) may get fewer than `limit` bars.
+        """
+        try:
+            units = {'m': TimeFrameUnit.Minute, 'h': TimeFrameUnit.Hour, 'd': TimeFrameUnit.Day}
+            if interval[-1] not in units:
+                print(f"Unsupported interval: {interval}")
+                return None
+            timeframe = TimeFrame(int(interval[:-1]), units[interval[-1]])
+
+            # A start time instead of a limit: Alpaca's limit counts bars across all symbols
+            start = datetime.now(timezone.utc) - timedelta(milliseconds=(limit + 1) * interval_ms(interval))
+            request = CryptoBarsRequest(
+                symbol_or_symbols=list(symbols),
+                timeframe=timeframe,
+                start=start,
+                feed=CryptoFeed.US
+            )
+            df = self.data_client.get_crypto_bars(request).df
+            return {
+                symbol: alpaca_bars_frame(frame, limit=limit)
+                for symbol, frame in split_by_symbol(df).items()
+            }
+
+        except Exception as e:
+            print(f"Error getting historical bars: {str(e)}")
+            return None
+
+    def watchlist(self, symbols, interval=INTERVAL, limit=100, columns=None):
+        """Indicator frames for many symbols, refreshed through get_historical_bars_batch"""
+        return Watchlist(self.get_historical_bars_batch, symbols, interval, limit, columns)
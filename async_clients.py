@@ -0,0 +1,167 @@
+import asyncio
+import functools
+import aiohttp
+from binance import AsyncClient
+from config import SYMBOL, INTERVAL
+from binance_client import BinanceClient
+from notification_service import NotificationService
+from rate_limiter import LimitedClient
+
+
+class AsyncBinanceClient:
+    """asyncio counterpart of BinanceClient.
+
+    Requests go through python-binance's AsyncClient, which keeps an aiohttp
+    session (and its keep-alive connection pool) open for the client's
+    lifetime. The kline store, live streams and indicator cache of the
+    wrapped BinanceClient are shared, so both clients see the same data.
+    """
+
+    def __init__(self, binance_client, client, futures_client):
+        self.sync = binance_client
+        self.client = client
+        self.futures_client = futures_client
+
+    @classmethod
+    async def create(cls, binance_client=None):
+        # Same weight budgets as the sync clients
+        client = LimitedClient(await AsyncClient.create(tld='us'), 'spot')  # Spot client
+        futures_client = LimitedClient(await AsyncClient.create(tld='com'), 'futures')  # Futures client
+        return cls(binance_client or BinanceClient(), client, futures_client)
+
+    async def close(self):
+        await self.client.close_connection()
+        await self.futures_client.close_connection()
+
+    async def _fetch_klines(self, fetch, symbol, interval, limit, market):
+        while True:
+            # Planning reads the store and writing to it is file I/O: both stay off the event loop
+            klines, request = await asyncio.to_thread(self.sync._plan_klines, symbol, interval, limit, market)
+            if request is None:
+                return klines
+            klines = await fetch(**request)
+            klines = await asyncio.to_thread(self.sync._store_klines, klines, symbol, interval, limit, market)
+            if klines is not None:
+                return klines
+
+    async def get_klines(self, limit=100, symbol=None):
+        """Raw spot klines, as returned by the REST API"""
+        try:
+            if symbol is None:
+                symbol = SYMBOL.replace('/', '') + 'T'
+            return await self._fetch_klines(self.client.get_klines, symbol, INTERVAL, limit, 'spot')
+        except Exception as e:
+            print(f"Error getting klines: {e}")
+            return None
+
+    async def get_current_price(self):
+        """Get the current market price"""
+        try:
+            symbol = SYMBOL.replace('/', '') + 'T'
+            price = self.sync._stream_price('spot', symbol)
+            if price is not None:
+                return price
+            ticker = await self.client.get_symbol_ticker(symbol=symbol)
+            return float(ticker['price']) if ticker else None
+        except Exception as e:
+            print(f"Error getting current price: {e}")
+            return None
+
+    async def get_futures_open_interest(self, symbol=None):
+        """Get open interest from Binance USDT-margined Futures"""
+        try:
+            if symbol is None:
+                symbol = SYMBOL.replace('/', '') + 'T'
+            return await self.futures_client.futures_open_interest(symbol=symbol)
+        except Exception as e:
+            print(f"Error fetching futures open interest: {e}")
+            return None
+
+    async def get_futures_current_price(self, symbol=None):
+        """Get the current market price from Binance Futures"""
+        try:
+            if symbol is None:
+                symbol = SYMBOL.replace('/', '') + 'T'
+            price = self.sync._stream_price('futures', symbol)
+            if price is None:
+                ticker = await self.futures_client.futures_symbol_ticker(symbol=symbol)
+                price = float(ticker['price']) if ticker else None
+            return price
+        except Exception as e:
+            print(f"Error fetching futures current price: {e}")
+            return None
+
+    async def get_futures_klines(self, interval=None, limit=100, symbol=None):
+        """Get historical klines/candlestick data from Binance Futures"""
+        try:
+            if symbol is None:
+                symbol = SYMBOL.replace('/', '') + 'T'
+            if interval is None:
+                interval = INTERVAL
+            klines = await self._fetch_klines(self.futures_client.futures_klines, symbol, interval, limit, 'futures')
+            print(f"Fetched {len(klines)} futures klines for {symbol} interval {interval}")
+            return klines
+        except Exception as e:
+            print(f"Error fetching futures klines: {e}")
+            return None
+
+
+class AsyncAlpacaClient:
+    """Awaitable wrapper around AlpacaClient.
+
+    alpaca-py has no asyncio API, but its clients reuse one requests.Session
+    (a pooled keep-alive connection), so each call runs on a worker thread
+    and several calls can be awaited together with asyncio.gather.
+    """
+
+    def __init__(self, alpaca_client=None):
+        if alpaca_client is None:
+            from alpaca_client import AlpacaClient
+            alpaca_client = AlpacaClient()
+        self.sync = alpaca_client
+
+    def __getattr__(self, name):
+        method = getattr(self.sync, name)
+        if not callable(method):
+            return method
+
+        @functools.wraps(method)
+        async def call(*args, **kwargs):
+            return await asyncio.to_thread(method, *args, **kwargs)
+        return call
+
+
+class AsyncNotificationService(NotificationService):
+    """NotificationService that posts to Pushover over a shared aiohttp session.
+
+    The send_* helpers return coroutines, so they must be awaited.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.session = None
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def send_notification(self, title, message, priority=0):
+        """Send a notification via Pushover"""
+        try:
+            if self.session is None:
+                self.session = aiohttp.ClientSession()
+            data = {
+                "token": self.api_token,
+                "user": self.user_key,
+                "title": title,
+                "message": message,
+                "priority": priority  # 0: normal, 1: high, 2: emergency
+            }
+            async with self.session.post(self.base_url, data=data) as response:
+                response.raise_for_status()
+            return True
+
+        except Exception as e:
+            print(f"Error sending notification: {e}")
+            return False
@@ -0,0 +1,124 @@
+import argparse
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from kline_store import KlineStore, interval_ms
+from rate_limiter import HISTORY, LimitedClient
+
+# Most klines Binance returns per request
+PAGE_SIZE = 1000
+
+
+def plan_pages(start_ms, end_ms, interval, page_size=PAGE_SIZE):
+    """Split [start_ms, end_ms) into (startTime, endTime) pages of page_size bars"""
+    step = interval_ms(interval)
+    start_ms = start_ms - start_ms % step
+    span = page_size * step
+    return [(page, min(page + span, end_ms) - 1) for page in range(start_ms, end_ms, span)]
+
+
+def fetch_page(fetch, symbol, interval, page, retries=5, retry_delay=1.0, limit=PAGE_SIZE):
+    """Fetch one page of klines, retrying with backoff on errors"""
+    start, end = page
+    for attempt in range(retries):
+        try:
+            return fetch(symbol=symbol, interval=interval, startTime=start, endTime=end, limit=limit)
+        except Exception as e:
+            if attempt == retries - 1:
+                raise
+            print(f"Page {datetime.fromtimestamp(start / 1000, timezone.utc):%Y-%m-%d %H:%M} failed ({e}), retrying...")
+            time.sleep(retry_delay * 2 ** attempt)
+
+
+def backfill(fetch, store, symbol, interval, start_ms, end_ms, market='spot', workers=8, retry_delay=1.0):
+    """Download [start_ms, end_ms) of klines into the store, several pages at a time.
+
+    Pages are fetched concurrently but written strictly in order, so the
+    store always holds a contiguous history and an interrupted run resumes
+    from its last stored bar. Request weight is paced by `fetch` itself, e.g.
+    a LimitedClient method. Returns the number of bars written.
+    """
+    step = interval_ms(interval)
+    last_close = store.last_close_time(symbol, interval, market)
+    if last_close is not None:
+        first = store.read(symbol, interval, market=market)['timestamp'][0]
+        # A symbol listed after start_ms has nothing older than its first bar
+        if first > start_ms and fetch_page(fetch, symbol, interval, (start_ms, int(first) - 1), retry_delay=retry_delay, limit=1):
+            # History can only be appended, so older bars mean starting over
+            print(f"Stored {symbol} {interval} history starts after older exchange bars, re-downloading")
+            store.clear(symbol, interval, market)
+        else:
+            start_ms = max(start_ms, last_close + 1)
+
+    # Only closed bars are stored
+    end_ms = min(end_ms, int(time.time() * 1000) // step * step)
+    pages = plan_pages(start_ms, end_ms, interval)
+    if not pages:
+        return 0
+
+    written = 0
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        remaining = iter(pages)
+        # Keep a bounded number of pages in flight so out-of-order results can't pile up
+        for page in remaining:
+            pending.append(executor.submit(fetch_page, fetch, symbol, interval, page, retry_delay=retry_delay))
+            if len(pending) >= workers * 4:
+                break
+        done = 0
+        try:
+            while pending:
+                klines = pending.popleft().result()
+                written += store.append(symbol, interval, klines, market)
+                done += 1
+                page = next(remaining, None)
+                if page is not None:
+                    pending.append(executor.submit(fetch_page, fetch, symbol, interval, page, retry_delay=retry_delay))
+                if done % 50 == 0 or not pending:
+                    print(f"{symbol} {interval}: {done}/{len(pages)} pages, {written:,} bars ({time.time() - started:.0f}s)")
+        finally:
+            for future in pending:
+                future.cancel()
+    return written
+
+
+def parse_date(value):
+    """YYYY-MM-DD[THH:MM] (UTC) to milliseconds"""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download historical Binance klines into the local kline store")
+    parser.add_argument('symbols', nargs='+', help="Symbols such as BTCUSDT")
+    parser.add_argument('--interval', default='1m')
+    parser.add_argument('--start', required=True, type=parse_date, help="UTC start date, e.g. 2024-01-01")
+    parser.add_argument('--end', type=parse_date, default=None, help="UTC end date (default: now)")
+    parser.add_argument('--market', choices=('spot', 'futures'), default='spot')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--root', default='data/klines', help="Kline store directory")
+    args = parser.parse_args()
+
+    from binance.client import Client
+    # History pages queue behind any live or order requests of this process
+    if args.market == 'spot':
+        fetch = LimitedClient(Client(None, None, tld='us'), 'spot', priority=HISTORY).get_klines
+    else:
+        fetch = LimitedClient(Client(None, None, tld='com'), 'futures', priority=HISTORY).futures_klines
+
+    store = KlineStore(args.root)
+    end_ms = args.end if args.end is not None else int(time.time() * 1000)
+    for symbol in args.symbols:
+        try:
+            written = backfill(fetch, store, symbol, args.interval, args.start, end_ms, args.market, args.workers)
+            print(f"✓ {symbol}: {written:,} new bars, {store.count(symbol, args.interval, args.market):,} stored")
+        except Exception as e:
+            print(f"✗ {symbol}: backfill stopped ({e}); run again to resume")
+
+
+if __name__ == "__main__":
+    main()
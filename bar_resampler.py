@@ -0,0 +1,127 @@
+import numpy as np
+from kline_store import interval_ms
+from kline_decoder import decode_klines
+
+# Timeframes built from 1m bars
+RESAMPLED_INTERVALS = ('5m', '15m', '30m', '1h', '4h')
+
+
+def _merge(bar, row, start, step):
+    """Fold a source kline row into a (possibly empty) higher-timeframe bar"""
+    if bar is None:
+        return [
+            start, float(row[1]), float(row[2]), float(row[3]), float(row[4]), float(row[5]),
+            start + step - 1, float(row[7]), int(row[8]), float(row[9]), float(row[10]), '0'
+        ]
+    return [
+        start, bar[1], max(bar[2], float(row[2])), min(bar[3], float(row[3])), float(row[4]),
+        bar[5] + float(row[5]), bar[6], bar[7] + float(row[7]), bar[8] + int(row[8]),
+        bar[9] + float(row[9]), bar[10] + float(row[10]), '0'
+    ]
+
+
+class BarResampler:
+    """Builds higher-timeframe klines incrementally from a 1m kline feed.
+
+    Buckets are aligned to the epoch like Binance's own klines. A bucket is
+    only emitted once its first minute has been seen, so a feed that starts
+    mid-bucket never produces a bar missing its open.
+    """
+
+    def __init__(self, intervals=RESAMPLED_INTERVALS):
+        self.steps = {interval: interval_ms(interval) for interval in intervals}
+        self.partial = {interval: None for interval in intervals}  # closed minutes of the open bucket
+        self.started = {interval: False for interval in intervals}
+
+    def update(self, row, closed):
+        """Feed one 1m kline row; returns (interval, kline, closed) for each timeframe it touches"""
+        events = []
+        open_time = int(row[0])
+        for interval, step in self.steps.items():
+            start = open_time - open_time % step
+            partial = self.partial[interval]
+            if partial is not None and partial[0] != start:
+                # The bucket's last minute never came (exchange gap): close it as it is
+                events.append((interval, partial, True))
+                self.partial[interval] = partial = None
+            if not self.started[interval]:
+                if open_time != start:
+                    continue
+                self.started[interval] = True
+
+            bar = _merge(partial, row, start, step)
+            bucket_closed = closed and open_time + interval_ms('1m') >= start + step
+            if closed and not bucket_closed:
+                self.partial[interval] = bar
+            elif bucket_closed:
+                self.partial[interval] = None
+            events.append((interval, bar, bucket_closed))
+        return events
+
+
+def resample_klines(klines, interval):
+    """Aggregate REST-shaped 1m klines (oldest first) into `interval` klines.
+
+    A leading bucket whose first minute is missing is dropped; the last bar
+    is incomplete if its bucket has not finished yet.
+    """
+    if not klines:
+        return []
+    step = interval_ms(interval)
+    arrays = decode_klines(klines)
+    open_time = arrays['timestamp']
+    buckets = open_time - open_time % step
+    # Skip the minutes of a leading bucket whose first minute is missing
+    first = 0 if open_time[0] == buckets[0] else np.searchsorted(buckets, buckets[0], side='right')
+    if first == len(buckets):
+        return []
+    buckets = buckets[first:]
+    open_, high, low, close, volume, quote_volume, trades, buy_base, buy_quote = (
+        arrays[name][first:] for name in (
+            'open', 'high', 'low', 'close', 'volume', 'quote_volume', 'trades', 'buy_base_volume', 'buy_quote_volume'
+        )
+    )
+
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(buckets)] - 1
+    columns = [
+        buckets[starts],
+        open_[starts],
+        np.maximum.reduceat(high, starts),
+        np.minimum.reduceat(low, starts),
+        close[ends],
+        np.add.reduceat(volume, starts),
+        buckets[starts] + step - 1,
+        np.add.reduceat(quote_volume, starts),
+        np.add.reduceat(trades, starts),
+        np.add.reduceat(buy_base, starts),
+        np.add.reduceat(buy_quote, starts),
+    ]
+    return [row + ['0'] for row in map(list, zip(*(column.tolist() for column in columns)))]
+
+
+def resample_frame(df, interval):
+    """Aggregate a 1m bar DataFrame (DatetimeIndex) into `interval` bars.
+
+    Sums volume-like columns and volume-weights a 'vwap' column if present;
+    other non-OHLC columns are dropped.
+    """
+    rule = f"{interval_ms(interval) // 60_000}min"
+    aggregations = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last'}
+    for column in ('volume', 'quote_volume', 'trades', 'buy_base_volume', 'buy_quote_volume'):
+        if column in df.columns:
+            aggregations[column] = 'sum'
+
+    data = df[list(aggregations)]
+    if 'vwap' in df.columns and 'volume' in df.columns:
+        data = data.assign(_pv=df['vwap'] * df['volume'])
+        aggregations['_pv'] = 'sum'
+    resampled = data.resample(rule, origin='epoch', label='left', closed='left').agg(aggregations)
+    resampled = resampled.dropna(subset=['open'])
+    if '_pv' in resampled.columns:
+        resampled['vwap'] = resampled.pop('_pv') / resampled['volume']
+
+    # Drop a leading bucket that started before the first bar
+    if len(df) and len(resampled) and df.index[0] != resampled.index[0]:
+        resampled = resampled.iloc[1:]
+    return resampled
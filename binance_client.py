@@ -1,20 +1,138 @@
 from binance.client import Client
 from binance.enums import FuturesType
-import pandas as pd
 from datetime import datetime, timedelta
 import numpy as np
+import time
 import traceback
 from config import SYMBOL, INTERVAL
-from indicators import TechnicalIndicators
+import indicator_graph
+from indicator_cache import IndicatorCache
+from kline_store import interval_ms
+from kline_decoder import klines_to_frame
+from binance_stream import KlineStream
+from rate_limiter import LimitedClient
+
+# Most klines Binance returns per request
+MAX_KLINES_PER_REQUEST = 1000
+# Bars are stored once closed this long, so local clock drift can't store a bar still being updated
+CLOSE_GRACE_MS = 2000
 
 class BinanceClient:
-    def __init__(self):
-        self.client = Client(None, None, tld='us')  # Spot client
-        self.futures_client = Client(None, None, tld='com')  # Futures client (default tld)
+    def __init__(self, indicator_cache=None, kline_store=None):
+        # Requests share the process-wide weight budget of their market
+        self.client = LimitedClient(Client(None, None, tld='us'), 'spot')  # Spot client
+        self.futures_client = LimitedClient(Client(None, None, tld='com'), 'futures')  # Futures client (default tld)
+        # Reuses indicators of the closed bars between polls of the same series
+        self.indicator_cache = indicator_cache if indicator_cache is not None else IndicatorCache()
+        # Optional KlineStore: closed bars are read locally and only newer ones fetched
+        self.kline_store = kline_store
+        # Live KlineStreams by market ('spot'/'futures'), see start_stream()
+        self.streams = {}
+
+    def start_stream(self, intervals=None, market='spot', symbol=None, **kwargs):
+        """Stream klines and ticker prices over WebSocket instead of polling REST.
+
+        While the stream is connected, get_klines/get_futures_klines and the
+        current price getters are served from it.
+        """
+        if symbol is None:
+            symbol = SYMBOL.replace('/', '') + 'T'
+        fetch = self.client.get_klines if market == 'spot' else self.futures_client.futures_klines
+        self.stop_stream(market)
+        self.streams[market] = KlineStream(symbol, intervals or [INTERVAL], fetch, market=market, **kwargs).start()
+        return self.streams[market]
+
+    def stop_stream(self, market='spot'):
+        stream = self.streams.pop(market, None)
+        if stream is not None:
+            stream.stop()
+
+    def wait_for_update(self, timeout, market='spot'):
+        """Wait for the next closed bar on a live stream, or just sleep when polling"""
+        stream = self.streams.get(market)
+        if stream is None:
+            time.sleep(timeout)
+            return False
+        return stream.wait_for_update(timeout)
+
+    def _stream_price(self, market, symbol):
+        stream = self.streams.get(market)
+        if stream is not None and stream.symbol == symbol and stream.connected:
+            return stream.last_price
+        return None
+
+    def _plan_klines(self, symbol, interval, limit, market):
+        """Serve klines from a live stream, or work out what to request from the exchange.
+
+        Returns (klines, None) when no request is needed, otherwise
+        (None, keyword arguments for the klines call).
+        """
+        stream = self.streams.get(market)
+        if stream is not None and stream.symbol == symbol:
+            klines = stream.get_klines(interval, limit)
+            if klines is not None and len(klines) >= limit:
+                return klines, None
+
+        if self.kline_store is None:
+            return None, {'symbol': symbol, 'interval': interval, 'limit': limit}
+
+        store = self.kline_store
+        now = int(time.time() * 1000)
+        last_close = store.last_close_time(symbol, interval, market)
+        if last_close is None:
+            return None, {'symbol': symbol, 'interval': interval, 'limit': limit}
+        behind = (now - last_close) // interval_ms(interval)
+        # Catch the store up from its last bar when it can serve the window, or when a fresh
+        # window would not join up with it; a long gap takes several pages
+        if store.count(symbol, interval, market) >= limit - 1 or behind >= limit - 1:
+            # Only the bars closed since the last poll plus the forming one: the weight grows with the limit
+            return None, {'symbol': symbol, 'interval': interval, 'startTime': last_close + 1,
+                          'limit': min(behind + 2, MAX_KLINES_PER_REQUEST)}
+        # Stored history is too short for the window: fetch the window, its newer bars join the store
+        return None, {'symbol': symbol, 'interval': interval, 'limit': limit}
+
+    def _store_klines(self, klines, symbol, interval, limit, market):
+        """Add newly closed bars to the store and return the requested window.
+
+        Returns None when the bars did not reach the present yet (a page of a
+        longer gap), so the caller plans and fetches again.
+        """
+        if self.kline_store is None or not klines:
+            return klines
+        store = self.kline_store
+        now = int(time.time() * 1000)
+        closed = [kline for kline in klines if int(kline[6]) < now - CLOSE_GRACE_MS]
+        forming = klines[len(closed):]
+        last_close = store.last_close_time(symbol, interval, market)
+        # Only bars that continue the stored series are written, stored history is never dropped
+        written = 0
+        if last_close is None or int(klines[0][0]) <= last_close + 1:
+            written = store.append(symbol, interval, closed, market)
+        if not forming and written:
+            return None
+        if store.count(symbol, interval, market) >= limit - len(forming):
+            return store.klines(symbol, interval, limit - len(forming), market) + forming
+        return klines[-limit:]
+
+    def _fetch_klines(self, fetch, symbol, interval, limit, market):
+        """Fetch klines, topping up the local store instead of re-downloading history"""
+        while True:
+            klines, request = self._plan_klines(symbol, interval, limit, market)
+            if request is None:
+                return klines
+            klines = self._store_klines(fetch(**request), symbol, interval, limit, market)
+            if klines is not None:
+                return klines
         
-    def get_klines(self, limit=100):
-        """Get historical klines/candlestick data"""
+    def get_klines(self, limit=None, columns=None):
+        """Get historical klines/candlestick data.
+
+        With `columns`, only those indicators are calculated and, unless a
+        limit is given, only as many bars as they need are fetched.
+        """
         try:
+            if limit is None:
+                limit = indicator_graph.bars_needed(columns) if columns else 100
             print("\nFetching historical klines...")
             print(f"Using interval: {INTERVAL}")
             print(f"Symbol: {SYMBOL}")
@@ -24,11 +142,7 @@ class BinanceClient:
             print(f"Converted symbol: {symbol}")
             
             # Get klines from Binance
-            klines = self.client.get_klines(
-                symbol=symbol,
-                interval=INTERVAL,
-                limit=limit
-            )
+            klines = self._fetch_klines(self.client.get_klines, symbol, INTERVAL, limit, 'spot')
             
             if not klines:
                 print("No klines received")
@@ -36,37 +150,25 @@ class BinanceClient:
                 
             print(f"Retrieved {len(klines)} klines\n")
             
-            # Convert to DataFrame
-            df = pd.DataFrame(klines, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_volume', 'trades', 'buy_base_volume',
-                'buy_quote_volume', 'ignore'
-            ])
-            
-            # Convert numeric columns
-            numeric_columns = ['open', 'high', 'low', 'close', 'volume', 'quote_volume']
-            df[numeric_columns] = df[numeric_columns].astype(float)
+            # Decode into typed columns indexed by open time
+            df = klines_to_frame(klines)
             
             # Use quote_volume (USD volume) instead of base volume
             df['volume'] = df['quote_volume']
             
-            # Set timestamp as index
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('timestamp', inplace=True)
-            
-            # Calculate indicators
-            df = TechnicalIndicators.calculate_all_indicators(df)
+            # Calculate indicators, reusing the closed bars of the previous poll
+            df = self.indicator_cache.indicators(symbol, INTERVAL, df, columns)
             
             # Print first and last bar info
             print("First bar:")
             print(f"Time: {df.index[0].strftime('%Y-%m-%d %H:%M:%S')}")
             print(f"Close: ${df.iloc[0]['close']:,.2f}")
-            print(f"RSI: {df.iloc[0]['rsi']}")
+            print(f"RSI: {df.iloc[0].get('rsi')}")
             print(f"Volume: ${df.iloc[0]['volume']:,.2f}")
             print("\nLast bar:")
             print(f"Time: {df.index[-1].strftime('%Y-%m-%d %H:%M:%S')}")
             print(f"Close: ${df.iloc[-1]['close']:,.2f}")
-            print(f"RSI: {df.iloc[-1]['rsi']}")
+            print(f"RSI: {df.iloc[-1].get('rsi')}")
             print(f"Volume: ${df.iloc[-1]['volume']:,.2f}")
             
             return df
@@ -81,6 +183,10 @@ class BinanceClient:
             # Convert BTC/USD to BTCUSDT for Binance
             symbol = SYMBOL.replace('/', '') + 'T'
             
+            price = self._stream_price('spot', symbol)
+            if price is not None:
+                return price
+
             # Get ticker price
             ticker = self.client.get_symbol_ticker(symbol=symbol)
             if ticker:
@@ -142,8 +248,10 @@ class BinanceClient:
         try:
             if symbol is None:
                 symbol = SYMBOL.replace('/', '') + 'T'
-            ticker = self.futures_client.futures_symbol_ticker(symbol=symbol)
-            price = float(ticker['price']) if ticker else None
+            price = self._stream_price('futures', symbol)
+            if price is None:
+                ticker = self.futures_client.futures_symbol_ticker(symbol=symbol)
+                price = float(ticker['price']) if ticker else None
             print(f"Futures Current Price for {symbol}: {price}")
             return price
         except Exception as e:
@@ -157,7 +265,7 @@ class BinanceClient:
                 symbol = SYMBOL.replace('/', '') + 'T'
             if interval is None:
                 interval = INTERVAL
-            klines = self.futures_client.futures_klines(symbol=symbol, interval=interval, limit=limit)
+            klines = self._fetch_klines(self.futures_client.futures_klines, symbol, interval, limit, 'futures')
             print(f"Fetched {len(klines)} futures klines for {symbol} interval {interval}")
             return klines
         except Exception as e:
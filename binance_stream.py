@@ -0,0 +1,218 @@
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+import websockets
+from indicator_engine import IndicatorEngine
+from kline_store import interval_ms
+from bar_resampler import BarResampler
+from order_flow import OrderFlow
+
+SPOT_STREAM_URL = 'wss://stream.binance.us:9443/stream'
+FUTURES_STREAM_URL = 'wss://fstream.binance.com/stream'
+STREAM_URLS = {'spot': SPOT_STREAM_URL, 'futures': FUTURES_STREAM_URL}
+
+
+def kline_row(k):
+    """REST-shaped kline row from the 'k' payload of a kline event"""
+    return [k['t'], k['o'], k['h'], k['l'], k['c'], k['v'], k['T'], k['q'], k['n'], k['V'], k['Q'], k['B']]
+
+
+def engine_bar(row):
+    """IndicatorEngine bar from a kline row, using quote volume like the REST path"""
+    return {
+        'open': float(row[1]), 'high': float(row[2]), 'low': float(row[3]),
+        'close': float(row[4]), 'volume': float(row[7]),
+    }
+
+
+class KlineStream:
+    """Live kline and ticker feed for one symbol over a Binance combined stream.
+
+    Keeps the last `history` klines of each interval (closed bars plus the
+    forming one) and an IndicatorEngine per interval: closed bars are
+    committed, in-progress updates applied provisionally, and each bar's
+    indicators carry its taker order flow (see order_flow). The connection
+    runs on a background thread, reconnects with backoff, and any bars
+    missed while disconnected are backfilled over REST through `fetch`
+    (a python-binance get_klines/futures_klines style function).
+
+    Intervals listed in `resample` are not subscribed to but built from the
+    1m stream with a BarResampler, so they cost no extra requests. With a
+    `footprint`, the symbol's aggTrades are subscribed to and fed into it;
+    trades missed while disconnected are not recovered.
+    """
+
+    def __init__(self, symbol, intervals, fetch, market='spot', url=None, history=1000,
+                 on_bar=None, on_ticker=None, max_reconnect_delay=30, resample=(), footprint=None):
+        self.symbol = symbol
+        self.intervals = list(intervals)
+        self.resampler = BarResampler(resample) if resample else None
+        if self.resampler and '1m' not in self.intervals:
+            self.intervals.append('1m')
+        self.fetch = fetch
+        self.market = market
+        self.url = url or STREAM_URLS[market]
+        self.history = history
+        self.on_bar = on_bar
+        self.on_ticker = on_ticker
+        self.max_reconnect_delay = max_reconnect_delay
+        self.footprint = footprint
+
+        all_intervals = self.intervals + list(resample)
+        self.klines = {interval: deque(maxlen=history) for interval in all_intervals}
+        self.engines = {interval: IndicatorEngine() for interval in all_intervals}
+        self.flows = {interval: OrderFlow() for interval in all_intervals}
+        self.last_price = None
+        self.last_price_time = None
+        self.connected = False
+        self.reconnects = 0
+
+        self._last_closed = {interval: None for interval in self.intervals}
+        self._condition = threading.Condition()
+        self._closed_bars = 0
+        self._updates = 0
+        self._thread = None
+        self._stopping = False
+
+    @property
+    def stream_url(self):
+        names = [f"{self.symbol.lower()}@kline_{interval}" for interval in self.intervals]
+        names.append(f"{self.symbol.lower()}@ticker")
+        if self.footprint is not None:
+            names.append(f"{self.symbol.lower()}@aggTrade")
+        return f"{self.url}?streams={'/'.join(names)}"
+
+    def start(self):
+        """Run the stream on a background thread"""
+        self._stopping = False
+        self._thread = threading.Thread(target=lambda: asyncio.run(self.run()), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self._stopping = True
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def is_ready(self, interval):
+        """True once the interval has history and the socket is up"""
+        with self._condition:
+            return self.connected and interval in self.klines and len(self.klines[interval]) > 0
+
+    def get_klines(self, interval, limit):
+        """The last `limit` klines (REST-shaped, forming bar last), or None if not streaming this interval"""
+        if not self.is_ready(interval):
+            return None
+        with self._condition:
+            buffer = self.klines[interval]
+            return [list(row) for row in list(buffer)[-limit:]]
+
+    def wait_for_update(self, timeout, closed_only=True):
+        """Block until a bar closes (or any kline update, with closed_only=False) or the timeout passes"""
+        with self._condition:
+            counter = '_closed_bars' if closed_only else '_updates'
+            seen = getattr(self, counter)
+            return self._condition.wait_for(lambda: getattr(self, counter) != seen, timeout)
+
+    async def run(self):
+        """Connect, backfill, consume messages and reconnect until stop() is called"""
+        delay = 1
+        while not self._stopping:
+            try:
+                async with websockets.connect(self.stream_url, ping_interval=20) as ws:
+                    for interval in self.intervals:
+                        await self._backfill(interval)
+                    with self._condition:
+                        self.connected = True
+                        self._condition.notify_all()
+                    delay = 1
+                    while not self._stopping:
+                        try:
+                            message = await asyncio.wait_for(ws.recv(), timeout=1)
+                        except asyncio.TimeoutError:
+                            continue
+                        await self._handle(json.loads(message))
+            except Exception as e:
+                # Socket errors and failed backfills alike: reconnect and backfill again
+                print(f"Binance {self.market} stream disconnected: {e}")
+            finally:
+                with self._condition:
+                    self.connected = False
+            if self._stopping:
+                break
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _handle(self, message):
+        data = message.get('data', message)
+        event = data.get('e')
+        if event == 'kline':
+            await self._on_kline(data['k'])
+        elif event == 'aggTrade':
+            if self.footprint is not None:
+                self.footprint.add_trade(float(data['p']), float(data['q']), data['T'], data['m'], data['a'])
+        elif event == '24hrTicker':
+            with self._condition:
+                self.last_price = float(data['c'])
+                self.last_price_time = data['E']
+            if self.on_ticker:
+                self.on_ticker(self.last_price)
+
+    async def _on_kline(self, k):
+        interval = k['i']
+        if interval not in self.klines:
+            return
+        last_closed = self._last_closed[interval]
+        if last_closed is not None:
+            if k['t'] <= last_closed:
+                return  # already committed, e.g. by a backfill
+            if k['t'] > last_closed + interval_ms(interval):
+                # Bars were missed: fill them in from REST first
+                await self._backfill(interval)
+                if k['t'] <= self._last_closed[interval]:
+                    return
+        self._apply(interval, kline_row(k), k['x'])
+
+    async def _backfill(self, interval):
+        """Fetch bars after the last closed one (or the initial history) over REST"""
+        last_closed = self._last_closed[interval]
+        if last_closed is None:
+            rows = await asyncio.to_thread(self.fetch, symbol=self.symbol, interval=interval, limit=self.history)
+        else:
+            start = last_closed + interval_ms(interval)
+            rows = await asyncio.to_thread(self.fetch, symbol=self.symbol, interval=interval, startTime=start, limit=1000)
+        now = int(time.time() * 1000)
+        for row in rows or []:
+            self._apply(interval, row, int(row[6]) < now)
+
+    def _apply(self, interval, row, closed):
+        self._record(interval, row, closed)
+        if self.resampler and interval == '1m':
+            for derived, bar, bar_closed in self.resampler.update(row, closed):
+                self._record(derived, bar, bar_closed)
+        with self._condition:
+            if closed:
+                self._last_closed[interval] = row[0]
+                self._closed_bars += 1
+            self._updates += 1
+            self._condition.notify_all()
+
+    def _record(self, interval, row, closed):
+        """Buffer a kline and feed it to the interval's engine"""
+        with self._condition:
+            buffer = self.klines[interval]
+            if buffer and buffer[-1][0] == row[0]:
+                buffer[-1] = row
+            else:
+                buffer.append(row)
+            engine = self.engines[interval]
+            if closed:
+                indicators = engine.update(engine_bar(row))
+            else:
+                indicators = engine.update_provisional(engine_bar(row))
+            indicators = {**indicators, **self.flows[interval].update(float(row[7]), float(row[10]), closed)}
+        if self.on_bar:
+            self.on_bar(interval, indicators, closed)
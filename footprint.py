@@ -0,0 +1,262 @@
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from kline_store import interval_ms
+
+# Spare buckets allocated on each side when a bar's price range grows
+GROW_PADDING = 16
+
+
+class FootprintBar:
+    """Bid/ask volume per price bucket of one bar.
+
+    Volumes are quote notional (price * quantity), like the quote volume the
+    rest of the bot uses. Ask volume is aggressive buying (the buyer was the
+    taker), bid volume aggressive selling. bid[i]/ask[i] belong to bucket
+    base + i, i.e. prices [(base + i) * tick_size, (base + i + 1) * tick_size).
+    """
+
+    __slots__ = ('open_time', 'tick_size', 'base', 'bid', 'ask', 'trades')
+
+    def __init__(self, open_time, tick_size, base=0, bid=None, ask=None, trades=0):
+        self.open_time = open_time
+        self.tick_size = tick_size
+        self.base = base
+        self.bid = np.zeros(0) if bid is None else bid
+        self.ask = np.zeros(0) if ask is None else ask
+        self.trades = trades
+
+    def _reserve(self, low, high):
+        """Make buckets low..high addressable, growing the arrays with some padding"""
+        if len(self.bid) == 0:
+            self.base = low - GROW_PADDING
+            size = high - low + 1 + 2 * GROW_PADDING
+            self.bid, self.ask = np.zeros(size), np.zeros(size)
+            return
+        top = self.base + len(self.bid) - 1
+        if low >= self.base and high <= top:
+            return
+        base = min(self.base, low - GROW_PADDING)
+        size = max(top, high + GROW_PADDING) - base + 1
+        offset = self.base - base
+        for name in ('bid', 'ask'):
+            grown = np.zeros(size)
+            grown[offset:offset + len(self.bid)] = getattr(self, name)
+            setattr(self, name, grown)
+        self.base = base
+
+    def add(self, bucket, notional, seller_aggressor):
+        self._reserve(bucket, bucket)
+        side = self.bid if seller_aggressor else self.ask
+        side[bucket - self.base] += notional
+        self.trades += 1
+
+    def add_many(self, buckets, notional, seller_aggressor):
+        self._reserve(int(buckets.min()), int(buckets.max()))
+        index = buckets - self.base
+        size = len(self.bid)
+        self.bid += np.bincount(index, weights=np.where(seller_aggressor, notional, 0.0), minlength=size)
+        self.ask += np.bincount(index, weights=np.where(seller_aggressor, 0.0, notional), minlength=size)
+        self.trades += len(buckets)
+
+    def levels(self):
+        """(prices, bid, ask) of the traded price range, lowest price first"""
+        traded = np.flatnonzero(self.bid + self.ask)
+        if len(traded) == 0:
+            return np.zeros(0), np.zeros(0), np.zeros(0)
+        window = slice(traded[0], traded[-1] + 1)
+        prices = (self.base + np.arange(window.start, window.stop)) * self.tick_size
+        return prices, self.bid[window], self.ask[window]
+
+    @property
+    def volume(self):
+        return float(self.bid.sum() + self.ask.sum())
+
+    @property
+    def delta(self):
+        return float(self.ask.sum() - self.bid.sum())
+
+    def poc(self):
+        """Point of control: the price bucket with the most volume"""
+        prices, bid, ask = self.levels()
+        if len(prices) == 0:
+            return None
+        return float(prices[np.argmax(bid + ask)])
+
+    def value_area(self, share=0.7):
+        """(low, high) price range around the POC holding `share` of the volume"""
+        prices, bid, ask = self.levels()
+        if len(prices) == 0:
+            return None
+        volume = bid + ask
+        target = volume.sum() * share
+        low = high = int(np.argmax(volume))
+        covered = volume[low]
+        # Widen towards the busier neighbour until the share is covered
+        while covered < target and (low > 0 or high < len(volume) - 1):
+            below = volume[low - 1] if low > 0 else -1.0
+            above = volume[high + 1] if high < len(volume) - 1 else -1.0
+            if above >= below:
+                high += 1
+                covered += above
+            else:
+                low -= 1
+                covered += below
+        return float(prices[low]), float(prices[high])
+
+    def delta_levels(self, threshold):
+        """Price buckets whose ask - bid exceeds `threshold` either way, largest first"""
+        prices, bid, ask = self.levels()
+        delta = ask - bid
+        strong = np.flatnonzero(np.abs(delta) > threshold)
+        strong = strong[np.argsort(-np.abs(delta[strong]), kind='stable')]
+        return [{'price': float(prices[i]), 'delta': float(delta[i])} for i in strong]
+
+
+def parse_agg_trades(trades):
+    """Arrays of aggTrade dicts (REST or stream payloads, oldest first)"""
+    return {
+        'id': np.fromiter((trade['a'] for trade in trades), dtype=np.int64, count=len(trades)),
+        'time': np.fromiter((trade['T'] for trade in trades), dtype=np.int64, count=len(trades)),
+        'price': np.fromiter((float(trade['p']) for trade in trades), dtype=np.float64, count=len(trades)),
+        'quantity': np.fromiter((float(trade['q']) for trade in trades), dtype=np.float64, count=len(trades)),
+        'buyer_maker': np.fromiter((trade['m'] for trade in trades), dtype=bool, count=len(trades)),
+    }
+
+
+def load_agg_trades(path):
+    """aggTrades recorded to a file, as arrays (see parse_agg_trades).
+
+    Reads Binance's public data dumps (CSV, with or without a header row)
+    and JSON lines of REST or stream (including combined stream) payloads.
+    """
+    path = Path(path)
+    if path.suffix == '.csv':
+        with open(path) as f:
+            has_header = not f.readline().split(',')[0].strip().isdigit()
+        df = pd.read_csv(path, header=0 if has_header else None)
+        times = df.iloc[:, 5].to_numpy(np.int64)
+        if len(times) and times[0] > 10 ** 14:
+            times = times // 1000  # newer spot dumps use microseconds
+        buyer_maker = df.iloc[:, 6]
+        if buyer_maker.dtype != bool:
+            buyer_maker = buyer_maker.astype(str).str.lower() == 'true'
+        return {
+            'id': df.iloc[:, 0].to_numpy(np.int64),
+            'time': times,
+            'price': df.iloc[:, 1].to_numpy(np.float64),
+            'quantity': df.iloc[:, 2].to_numpy(np.float64),
+            'buyer_maker': buyer_maker.to_numpy(bool),
+        }
+    with open(path) as f:
+        messages = [json.loads(line) for line in f if line.strip()]
+    return parse_agg_trades([message.get('data', message) for message in messages])
+
+
+class Footprint:
+    """Per-bar footprints of one symbol built from aggTrades.
+
+    Trades arrive one at a time from a stream (add_trade) or in batches from
+    REST pages and recorded files (add_trades); trade ids already seen are
+    skipped, so overlapping batches are harmless. Only the last `max_bars`
+    bars are kept. Safe to feed from a stream thread while another reads.
+    """
+
+    def __init__(self, interval='1m', tick_size=10.0, max_bars=500):
+        self.interval = interval
+        self.step = interval_ms(interval)
+        self.tick_size = tick_size
+        self.max_bars = max_bars
+        self.bars = OrderedDict()  # open_time -> FootprintBar
+        self.last_id = None
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.bars)
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        footprint = cls(**kwargs)
+        footprint.add_trades(load_agg_trades(path))
+        return footprint
+
+    def _bar(self, open_time):
+        bar = self.bars.get(open_time)
+        if bar is None:
+            bar = self.bars[open_time] = FootprintBar(open_time, self.tick_size)
+            while len(self.bars) > self.max_bars:
+                self.bars.popitem(last=False)
+        return bar
+
+    def add_trade(self, price, quantity, time, buyer_maker, trade_id=None):
+        """Add one aggTrade (stream fields p, q, T, m, a)"""
+        with self.lock:
+            if trade_id is not None:
+                if self.last_id is not None and trade_id <= self.last_id:
+                    return
+                self.last_id = trade_id
+            bucket = int(price // self.tick_size)
+            self._bar(time - time % self.step).add(bucket, price * quantity, buyer_maker)
+
+    def add_trades(self, trades):
+        """Add a batch of aggTrades: a list of REST/stream dicts or parsed arrays"""
+        arrays = trades if isinstance(trades, dict) else parse_agg_trades(trades)
+        with self.lock:
+            ids = arrays['id']
+            keep = np.ones(len(ids), dtype=bool) if self.last_id is None else ids > self.last_id
+            if not keep.any():
+                return
+            times, prices = arrays['time'][keep], arrays['price'][keep]
+            notional = prices * arrays['quantity'][keep]
+            sellers = arrays['buyer_maker'][keep]
+            buckets = np.floor(prices / self.tick_size).astype(np.int64)
+            open_times = times - times % self.step
+            # Trades are time-ordered, so each bar is one contiguous run
+            starts = np.flatnonzero(np.r_[True, open_times[1:] != open_times[:-1]])
+            ends = np.r_[starts[1:], len(open_times)]
+            for start, end in zip(starts, ends):
+                self._bar(int(open_times[start])).add_many(buckets[start:end], notional[start:end], sellers[start:end])
+            self.last_id = int(ids[keep][-1])
+
+    def recent(self, n):
+        """The last n bars, oldest first"""
+        with self.lock:
+            return list(self.bars.values())[-n:]
+
+    def profile(self, n):
+        """One FootprintBar summing the last n bars (a volume profile)"""
+        with self.lock:
+            bars = [bar for bar in self.recent(n) if len(bar.bid)]
+            if not bars:
+                return FootprintBar(None, self.tick_size)
+            base = min(bar.base for bar in bars)
+            size = max(bar.base + len(bar.bid) for bar in bars) - base
+            bid, ask = np.zeros(size), np.zeros(size)
+            for bar in bars:
+                offset = bar.base - base
+                bid[offset:offset + len(bar.bid)] += bar.bid
+                ask[offset:offset + len(bar.ask)] += bar.ask
+        return FootprintBar(bars[0].open_time, self.tick_size, base, bid, ask, sum(bar.trades for bar in bars))
+
+    def summary(self, n=3, share=0.7):
+        """Delta, volume, POC and value area of each of the last n bars"""
+        rows = []
+        with self.lock:
+            for bar in self.recent(n):
+                value_area = bar.value_area(share)
+                rows.append({
+                    'time': pd.Timestamp(bar.open_time, unit='ms').strftime("%H:%M"),
+                    'delta': bar.delta,
+                    'volume': bar.volume,
+                    'poc': bar.poc(),
+                    'value_area_low': value_area[0] if value_area else None,
+                    'value_area_high': value_area[1] if value_area else None,
+                })
+        return rows
+
+    def delta_clusters(self, n_bars=5, threshold=500_000):
+        """Price levels of the last n_bars whose net taker delta exceeds `threshold`"""
+        return self.profile(n_bars).delta_levels(threshold)
@@ -0,0 +1,127 @@
+import threading
+from collections import OrderedDict
+
+RESTING, FILLED, CANCELED, REJECTED = 'resting', 'filled', 'canceled', 'rejected'
+# States an order never leaves
+TERMINAL = {FILLED, CANCELED, REJECTED}
+
+
+def order_state(status):
+    """Our state for an orderUpdates status ("open", "filled", "marginCanceled", "tickRejected", ...)"""
+    if status in ('open', 'triggered'):
+        return RESTING
+    if status == 'filled':
+        return FILLED
+    if status.lower().endswith('rejected'):
+        return REJECTED
+    return CANCELED
+
+
+class TrackedOrder:
+    """One order's state, filled size and average fill price"""
+
+    __slots__ = ('oid', 'coin', 'size', 'state', 'filled', 'notional', 'done')
+
+    def __init__(self, oid, coin=None, size=None):
+        self.oid = oid
+        self.coin = coin
+        self.size = size
+        self.state = RESTING
+        self.filled = 0.0
+        self.notional = 0.0
+        self.done = threading.Event()
+
+    @property
+    def avg_price(self):
+        return self.notional / self.filled if self.filled else None
+
+    def _set_state(self, state):
+        if self.state in TERMINAL:
+            return
+        self.state = state
+        if state in TERMINAL:
+            self.done.set()
+
+    def __repr__(self):
+        return f"TrackedOrder(oid={self.oid}, coin={self.coin}, state={self.state}, filled={self.filled}/{self.size})"
+
+
+class OrderManager:
+    """Hyperliquid order states kept current by the orderUpdates and userFills feeds.
+
+    Orders are tracked from the first sight of their oid, whether that is
+    the order response (track) or a WebSocket message that beat it. Each
+    moves resting -> filled / canceled / rejected, and wait_for_fill blocks
+    on that transition instead of sleeping or polling. Only the last
+    `max_orders` orders are kept.
+    """
+
+    def __init__(self, max_orders=1000):
+        self.max_orders = max_orders
+        self.orders = OrderedDict()  # oid -> TrackedOrder
+        self._lock = threading.Lock()
+
+    def start(self, info, user):
+        """Subscribe through an SDK Info created without skip_ws"""
+        info.subscribe({"type": "orderUpdates", "user": user}, self.on_message)
+        info.subscribe({"type": "userFills", "user": user}, self.on_message)
+        return self
+
+    def _order(self, oid, coin=None, size=None):
+        order = self.orders.get(oid)
+        if order is None:
+            order = self.orders[oid] = TrackedOrder(oid, coin, size)
+            while len(self.orders) > self.max_orders:
+                self.orders.popitem(last=False)
+        if order.coin is None:
+            order.coin = coin
+        if order.size is None:
+            order.size = size
+        return order
+
+    def track(self, oid, coin=None, size=None, status=RESTING):
+        """Record an order from its order response ("resting", "filled" or "error" leg status).
+
+        Filled size and price come from the userFills feed only, so fills are not counted twice.
+        """
+        with self._lock:
+            order = self._order(oid, coin, size)
+            if status == FILLED:
+                order._set_state(FILLED)
+            elif status == 'error':
+                order._set_state(REJECTED)
+            return order
+
+    def order(self, oid):
+        return self.orders.get(oid)
+
+    def wait_for_fill(self, oid, timeout=10):
+        """Block until the order is filled, cancelled or rejected; the TrackedOrder, or None on timeout"""
+        with self._lock:
+            order = self._order(oid)
+        return order if order.done.wait(timeout) else None
+
+    def on_message(self, message):
+        channel, data = message.get("channel"), message.get("data")
+        if channel == "orderUpdates":
+            self.apply_order_updates(data)
+        elif channel == "userFills" and not data.get("isSnapshot"):
+            # The first message replays past fills
+            self.apply_fills(data["fills"])
+
+    def apply_order_updates(self, updates):
+        with self._lock:
+            for update in updates:
+                placed = update["order"]
+                order = self._order(placed["oid"], placed["coin"], float(placed.get("origSz", placed["sz"])))
+                order._set_state(order_state(update["status"]))
+
+    def apply_fills(self, fills):
+        with self._lock:
+            for fill in fills:
+                order = self._order(fill["oid"], fill["coin"])
+                size, price = float(fill["sz"]), float(fill["px"])
+                order.filled += size
+                order.notional += size * price
+                if order.size is not None and order.filled >= order.size:
+                    order._set_state(FILLED)
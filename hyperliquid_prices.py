@@ -0,0 +1,71 @@
+import time
+from quote_cache import TopOfBook
+
+
+class MidCache:
+    """Hyperliquid mid prices and top of book, kept current by its WebSocket.
+
+    The allMids feed gives every coin's mid; l2Book subscriptions add the
+    best bid/ask of the coins traded. Each update replaces whole entries,
+    so readers on other threads never see half of one. Anything older than
+    `max_age` seconds is stale and reads return None for it, leaving the
+    caller to fall back to REST (and apply_mids() the answer to prime it).
+    """
+
+    def __init__(self, max_age=5.0):
+        self.max_age = max_age
+        self.updates = 0
+        self._mids = {}  # coin -> (mid, received_at)
+        self._books = {}  # coin -> TopOfBook
+
+    def start(self, info, coins=()):
+        """Subscribe through an SDK Info created without skip_ws"""
+        info.subscribe({"type": "allMids"}, self.on_message)
+        for coin in coins:
+            info.subscribe({"type": "l2Book", "coin": coin}, self.on_message)
+        return self
+
+    def on_message(self, message):
+        channel, data = message.get("channel"), message.get("data")
+        if channel == "allMids":
+            self.apply_mids(data["mids"])
+        elif channel == "l2Book":
+            self.apply_book(data)
+
+    def apply_mids(self, mids):
+        """Store {coin: mid} from allMids (or Info.all_mids())"""
+        received_at = time.monotonic()
+        self._mids.update({coin: (float(mid), received_at) for coin, mid in mids.items()})
+        self.updates += 1
+
+    def apply_book(self, book):
+        """Store the top of an l2Book snapshot"""
+        bids, asks = book["levels"]
+        if not bids or not asks:
+            return
+        self._books[book["coin"]] = TopOfBook(
+            float(bids[0]["px"]), float(bids[0]["sz"]),
+            float(asks[0]["px"]), float(asks[0]["sz"]),
+            book.get("time"), time.monotonic(),
+        )
+        self.updates += 1
+
+    def _max_age(self, max_age):
+        return self.max_age if max_age is None else max_age
+
+    def book(self, coin, max_age=None):
+        """The coin's TopOfBook, or None when there is none younger than max_age"""
+        book = self._books.get(coin)
+        if book is None or book.age > self._max_age(max_age):
+            return None
+        return book
+
+    def mid(self, coin, max_age=None):
+        """Fresh mid price: the l2Book top when subscribed, else allMids"""
+        book = self.book(coin, max_age)
+        if book is not None:
+            return book.mid
+        entry = self._mids.get(coin)
+        if entry is None or time.monotonic() - entry[1] > self._max_age(max_age):
+            return None
+        return entry[0]
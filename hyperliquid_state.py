@@ -0,0 +1,71 @@
+import threading
+import time
+
+LONG, SHORT, NONE = 'LONG', 'SHORT', 'NONE'
+
+
+class UserState:
+    """One cached Hyperliquid clearinghouse state (equity, margin, positions).
+
+    `fetch()` returns Info.user_state for the account. The snapshot is
+    reused until it is `max_age` seconds old or a fill arrives on the
+    userFills feed (or invalidate() is called after placing orders), so
+    sizing and position checks within one signal share a single request.
+    """
+
+    def __init__(self, fetch, max_age=5.0):
+        self.fetch = fetch
+        self.max_age = max_age
+        self.fetches = 0
+        self._snapshot = None  # (state, generation, fetched_at)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def start(self, info, user):
+        """Subscribe through an SDK Info created without skip_ws"""
+        info.subscribe({"type": "userFills", "user": user}, self.on_message)
+        return self
+
+    def on_message(self, message):
+        data = message.get("data") or {}
+        if message.get("channel") == "userFills" and not data.get("isSnapshot"):
+            self.invalidate()
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+
+    def snapshot(self):
+        with self._lock:
+            generation = self._generation
+            if (self._snapshot is not None and self._snapshot[1] == generation
+                    and time.monotonic() - self._snapshot[2] < self.max_age):
+                return self._snapshot[0]
+        state = self.fetch()
+        self.fetches += 1
+        with self._lock:
+            # A fill during the fetch has bumped the generation, so the next read fetches again
+            self._snapshot = (state, generation, time.monotonic())
+        return state
+
+    def equity(self):
+        """Account value in USD"""
+        return float(self.snapshot()["marginSummary"]["accountValue"])
+
+    def margin_used(self):
+        return float(self.snapshot()["marginSummary"]["totalMarginUsed"])
+
+    def position(self, coin):
+        """{'side': LONG/SHORT/NONE, 'size': absolute size, 'entry_price'} of the coin's position"""
+        for asset_position in self.snapshot()["assetPositions"]:
+            position = asset_position["position"]
+            if position["coin"] == coin:
+                size = float(position["szi"])
+                if size:
+                    entry_price = position.get("entryPx")
+                    return {
+                        'side': LONG if size > 0 else SHORT,
+                        'size': abs(size),
+                        'entry_price': float(entry_price) if entry_price is not None else None,
+                    }
+        return {'side': NONE, 'size': 0.0, 'entry_price': None}
@@ -1,25 +1,37 @@
 import example_utils
 from hyperliquid.utils import constants
 from hyperliquid.utils.error import ServerError
+import math
+import threading
 import time
 import logging
+from hyperliquid_prices import MidCache
+from hyperliquid_orders import OrderManager, FILLED
+from hyperliquid_state import UserState
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Coins whose L2 top of book is streamed (all mids are streamed regardless)
+BOOK_COINS = ["BTC"]
+# Market orders are IOC limits at most this far past the mid
+MARKET_SLIPPAGE = 0.01
+# Share of equity risked between entry and stop loss
+RISK_PER_TRADE = 0.01
+
 def round_price(price, symbol=None):
     """Round price to avoid floating point issues. For BTC, use whole numbers."""
     if symbol and symbol.upper() == "BTC":
         return round(float(price))
     return round(float(price), 1)
 
-def setup_exchange(max_retries=3, retry_delay=5):
+def setup_exchange(max_retries=3, retry_delay=5, base_url=constants.TESTNET_API_URL):
     """Setup exchange connection with retry logic"""
     for attempt in range(max_retries):
         try:
             logger.info(f"Attempting to connect to Hyperliquid (attempt {attempt + 1}/{max_retries})")
-            address, info, exchange = example_utils.setup(base_url=constants.TESTNET_API_URL, skip_ws=True)
+            address, info, exchange = example_utils.setup(base_url=base_url, skip_ws=False)
             logger.info("Successfully connected to Hyperliquid")
             return address, info, exchange
         except ServerError as e:
@@ -34,8 +46,164 @@ def setup_exchange(max_retries=3, retry_delay=5):
             logger.error(f"Unexpected error connecting to Hyperliquid: {str(e)}")
             raise
 
-# Setup once at module load with retry logic
-address, info, exchange = setup_exchange()
+def order_request(symbol, is_buy, size, limit_price, order_type, reduce_only=False):
+    """One order of a bulk_orders request"""
+    return {
+        "coin": symbol,
+        "is_buy": is_buy,
+        "sz": size,
+        "limit_px": limit_price,
+        "order_type": order_type,
+        "reduce_only": reduce_only,
+    }
+
+def trigger_order(symbol, is_buy, size, trigger_price, tpsl):
+    """Reduce-only market trigger closing an entry on side `is_buy` ("sl" or "tp")"""
+    # The order price bounds the market fill: 1% past the trigger, below it for a
+    # long's stop loss and a short's take profit, above it otherwise
+    below = (tpsl == "sl") == is_buy
+    order_price = trigger_price * (0.99 if below else 1.01)
+    order_type = {"trigger": {"triggerPx": trigger_price, "isMarket": True, "tpsl": tpsl}}
+    return order_request(symbol, not is_buy, size, round_price(order_price, symbol), order_type, reduce_only=True)
+
+def leg_status(status):
+    """Status of one order in a bulk response: {"status", "oid"} or {"status": "error", "error"}"""
+    if isinstance(status, str):
+        # e.g. "waitingForFill" for a trigger whose entry is still resting
+        return {"status": status, "oid": None}
+    if "error" in status:
+        return {"status": "error", "error": status["error"], "oid": None}
+    for state in ("resting", "filled"):
+        if state in status:
+            return {"status": state, "oid": status[state]["oid"]}
+    return {"status": "unknown", "oid": None}
+
+class HyperliquidSession:
+    """The Hyperliquid connection, set up on first use and then reused.
+
+    Nothing touches the network on import: connect() starts the setup on
+    a background thread, and get() waits for it, starting it if needed.
+    The session keeps the SDK's Info (with the exchange metadata it loaded)
+    and Exchange, and subscribes the mid, order and user state caches once
+    connected.
+    A failed setup is raised from get() and retried on the next call.
+    close() stops the Info's WebSocket; the next get() connects again.
+    """
+
+    def __init__(self, prices, orders, user_state, base_url=constants.TESTNET_API_URL):
+        self.prices = prices
+        self.orders = orders
+        self.user_state = user_state
+        self.base_url = base_url
+        self.address = self.info = self.exchange = None
+        self.error = None
+        self.ready = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def connect(self):
+        """Start connecting in the background (no-op while connecting or connected)"""
+        with self._lock:
+            if self._thread is None:
+                # A new event per attempt, so callers still waiting on a failed one are not reset
+                self.ready = threading.Event()
+                self._thread = threading.Thread(target=self._connect, args=(self.ready,), daemon=True)
+                self._thread.start()
+        return self
+
+    def _connect(self, ready):
+        info = None
+        try:
+            address, info, exchange = setup_exchange(base_url=self.base_url)
+            self.prices.start(info, BOOK_COINS)
+            self.orders.start(info, address)
+            self.user_state.start(info, address)
+            self.address, self.info, self.exchange = address, info, exchange
+            ready.set()
+        except Exception as e:
+            if info is not None:
+                disconnect(info)
+            # Set together under the lock: the error is only ever replaced by a newer one
+            with self._lock:
+                self.error = e
+                self._thread = None
+                ready.set()
+
+    def get(self, timeout=None):
+        """The connected session, waiting for the setup if it is still running"""
+        if self.exchange is not None:
+            return self
+        ready = self.connect().ready
+        if not ready.wait(timeout):
+            raise TimeoutError("Hyperliquid connection not ready")
+        error = self.error
+        if self.exchange is None:
+            raise error or ConnectionError("Hyperliquid session was closed")
+        return self
+
+    def close(self, timeout=10):
+        """Disconnect the WebSocket and its thread; a later get() reconnects"""
+        if self._thread is not None:
+            # Let a setup in progress finish so its WebSocket is closed too
+            self.ready.wait(timeout)
+        with self._lock:
+            if self.exchange is None:
+                return
+            info = self.info
+            self.address = self.info = self.exchange = None
+            self._thread = None
+        disconnect(info)
+
+def disconnect(info):
+    """Stop an SDK Info's WebSocket manager"""
+    try:
+        info.disconnect_websocket()
+    except Exception as e:
+        logger.warning(f"Error closing the Hyperliquid WebSocket: {str(e)}")
+
+# Mid prices from the WebSocket
+prices = MidCache()
+# Order states from the orderUpdates and userFills feeds
+orders = OrderManager()
+# Equity, margin and positions, refetched after fills or when older than its max_age
+user_state = UserState(lambda: session.get().info.user_state(session.address))
+# Connected on first use, or in the background from connect()
+session = HyperliquidSession(prices, orders, user_state)
+
+def connect():
+    """Warm the connection up in the background, e.g. at startup"""
+    return session.connect()
+
+def close():
+    """Close the Hyperliquid WebSocket (its threads keep the process alive), e.g. on exit"""
+    session.close()
+
+def get_mid(symbol):
+    """Current mid price: a memory read, or REST when the stream has nothing fresh"""
+    mid = prices.mid(symbol)
+    if mid is None:
+        prices.apply_mids(session.get().info.all_mids())
+        mid = prices.mid(symbol)
+    return mid
+
+def get_open_position(symbol):
+    """{'side': 'LONG', 'SHORT' or 'NONE', 'size': absolute size, 'entry_price'} from the cached user state"""
+    return user_state.position(symbol)
+
+def round_size(size, symbol):
+    """Round a size down to the coin's size decimals from the exchange metadata"""
+    info = session.get().info
+    decimals = info.asset_to_sz_decimals[info.name_to_asset(symbol)]
+    return math.floor(size * 10 ** decimals) / 10 ** decimals
+
+def calculate_position_size(entry_price, stop_loss, symbol="BTC", risk=RISK_PER_TRADE):
+    """Size that loses `risk` of the account's equity if the stop loss is hit"""
+    if entry_price is None or stop_loss is None or entry_price == stop_loss:
+        return None
+    equity = user_state.equity()
+    if equity <= 0:
+        return None
+    return round_size(equity * risk / abs(entry_price - stop_loss), symbol)
 
 def execute_trade(signal):
     """
@@ -46,6 +214,8 @@ def execute_trade(signal):
         "size": float,
         "order_type": "market" or "limit",
         "limit_price": float (optional, required for limit),
+        "slippage": float (optional, market orders, default MARKET_SLIPPAGE),
+        "reduce_only": bool (optional),
         "stop_loss": float (optional),
         "take_profit": float (optional)
     }
@@ -55,93 +225,63 @@ def execute_trade(signal):
         symbol = signal["symbol"]
         size = signal["size"]
         
-        # Execute main order
+        # Entry order
         if signal["order_type"] == "market":
-            # For market orders, we'll use a very aggressive limit price to ensure execution
-            current_price = 94000  # Approximate current BTC price
-            limit_price = round_price(current_price * 1.1 if is_buy else current_price * 0.9, symbol)
-            result = exchange.order(symbol, is_buy, size, limit_price, {"limit": {"tif": "Gtc"}})
-            logger.info("Market order result: %s", result)
+            # Market orders are IOC limits bounded by the slippage allowed around the live mid
+            slippage = signal.get("slippage", MARKET_SLIPPAGE)
+            mid = get_mid(symbol)
+            if mid is None:
+                raise ValueError(f"No mid price for {symbol}")
+            limit_price = round_price(mid * (1 + slippage) if is_buy else mid * (1 - slippage), symbol)
+            tif = "Ioc"
         elif signal["order_type"] == "limit":
             limit_price = signal.get("limit_price")
             if limit_price is None:
                 raise ValueError("Limit price must be provided for limit orders.")
             limit_price = round_price(limit_price, symbol)
-            result = exchange.order(symbol, is_buy, size, limit_price, {"limit": {"tif": "Gtc"}})
-            logger.info("Limit order result: %s", result)
+            tif = "Gtc"
         else:
             raise ValueError("Unknown order type: {}".format(signal["order_type"]))
-        
-        if result.get("status") != "ok":
-            logger.error("❌ Main order failed, not placing SL/TP")
-            return result
-        
-        # Place stop loss if provided
-        sl_order_id = None
-        if "stop_loss" in signal and signal["stop_loss"] is not None:
+        legs = ["entry"]
+        requests = [order_request(symbol, is_buy, size, limit_price, {"limit": {"tif": tif}}, signal.get("reduce_only", False))]
+
+        # Stop loss and take profit ride in the same request, as reduce-only triggers on the entry
+        if signal.get("stop_loss") is not None:
             sl_trigger = round_price(signal["stop_loss"], symbol)
-            # For a long, order price should be even lower; for a short, even higher
-            if is_buy:
-                sl_order_price = round_price(sl_trigger * 0.99, symbol)  # 1% below trigger
-            else:
-                sl_order_price = round_price(sl_trigger * 1.01, symbol)  # 1% above trigger
-            logger.info(f"Attempting to place stop loss order: trigger={sl_trigger}, order_price={sl_order_price}")
-            stop_order_type = {
-                "trigger": {
-                    "triggerPx": sl_trigger,
-                    "isMarket": True,
-                    "tpsl": "sl"
-                }
-            }
-            sl_result = exchange.order(
-                symbol,
-                not is_buy,  # Opposite side of main order
-                size,
-                sl_order_price,
-                stop_order_type,
-                reduce_only=True
-            )
-            logger.info("Stop loss order result: %s", sl_result)
-            if sl_result.get("status") == "ok" and "resting" in sl_result["response"]["data"]["statuses"][0]:
-                sl_order_id = sl_result["response"]["data"]["statuses"][0]["resting"]["oid"]
-            elif "error" in sl_result["response"]["data"]["statuses"][0]:
-                logger.error(f"Stop loss order error: {sl_result['response']['data']['statuses'][0]['error']}")
-        
-        # Place take profit if provided
-        tp_order_id = None
-        if "take_profit" in signal and signal["take_profit"] is not None:
+            logger.info(f"Adding stop loss: trigger={sl_trigger}")
+            legs.append("sl")
+            requests.append(trigger_order(symbol, is_buy, size, sl_trigger, "sl"))
+        if signal.get("take_profit") is not None:
             tp_trigger = round_price(signal["take_profit"], symbol)
-            # For a long, order price should be even higher; for a short, even lower
-            if is_buy:
-                tp_order_price = round_price(tp_trigger * 1.01, symbol)  # 1% above trigger
-            else:
-                tp_order_price = round_price(tp_trigger * 0.99, symbol)  # 1% below trigger
-            logger.info(f"Attempting to place take profit order: trigger={tp_trigger}, order_price={tp_order_price}")
-            tp_order_type = {
-                "trigger": {
-                    "triggerPx": tp_trigger,
-                    "isMarket": True,
-                    "tpsl": "tp"
-                }
-            }
-            tp_result = exchange.order(
-                symbol,
-                not is_buy,  # Opposite side of main order
-                size,
-                tp_order_price,
-                tp_order_type,
-                reduce_only=True
-            )
-            logger.info("Take profit order result: %s", tp_result)
-            if tp_result.get("status") == "ok" and "resting" in tp_result["response"]["data"]["statuses"][0]:
-                tp_order_id = tp_result["response"]["data"]["statuses"][0]["resting"]["oid"]
-            elif "error" in tp_result["response"]["data"]["statuses"][0]:
-                logger.error(f"Take profit order error: {tp_result['response']['data']['statuses'][0]['error']}")
-        
+            logger.info(f"Adding take profit: trigger={tp_trigger}")
+            legs.append("tp")
+            requests.append(trigger_order(symbol, is_buy, size, tp_trigger, "tp"))
+
+        # One round trip: with normalTpsl grouping the triggers are only live once the entry fills
+        grouping = "normalTpsl" if len(requests) > 1 else "na"
+        result = session.get().exchange.bulk_orders(requests, grouping=grouping)
+        # Positions and margin change with whatever fills; the fills feed catches later ones
+        user_state.invalidate()
+        logger.info("%s order result: %s", signal["order_type"].capitalize(), result)
+
+        statuses = result["response"]["data"]["statuses"] if result.get("status") == "ok" else []
+        leg_statuses = {leg: leg_status(status) for leg, status in zip(legs, statuses)}
+        for leg in leg_statuses.values():
+            if leg["oid"] is not None:
+                orders.track(leg["oid"], symbol, size, leg["status"])
+        if "entry" not in leg_statuses or leg_statuses["entry"]["status"] == "error":
+            logger.error("❌ Entry order failed, SL/TP rejected with it")
+            return result
+        for leg in ("sl", "tp"):
+            if leg_statuses.get(leg, {}).get("status") == "error":
+                logger.error(f"{leg.upper()} order error: {leg_statuses[leg]['error']}")
+
         return {
-            "main_order": result,
-            "sl_order_id": sl_order_id,
-            "tp_order_id": tp_order_id
+            # Shaped like a single order response, as before
+            "main_order": {"status": "ok", "response": {"type": "order", "data": {"statuses": statuses[:1]}}},
+            "sl_order_id": leg_statuses.get("sl", {}).get("oid"),
+            "tp_order_id": leg_statuses.get("tp", {}).get("oid"),
+            "legs": leg_statuses
         }
     except ServerError as e:
         logger.error(f"Hyperliquid API error: {str(e)}")
@@ -150,12 +290,24 @@ def execute_trade(signal):
         logger.error(f"Error executing trade: {str(e)}")
         raise
 
+def wait_for_fill(result, timeout=10):
+    """Wait for the entry of an execute_trade result to fill; True once it has"""
+    oid = result.get("legs", {}).get("entry", {}).get("oid") if isinstance(result, dict) else None
+    if oid is None:
+        return False
+    order = orders.wait_for_fill(oid, timeout)
+    if order is None:
+        logger.warning(f"Order {oid} not filled after {timeout}s")
+        return False
+    logger.info("Order %s done: %s", oid, order)
+    return order.state == FILLED
+
 def cancel_order(symbol, order_id):
     """
     Cancels an order on Hyperliquid by its order ID.
     """
     try:
-        result = exchange.cancel(symbol, order_id)
+        result = session.get().exchange.cancel(symbol, order_id)
         logger.info(f"Cancel order result for {order_id}: %s", result)
         return result
     except ServerError as e:
@@ -0,0 +1,192 @@
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from indicators import TechnicalIndicators
+
+try:
+    import ta
+except ImportError:  # accuracy columns are skipped without it
+    ta = None
+
+BASELINES_FILE = Path(__file__).with_name('indicator_benchmark_baselines.json')
+# Pass --sizes 1e7 as well on machines with 8GB+ of memory
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+
+def synthetic_ohlcv(n, seed=42):
+    """Random-walk OHLCV bars at 1-minute spacing"""
+    rng = np.random.default_rng(seed)
+    close = 60000 + np.cumsum(rng.normal(0, 40, n))
+    open_ = np.concatenate(([close[0]], close[:-1])) + rng.normal(0, 5, n)
+    high = np.maximum(open_, close) + rng.uniform(0, 30, n)
+    low = np.minimum(open_, close) - rng.uniform(0, 30, n)
+    volume = rng.uniform(1e5, 5e6, n)
+    index = pd.date_range('2024-01-01', periods=n, freq='1min', name='timestamp')
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}, index=index)
+
+
+def ta_reference(df, column):
+    """The `ta` library's version of one of our indicator columns"""
+    if column == 'vwap':
+        # A window covering the whole frame makes ta's rolling VWAP cumulative like ours
+        return ta.volume.VolumeWeightedAveragePrice(
+            df['high'], df['low'], df['close'], df['volume'], window=len(df)
+        ).volume_weighted_average_price()
+    if column == 'rsi':
+        # ta's RSIIndicator uses Wilder's smoothing, ours a simple average, so build ours from ta's SMA
+        delta = df['close'].diff()
+        gain = ta.trend.SMAIndicator(delta.where(delta > 0, 0), window=14).sma_indicator()
+        loss = ta.trend.SMAIndicator(-delta.where(delta < 0, 0), window=14).sma_indicator()
+        return 100 - 100 / (1 + gain / loss)
+    if column.startswith('volume_ma_'):
+        return ta.trend.SMAIndicator(df['volume'], window=int(column.rsplit('_', 1)[1])).sma_indicator()
+    if column.startswith('ema_'):
+        return ta.trend.EMAIndicator(df['close'], window=int(column.rsplit('_', 1)[1])).ema_indicator()
+    raise KeyError(column)
+
+
+def prepare_raw(df):
+    return df.copy()
+
+
+def prepare_with_rsi(df):
+    return TechnicalIndicators.calculate_rsi(df.copy())
+
+
+def prepare_indicators(df):
+    return TechnicalIndicators.calculate_all_indicators(df.copy())
+
+
+# name -> (function, input preparation, columns compared against ta)
+BENCHMARKS = {
+    'calculate_vwap': (TechnicalIndicators.calculate_vwap, prepare_raw, ('vwap',)),
+    'calculate_rsi': (TechnicalIndicators.calculate_rsi, prepare_raw, ('rsi',)),
+    'calculate_volume': (TechnicalIndicators.calculate_volume, prepare_raw, ('volume_ma_5', 'volume_ma_20')),
+    'calculate_cvd': (TechnicalIndicators.calculate_cvd, prepare_raw, ()),
+    'calculate_momentum_indicators': (TechnicalIndicators.calculate_momentum_indicators, prepare_with_rsi, ('ema_5', 'ema_20')),
+    'calculate_ema': (TechnicalIndicators.calculate_ema, prepare_raw, ('ema_5', 'ema_20')),
+    'calculate_all_indicators': (
+        TechnicalIndicators.calculate_all_indicators, prepare_raw,
+        ('vwap', 'rsi', 'volume_ma_5', 'volume_ma_20', 'ema_5', 'ema_20')
+    ),
+    'scan_long_setup': (TechnicalIndicators.scan_long_setup, prepare_indicators, ()),
+    'scan_momentum_breakout': (TechnicalIndicators.scan_momentum_breakout, prepare_indicators, ()),
+}
+
+
+def relative_deviations(result, df, columns):
+    """Largest relative difference from ta of each column, over rows where both sides are defined.
+
+    Kept per column so a large deviation in one can't hide a regression in another.
+    """
+    if ta is None or not columns:
+        return None
+    deviations = {}
+    for column in columns:
+        ours = result[column].to_numpy(dtype=np.float64)
+        reference = ta_reference(df, column).to_numpy(dtype=np.float64)
+        both = np.isfinite(ours) & np.isfinite(reference) & (reference != 0)
+        deviations[column] = float(np.max(np.abs(ours[both] - reference[both]) / np.abs(reference[both]))) if both.any() else 0.0
+    return deviations
+
+
+def run_benchmark(name, df, repeats):
+    """Time, peak memory and ta deviation of one function on one frame"""
+    function, prepare, columns = BENCHMARKS[name]
+
+    best = float('inf')
+    for _ in range(repeats):
+        data = prepare(df)
+        start = time.perf_counter()
+        function(data)
+        best = min(best, time.perf_counter() - start)
+        # Drop the copy before building the next one so large sizes fit in memory
+        del data
+
+    data = prepare(df)
+    tracemalloc.start()
+    result = function(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+
+    return {
+        'seconds': best,
+        'peak_bytes': peak,
+        'deviation': relative_deviations(result, df, columns),
+    }
+
+
+def find_regressions(key, result, baseline, time_tolerance, memory_tolerance):
+    """Compare one result with its stored baseline"""
+    problems = []
+    # Ignore sub-millisecond jitter on the small sizes
+    if result['seconds'] > baseline['seconds'] * time_tolerance and result['seconds'] - baseline['seconds'] > 0.001:
+        problems.append(f"{key}: {result['seconds']*1000:.1f}ms vs baseline {baseline['seconds']*1000:.1f}ms")
+    if result['peak_bytes'] > baseline['peak_bytes'] * memory_tolerance:
+        problems.append(f"{key}: peak {result['peak_bytes']/1e6:.1f}MB vs baseline {baseline['peak_bytes']/1e6:.1f}MB")
+    if result['deviation'] and isinstance(baseline.get('deviation'), dict):
+        for column, deviation in result['deviation'].items():
+            allowed = baseline['deviation'].get(column)
+            if allowed is not None and deviation > allowed + 1e-9:
+                problems.append(f"{key}: {column} deviation from ta {deviation:.2e} vs baseline {allowed:.2e}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TechnicalIndicators against the ta library")
+    parser.add_argument('--sizes', type=float, nargs='+', default=DEFAULT_SIZES, help="Bar counts to benchmark")
+    parser.add_argument('--functions', nargs='+', default=list(BENCHMARKS), choices=list(BENCHMARKS))
+    parser.add_argument('--repeats', type=int, default=3, help="Timing runs per function (best is kept)")
+    parser.add_argument('--update-baselines', action='store_true', help="Store these results as the new baselines")
+    parser.add_argument('--time-tolerance', type=float, default=1.5, help="Allowed slowdown factor before flagging")
+    parser.add_argument('--memory-tolerance', type=float, default=1.2, help="Allowed peak memory growth factor")
+    args = parser.parse_args()
+
+    baselines = json.loads(BASELINES_FILE.read_text()) if BASELINES_FILE.exists() else {}
+    if ta is None:
+        print("ta is not installed: accuracy checks are skipped")
+
+    results = {}
+    regressions = []
+    print(f"\n{'function':<32}{'bars':>12}{'time (ms)':>12}{'peak (MB)':>12}{'vs ta':>12}{'baseline':>12}")
+    for size in (int(size) for size in args.sizes):
+        df = synthetic_ohlcv(size)
+        # One repeat is plenty once a single run takes seconds
+        repeats = args.repeats if size <= 100_000 else 1
+        for name in args.functions:
+            key = f"{name}@{size}"
+            result = run_benchmark(name, df, repeats)
+            results[key] = result
+
+            baseline = baselines.get(key)
+            status = 'new'
+            if baseline:
+                problems = find_regressions(key, result, baseline, args.time_tolerance, args.memory_tolerance)
+                regressions.extend(problems)
+                status = 'REGRESSED' if problems else 'ok'
+            print(f"{name:<32}{size:>12,}{result['seconds']*1000:>12.2f}{result['peak_bytes']/1e6:>12.1f}{'':>12}{status:>12}")
+            for column, deviation in (result['deviation'] or {}).items():
+                print(f"{'  ' + column:<32}{'':>36}{deviation:>12.1e}")
+
+    if args.update_baselines:
+        baselines.update(results)
+        BASELINES_FILE.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"\n✓ Baselines written to {BASELINES_FILE.name}")
+
+    if regressions:
+        print("\n✗ Regressions against stored baselines:")
+        for problem in regressions:
+            print(f"  - {problem}")
+        return 1
+    print("\n✓ No regressions against stored baselines")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
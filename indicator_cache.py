@@ -0,0 +1,93 @@
+from collections import OrderedDict, namedtuple
+import numpy as np
+import pandas as pd
+from indicators import TechnicalIndicators
+from indicator_engine import IndicatorEngine
+import indicator_kernels
+
+# Indicator columns of the closed bars plus an engine holding their state
+CacheEntry = namedtuple('CacheEntry', ['closed', 'engine', 'computed'])
+
+
+class IndicatorCache:
+    """Bounded LRU cache of indicator frames for repeatedly polled kline series.
+
+    Klines from Binance end with the bar that is still forming, so only the
+    bars before it are cached. They are keyed by (symbol, interval, first bar,
+    last closed bar, indicator set). On a hit the forming bar is applied
+    provisionally to an IndicatorEngine warmed up on the closed bars, so only
+    that one row is recomputed instead of the whole frame. Series with
+    zero-volume closed bars are not cached, since their filled volumes
+    depend on the forming bar.
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        """Hit/miss counters for logging"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self.entries),
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _compute(df, columns):
+        if columns:
+            return TechnicalIndicators.calculate_indicators(df, columns)
+        return TechnicalIndicators.calculate_all_indicators(df)
+
+    def indicators(self, symbol, interval, df, columns=None):
+        """Indicator frame for `df`, as calculate_indicators/calculate_all_indicators would return it.
+
+        The last row of `df` is treated as the forming bar.
+        """
+        if len(df) < 2:
+            return self._compute(df, columns)
+
+        columns = tuple(columns) if columns else None
+        key = (symbol, interval, df.index[0], df.index[-2], columns)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            result = self._compute(df, columns)
+            volume = df['volume'].to_numpy(dtype=np.float64)[:-1]
+            if ((volume == 0) | np.isnan(volume)).any():
+                # Those bars are filled with the mean volume of the whole frame, forming bar
+                # included, so their rows change with it and can't be reused on a hit
+                return result
+            if columns:
+                computed = {name for name in columns if name in indicator_kernels.INDICATORS}
+            else:
+                computed = set(IndicatorEngine.COLUMNS) | {'volume'}
+            engine = IndicatorEngine.from_frame(df.iloc[:-1])
+            closed = {name: values.to_numpy()[:-1] for name, values in result.items()}
+            self.entries[key] = CacheEntry(closed, engine, computed)
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            return result
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        forming = df.iloc[-1]
+        row = entry.engine.update_provisional(forming)
+        data = {
+            # Other columns are read one by one: a row of `df` would turn int64 columns to float64
+            name: np.append(values, row[name] if name in entry.computed else df[name].iloc[-1])
+            for name, values in entry.closed.items()
+        }
+        return pd.DataFrame(data, index=df.index, copy=False)
@@ -0,0 +1,325 @@
+from collections import deque
+import math
+import numpy as np
+from indicators import TechnicalIndicators
+import indicator_kernels
+
+# Marker for "no value was evicted" in checkpoints
+_NOTHING = object()
+
+
+def _div(numerator, denominator):
+    """Divide like pandas does (x/0 -> +/-inf, 0/0 -> NaN) instead of raising"""
+    if denominator == 0 or math.isnan(denominator) or math.isnan(numerator):
+        if math.isnan(numerator) or math.isnan(denominator) or numerator == 0:
+            return math.nan
+        return math.copysign(math.inf, numerator) * math.copysign(1.0, denominator)
+    return numerator / denominator
+
+
+def _pct_change(current, previous):
+    """Series.pct_change() for a single step"""
+    if math.isnan(current) or math.isnan(previous):
+        return math.nan
+    return _div(current, previous) - 1
+
+
+class RollingMean:
+    """Rolling mean over a fixed window, updated in O(1) per value.
+
+    Uses the same Kahan-compensated add/remove scheme as pandas' rolling mean,
+    so results agree with Series.rolling(window, min_periods).mean().
+    """
+
+    def __init__(self, window, min_periods=None):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self.values = deque()
+        self.nobs = 0
+        self.total = 0.0
+        self.compensation = 0.0
+
+    def _add(self, value):
+        if value == value:
+            self.nobs += 1
+            y = value - self.compensation
+            t = self.total + y
+            self.compensation = t - self.total - y
+            self.total = t
+
+    def _remove(self, value):
+        if value == value:
+            self.nobs -= 1
+            y = -value - self.compensation
+            t = self.total + y
+            self.compensation = t - self.total - y
+            self.total = t
+
+    def push(self, value):
+        """Add a value to the window and return the new mean"""
+        self.values.append(value)
+        if len(self.values) > self.window:
+            self._remove(self.values.popleft())
+        self._add(value)
+        return self.mean()
+
+    def mean(self):
+        if self.nobs >= self.min_periods and self.nobs > 0:
+            return self.total / self.nobs
+        return math.nan
+
+    def checkpoint(self):
+        """Capture the state needed to undo the next push"""
+        evicted = self.values[0] if len(self.values) == self.window else _NOTHING
+        return self.nobs, self.total, self.compensation, evicted
+
+    def restore(self, state):
+        """Undo the single push made since checkpoint() was taken"""
+        self.nobs, self.total, self.compensation, evicted = state
+        self.values.pop()
+        if evicted is not _NOTHING:
+            self.values.appendleft(evicted)
+
+
+class ExponentialMean:
+    """Equivalent of Series.ewm(span=span, adjust=False).mean(), one value at a time"""
+
+    def __init__(self, span):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = math.nan
+
+    def push(self, value):
+        if math.isnan(self.value):
+            self.value = value
+        elif value == value and self.value != value:
+            # Same arithmetic as pandas' ewm kernel for adjust=False
+            old_wt = 1.0 - self.alpha
+            self.value = (old_wt * self.value + self.alpha * value) / (old_wt + self.alpha)
+        return self.value
+
+    def checkpoint(self):
+        return self.value
+
+    def restore(self, state):
+        self.value = state
+
+
+class IndicatorEngine:
+    """Streaming counterpart of TechnicalIndicators.calculate_all_indicators.
+
+    Holds running sums, EMA state and rolling-window buffers so each new bar
+    is processed in O(1) instead of recomputing the whole history. Every
+    column produced by the batch functions is produced here with the same
+    semantics, with one exception: zero volumes are filled with the mean of
+    the volumes seen so far rather than the mean of the whole frame, since
+    future bars are not known yet.
+
+    The still-forming bar can be fed through update_provisional() as often as
+    it changes. Each provisional update rolls back the previous one in O(1),
+    and commit() (or update() with the closed bar) makes it permanent.
+    """
+
+    COLUMNS = indicator_kernels.COLUMNS
+
+    def __init__(self, rsi_period=14, volume_lookback=5):
+        self.rsi_period = rsi_period
+        self.volume_lookback = volume_lookback
+
+        # VWAP running sums
+        self.cumulative_volume = 0.0
+        self.cumulative_pv = 0.0
+
+        # RSI windows over gains/losses
+        self.gain_window = RollingMean(rsi_period)
+        self.loss_window = RollingMean(rsi_period)
+
+        # Volume state
+        self.raw_volume_total = 0.0
+        self.raw_volume_count = 0
+        self.volume_ma_short = RollingMean(volume_lookback, min_periods=1)
+        self.volume_ma_long = RollingMean(20, min_periods=1)
+        self.volume_ma_3 = RollingMean(3)
+
+        # CVD state
+        self.cvd = 0.0
+        self.cvd_ma_5 = RollingMean(5)
+        self.cvd_ma_20 = RollingMean(20)
+
+        # Momentum state
+        self.ema_5 = ExponentialMean(5)
+        self.ema_20 = ExponentialMean(20)
+        self.rsi_ma_3 = RollingMean(3)
+
+        # Last three rows, enough for every signal check
+        self.rows = deque(maxlen=3)
+        self.bar_count = 0
+
+        # Undo information for the in-progress bar, if one is applied
+        self._provisional = None
+
+    @classmethod
+    def from_frame(cls, df, **kwargs):
+        """Build an engine and replay an OHLCV DataFrame through it"""
+        engine = cls(**kwargs)
+        for bar in df[['open', 'high', 'low', 'close', 'volume']].itertuples(index=False):
+            engine.update(bar._asdict())
+        return engine
+
+    @property
+    def latest(self):
+        """Most recent indicator row, or None before the first bar"""
+        return self.rows[-1] if self.rows else None
+
+    @property
+    def is_provisional(self):
+        """True while the latest row belongs to a bar that has not closed yet"""
+        return self._provisional is not None
+
+    def _windows(self):
+        return (
+            self.gain_window, self.loss_window, self.volume_ma_short, self.volume_ma_long,
+            self.volume_ma_3, self.cvd_ma_5, self.cvd_ma_20, self.ema_5, self.ema_20, self.rsi_ma_3
+        )
+
+    def _checkpoint(self):
+        scalars = (
+            self.cumulative_volume, self.cumulative_pv, self.raw_volume_total,
+            self.raw_volume_count, self.cvd, self.bar_count
+        )
+        evicted_row = self.rows[0] if len(self.rows) == self.rows.maxlen else _NOTHING
+        return scalars, [window.checkpoint() for window in self._windows()], evicted_row
+
+    def _restore(self, checkpoint):
+        scalars, window_states, evicted_row = checkpoint
+        (self.cumulative_volume, self.cumulative_pv, self.raw_volume_total,
+         self.raw_volume_count, self.cvd, self.bar_count) = scalars
+        for window, state in zip(self._windows(), window_states):
+            window.restore(state)
+        self.rows.pop()
+        if evicted_row is not _NOTHING:
+            self.rows.appendleft(evicted_row)
+
+    def rollback(self):
+        """Discard the provisional bar, returning to the last committed state"""
+        if self._provisional is not None:
+            self._restore(self._provisional)
+            self._provisional = None
+
+    def update_provisional(self, bar):
+        """Apply the in-progress bar, replacing any earlier provisional version of it"""
+        self.rollback()
+        checkpoint = self._checkpoint()
+        row = self._apply(bar)
+        self._provisional = checkpoint
+        return row
+
+    def commit(self, bar=None):
+        """Close the in-progress bar, optionally with its final values"""
+        if bar is not None:
+            return self.update(bar)
+        self._provisional = None
+        return self.latest
+
+    def check_long_setup(self):
+        """Evaluate TechnicalIndicators.check_long_setup on the current rows"""
+        if len(self.rows) < 3:
+            return False, None
+        return TechnicalIndicators.long_setup_from_rows(self.rows[-1], self.rows[-2], self.rows[-3])
+
+    def check_momentum_breakout(self):
+        """Evaluate TechnicalIndicators.check_momentum_breakout on the current rows"""
+        if self.bar_count < 20:
+            return None
+        return TechnicalIndicators.momentum_breakout_from_rows(self.rows[-1], self.rows[-2])
+
+    def _fill_volume(self, volume):
+        """Replace a zero/NaN volume with the running mean of real volumes"""
+        if volume == 0 or math.isnan(volume):
+            if self.raw_volume_count == 0:
+                return math.nan
+            return self.raw_volume_total / self.raw_volume_count
+        self.raw_volume_total += volume
+        self.raw_volume_count += 1
+        return volume
+
+    def update(self, bar):
+        """Process one closed bar (mapping with open/high/low/close/volume) and return its indicator row"""
+        self.rollback()
+        return self._apply(bar)
+
+    def _apply(self, bar):
+        open_ = float(bar['open'])
+        high = float(bar['high'])
+        low = float(bar['low'])
+        close = float(bar['close'])
+        raw_volume = float(bar['volume'])
+        prev = self.rows[-1] if self.rows else None
+        prev_prev = self.rows[-2] if len(self.rows) > 1 else None
+
+        row = {'open': open_, 'high': high, 'low': low, 'close': close}
+
+        # VWAP (computed on the raw volume, as in calculate_vwap)
+        typical_price = (high + low + close) / 3
+        if raw_volume == raw_volume:
+            self.cumulative_volume += raw_volume
+            self.cumulative_pv += typical_price * raw_volume
+        row['typical_price'] = typical_price
+        row['cumulative_volume'] = self.cumulative_volume
+        row['cumulative_pv'] = self.cumulative_pv
+        row['vwap'] = _div(self.cumulative_pv, self.cumulative_volume)
+        row['vwap_reclaim'] = bool(
+            prev is not None and close > row['vwap'] and prev['close'] <= prev['vwap']
+        )
+
+        # RSI (simple moving average of gains and losses)
+        delta = close - prev['close'] if prev is not None else math.nan
+        gain = self.gain_window.push(delta if delta > 0 else 0.0)
+        loss = self.loss_window.push(-delta if delta < 0 else 0.0)
+        rs = _div(gain, loss)
+        row['rsi'] = math.nan if math.isnan(rs) else 100 - (100 / (1 + rs))
+        row['rsi_cross_50'] = bool(prev is not None and row['rsi'] > 50 and prev['rsi'] <= 50)
+
+        # Volume metrics
+        volume = self._fill_volume(raw_volume)
+        row['volume'] = volume
+        row['volume_ma_5'] = self.volume_ma_short.push(volume)
+        row['volume_ma_20'] = self.volume_ma_long.push(volume)
+        row['volume_ratio_5'] = _div(volume, row['volume_ma_5'])
+        row['volume_ratio_20'] = _div(volume, row['volume_ma_20'])
+        row['rising_volume_short'] = volume > row['volume_ma_5']
+        row['rising_volume_long'] = volume > row['volume_ma_20']
+        row['rising_volume'] = row['rising_volume_short'] and row['rising_volume_long']
+        row['relative_volume'] = float(np.round(row['volume_ratio_5'], 2))
+
+        # CVD
+        if close > open_:
+            volume_delta = volume
+        elif close < open_:
+            volume_delta = -volume
+        else:
+            volume_delta = 0.0
+        self.cvd += volume_delta
+        row['volume_delta'] = volume_delta
+        row['cvd'] = self.cvd
+        row['cvd_ma5'] = self.cvd_ma_5.push(self.cvd)
+        row['cvd_ma20'] = self.cvd_ma_20.push(self.cvd)
+
+        # Momentum indicators
+        row['ema_5'] = self.ema_5.push(close)
+        row['ema_20'] = self.ema_20.push(close)
+        row['higher_high'] = bool(
+            prev_prev is not None and high > prev['high'] and prev['high'] > prev_prev['high']
+        )
+        row['higher_low'] = bool(
+            prev_prev is not None and low > prev['low'] and prev['low'] > prev_prev['low']
+        )
+        volume_ma_3 = self.volume_ma_3.push(volume)
+        rsi_ma_3 = self.rsi_ma_3.push(row['rsi'])
+        row['volume_trend'] = _pct_change(volume_ma_3, prev['_volume_ma_3']) if prev else math.nan
+        row['rsi_trend'] = _pct_change(rsi_ma_3, prev['_rsi_ma_3']) if prev else math.nan
+        row['_volume_ma_3'] = volume_ma_3
+        row['_rsi_ma_3'] = rsi_ma_3
+
+        self.rows.append(row)
+        self.bar_count += 1
+        return row
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import indicator_kernels
+from indicator_kernels import INDICATORS, SOURCES
+
+# Bars fetched when a requested column is anchored to the start of the frame
+# (VWAP, CVD): their values depend on the window, so keep the window the bot
+# has always used
+DEFAULT_ANCHOR_BARS = 100
+
+
+def warmup(column, indicators=INDICATORS):
+    """Bars of history needed before `column` is settled at the latest bar.
+
+    Returns None for columns anchored to the start of the frame, which never
+    settle and instead depend on how many bars were fetched.
+    """
+    if column in SOURCES:
+        return 1
+    node = indicators[column]
+    if node.anchored:
+        return None
+    bars = 1
+    for dependency in node.inputs:
+        dependency_bars = warmup(dependency, indicators)
+        if dependency_bars is None:
+            return None
+        bars = max(bars, dependency_bars)
+    return bars + node.lookback - 1
+
+
+def bars_needed(columns, anchor_bars=DEFAULT_ANCHOR_BARS, indicators=INDICATORS):
+    """Smallest number of bars to fetch so every requested column is usable at the last bar.
+
+    A signal compares the last bar with the one before it, so one extra bar
+    beyond the longest warm-up is included. Anchored columns need
+    anchor_bars instead.
+    """
+    bars = 2
+    for column in columns:
+        # Columns outside the graph (close, quote_volume, ...) come straight from the klines
+        column_bars = warmup(column, indicators) if column in indicators else 1
+        bars = max(bars, anchor_bars if column_bars is None else column_bars + 1)
+    return bars
+
+
+class LazyIndicators:
+    """Computes indicator columns of an OHLCV frame on first access.
+
+    Each column is computed at most once, together with only the nodes it
+    depends on, so strategies pay for the handful of columns they read.
+    """
+
+    def __init__(self, df, indicators=INDICATORS):
+        self.df = df
+        self.indicators = indicators
+        self.sources = {name: df[name].to_numpy(dtype=np.float64) for name in ('open', 'high', 'low', 'close')}
+        self.sources['raw_volume'] = df['volume'].to_numpy(dtype=np.float64)
+        self.cache = {}
+
+    def __getitem__(self, name):
+        return indicator_kernels.evaluate(self.sources, (name,), self.indicators, self.cache)[name]
+
+    def frame(self, columns):
+        """The original frame with the requested indicator columns added or replaced"""
+        columns = [name for name in columns if name in self.indicators]
+        computed = indicator_kernels.evaluate(self.sources, columns, self.indicators, self.cache)
+        data = {name: computed.pop(name) if name in computed else self.df[name] for name in self.df.columns}
+        data.update(computed)
+        return pd.DataFrame(data, index=self.df.index, copy=False)
@@ -0,0 +1,306 @@
+from collections import namedtuple
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Output columns of compute_all, in the order calculate_all_indicators adds them
+COLUMNS = (
+    'typical_price', 'cumulative_volume', 'cumulative_pv', 'vwap', 'vwap_reclaim',
+    'rsi', 'rsi_cross_50',
+    'volume_ma_5', 'volume_ma_20', 'volume_ratio_5', 'volume_ratio_20', 'volume_trend',
+    'rising_volume_short', 'rising_volume_long', 'rising_volume', 'relative_volume',
+    'volume_delta', 'cvd', 'cvd_ma5', 'cvd_ma20',
+    'ema_5', 'ema_20', 'higher_high', 'higher_low', 'rsi_trend'
+)
+
+# Upper bound on the block length of the vectorized EMA scan
+EMA_MAX_BLOCK = 1024
+
+
+def shift(x, periods=1):
+    """Series.shift() along axis 0, padding with NaN"""
+    out = np.empty_like(x, dtype=np.float64)
+    out[:periods] = np.nan
+    out[periods:] = x[:-periods]
+    return out
+
+
+def cumsum(x):
+    """Series.cumsum() along axis 0: NaNs are skipped but stay NaN in the output"""
+    out = np.nancumsum(x, axis=0)
+    out[np.isnan(x)] = np.nan
+    return out
+
+
+def pct_change(x):
+    """Series.pct_change() along axis 0"""
+    return x / shift(x) - 1
+
+
+def rolling_mean(x, window, min_periods=None):
+    """Series.rolling(window, min_periods).mean() along axis 0"""
+    if min_periods is None:
+        min_periods = window
+    n = x.shape[0]
+    out = np.full(x.shape, np.nan)
+    if n == 0:
+        return out
+
+    has_nan = min_periods < window and np.isnan(x).any()
+    if n >= window:
+        if has_nan:
+            windows = sliding_window_view(x, window, axis=0)
+            counts = (~np.isnan(windows)).sum(axis=-1)
+            sums = np.nansum(windows, axis=-1)
+            out[window - 1:] = np.where(counts >= min_periods, sums / np.maximum(counts, 1), np.nan)
+        else:
+            # Sum the window as `window` shifted slices: contiguous adds, no
+            # cumsum cancellation, and a NaN anywhere in the window propagates
+            # just like min_periods == window
+            sums = x[window - 1:].astype(np.float64)
+            for lag in range(1, window):
+                sums += x[window - 1 - lag:n - lag]
+            out[window - 1:] = sums / window
+
+    # Partial windows at the start only count when min_periods allows it
+    head = min(window - 1, n)
+    if min_periods < window and head > 0:
+        valid = ~np.isnan(x[:head])
+        counts = np.cumsum(valid, axis=0)
+        sums = np.cumsum(np.where(valid, x[:head], 0.0), axis=0)
+        out[:head] = np.where(counts >= min_periods, sums / np.maximum(counts, 1), np.nan)
+    return out
+
+
+def ewm_mean(x, span):
+    """Series.ewm(span=span, adjust=False).mean() along axis 0.
+
+    The recurrence y[t] = (1 - a) * y[t-1] + a * x[t] is solved in blocks:
+    each block is evaluated with a weighted cumsum, and only the carry between
+    blocks is propagated sequentially. x must not contain NaNs.
+    """
+    n = x.shape[0]
+    alpha = 2.0 / (span + 1.0)
+    beta = 1.0 - alpha
+    if n == 0 or beta == 0:
+        return x.astype(np.float64)
+
+    # Keep beta ** -block well inside float64 range
+    block = int(min(EMA_MAX_BLOCK, 100 * np.log(10) / -np.log(beta), n))
+    block = max(block, 1)
+
+    flat = x.reshape(n, -1)
+    width = flat.shape[1]
+    n_blocks = -(-n // block)
+    blocks = np.zeros((n_blocks * block, width))
+    blocks[:n] = flat
+    blocks = blocks.reshape(n_blocks, block, width)
+
+    # Contribution of each block's own inputs, assuming a zero starting value
+    j = np.arange(block)
+    local = np.cumsum(blocks * (beta ** -j)[:, None], axis=1)
+    local *= (alpha * beta ** j)[:, None]
+
+    # Value carried into each block; seeding with x[0] makes y[0] == x[0]
+    carry = np.empty((n_blocks, width))
+    prev = flat[0].astype(np.float64)
+    step = beta ** block
+    for b in range(n_blocks):
+        carry[b] = prev
+        prev = step * prev + local[b, -1]
+
+    local += (beta ** (j + 1))[:, None] * carry[:, None, :]
+    return local.reshape(n_blocks * block, width)[:n].reshape(x.shape)
+
+
+def fill_volume(volume):
+    """Replace zero/missing volumes with the mean volume, as calculate_volume does"""
+    filled = np.where(volume == 0, np.nan, volume)
+    return np.where(np.isnan(filled), np.nanmean(filled, axis=0), filled)
+
+
+# One node of the indicator graph. `inputs` names the sources or other nodes
+# passed to `compute`, `lookback` is how many bars of those inputs one output
+# bar reads, and `anchored` marks running totals that depend on where the
+# frame starts rather than on a fixed window.
+Indicator = namedtuple('Indicator', ['inputs', 'lookback', 'compute', 'anchored'], defaults=(False,))
+
+# Raw arrays the graph is built from; 'raw_volume' is the volume before zero-filling
+SOURCES = ('open', 'high', 'low', 'close', 'raw_volume')
+
+# Bars after which an EMA's starting value carries less than ~0.2% weight, in spans
+EMA_SETTLE_SPANS = 4
+
+
+def build_indicators(rsi_period=14, volume_lookback=5):
+    """Describe every indicator column of calculate_all_indicators as a graph node"""
+    return {
+        # VWAP uses the raw volume, before zero-filling
+        'typical_price': Indicator(('high', 'low', 'close'), 1, lambda high, low, close: (high + low + close) / 3),
+        'cumulative_volume': Indicator(('raw_volume',), 1, cumsum, anchored=True),
+        'cumulative_pv': Indicator(('typical_price', 'raw_volume'), 1, lambda tp, volume: cumsum(tp * volume), anchored=True),
+        'vwap': Indicator(('cumulative_pv', 'cumulative_volume'), 1, np.divide),
+        'vwap_reclaim': Indicator(('close', 'vwap'), 2, lambda close, vwap: (close > vwap) & (shift(close) <= shift(vwap))),
+
+        # RSI (simple moving average of gains and losses)
+        '_close_delta': Indicator(('close',), 2, lambda close: close - shift(close)),
+        '_rsi_gain': Indicator(('_close_delta',), rsi_period, lambda delta: rolling_mean(np.where(delta > 0, delta, 0.0), rsi_period)),
+        '_rsi_loss': Indicator(('_close_delta',), rsi_period, lambda delta: rolling_mean(np.where(delta < 0, -delta, 0.0), rsi_period)),
+        'rsi': Indicator(('_rsi_gain', '_rsi_loss'), 1, lambda gain, loss: 100 - (100 / (1 + gain / loss))),
+        'rsi_cross_50': Indicator(('rsi',), 2, lambda rsi: (rsi > 50) & (shift(rsi) <= 50)),
+
+        # Volume, with zero/missing bars filled by the mean volume
+        'volume': Indicator(('raw_volume',), 1, fill_volume),
+        'volume_ma_5': Indicator(('volume',), volume_lookback, lambda volume: rolling_mean(volume, volume_lookback, min_periods=1)),
+        'volume_ma_20': Indicator(('volume',), 20, lambda volume: rolling_mean(volume, 20, min_periods=1)),
+        'volume_ratio_5': Indicator(('volume', 'volume_ma_5'), 1, np.divide),
+        'volume_ratio_20': Indicator(('volume', 'volume_ma_20'), 1, np.divide),
+        '_volume_ma_3': Indicator(('volume',), 3, lambda volume: rolling_mean(volume, 3)),
+        'volume_trend': Indicator(('_volume_ma_3',), 2, pct_change),
+        'rising_volume_short': Indicator(('volume', 'volume_ma_5'), 1, np.greater),
+        'rising_volume_long': Indicator(('volume', 'volume_ma_20'), 1, np.greater),
+        'rising_volume': Indicator(('rising_volume_short', 'rising_volume_long'), 1, np.logical_and),
+        'relative_volume': Indicator(('volume_ratio_5',), 1, lambda ratio: np.round(ratio, 2)),
+
+        # CVD
+        'volume_delta': Indicator(('open', 'close', 'volume'), 1, lambda open_, close, volume: np.where(
+            close > open_, volume, np.where(close < open_, -volume, 0.0))),
+        'cvd': Indicator(('volume_delta',), 1, cumsum, anchored=True),
+        'cvd_ma5': Indicator(('cvd',), 5, lambda cvd: rolling_mean(cvd, 5)),
+        'cvd_ma20': Indicator(('cvd',), 20, lambda cvd: rolling_mean(cvd, 20)),
+
+        # Momentum
+        'ema_5': Indicator(('close',), EMA_SETTLE_SPANS * 5, lambda close: ewm_mean(close, 5)),
+        'ema_20': Indicator(('close',), EMA_SETTLE_SPANS * 20, lambda close: ewm_mean(close, 20)),
+        'higher_high': Indicator(('high',), 3, lambda high: (high > shift(high)) & (shift(high) > shift(high, 2))),
+        'higher_low': Indicator(('low',), 3, lambda low: (low > shift(low)) & (shift(low) > shift(low, 2))),
+        '_rsi_ma_3': Indicator(('rsi',), 3, lambda rsi: rolling_mean(rsi, 3)),
+        'rsi_trend': Indicator(('_rsi_ma_3',), 2, pct_change),
+    }
+
+
+INDICATORS = build_indicators()
+
+
+def evaluate(sources, columns, indicators=INDICATORS, cache=None):
+    """Compute the requested columns and only the nodes they depend on.
+
+    sources maps each name in SOURCES to an array; cache, if given, is a dict
+    of already computed nodes that is reused and filled in.
+    """
+    cache = {} if cache is None else cache
+
+    def resolve(name):
+        if name not in cache:
+            if name in sources:
+                cache[name] = sources[name]
+            else:
+                node = indicators[name]
+                cache[name] = node.compute(*(resolve(dependency) for dependency in node.inputs))
+        return cache[name]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {name: resolve(name) for name in columns}
+
+
+def compute_all(open_, high, low, close, volume, rsi_period=14, volume_lookback=5):
+    """Compute every indicator of calculate_all_indicators in one pass over float64 arrays.
+
+    Inputs are arrays of equal shape along axis 0 (bars). Returns a dict with
+    the zero-filled 'volume' followed by each column in COLUMNS.
+    """
+    sources = {'open': open_, 'high': high, 'low': low, 'close': close, 'raw_volume': volume}
+    indicators = INDICATORS if (rsi_period, volume_lookback) == (14, 5) else build_indicators(rsi_period, volume_lookback)
+    return evaluate(sources, ('volume',) + COLUMNS, indicators)
+
+
+def long_setup_signals(close, vwap, volume, volume_ma_5, volume_ma_20, rsi, cvd):
+    """check_long_setup evaluated at every bar at once.
+
+    Bar t sees only bars up to t, exactly like calling check_long_setup on
+    df.iloc[:t+1]. Bars without enough history get False signals.
+    """
+    prev_cvd = shift(cvd)
+    signals = {
+        'vwap_reclaim': (close > vwap) & (shift(close) <= shift(vwap)),
+        'rising_volume': (volume > volume_ma_5) & (volume > volume_ma_20),
+        'rsi_cross_50': (rsi > 50) & (shift(rsi) <= 50),
+        'cvd_rising': (cvd > prev_cvd) & (prev_cvd > shift(cvd, 2)),
+    }
+    # Volume is reported but not required, as in check_long_setup
+    signals['has_signal'] = signals['vwap_reclaim'] & signals['rsi_cross_50'] & signals['cvd_rising']
+    signals['entry'] = close
+    signals['stop_loss'] = close * 0.99  # 1% stop loss
+    signals['target'] = close * 1.02  # 2% take profit
+    return signals
+
+
+def momentum_breakout_signals(close, high, low, ema_5, volume, volume_ma_5, volume_trend, rsi, min_bars=20):
+    """check_momentum_breakout evaluated at every bar at once.
+
+    has_signal combines the conditions the same way main.main does. Bars
+    before min_bars have all signals False, like check_momentum_breakout
+    returning None on short frames.
+    """
+    prev_rsi = shift(rsi)
+    signals = {
+        'price_above_ema': close > ema_5,
+        'higher_highs': high > shift(high),
+        'higher_lows': low > shift(low),
+        'volume_above_avg': volume > volume_ma_5,
+        'volume_trending': volume_trend > 0,
+        'rsi_above_threshold': rsi > 40,
+        'rsi_trending': rsi > prev_rsi,
+    }
+    signals['has_signal'] = (
+        signals['price_above_ema'] &
+        (signals['higher_highs'] | signals['higher_lows']) &
+        signals['volume_above_avg'] &
+        signals['rsi_above_threshold']
+    )
+    for name in signals:
+        signals[name][:min_bars - 1] = False
+    signals['entry'] = close
+    signals['stop_loss'] = close * 0.99  # 1% stop loss
+    signals['target'] = close * 1.02  # 2% take profit
+    with np.errstate(divide='ignore', invalid='ignore'):
+        signals['price_ema_diff'] = ((close - ema_5) / ema_5) * 100
+    return signals
+
+
+def panel_apply(func, arrays, valid, **kwargs):
+    """Run a single-series kernel over a 2-D (time x symbol) panel.
+
+    Each symbol's valid rows are packed to the top of its column, so ragged
+    starts and missing bars look exactly like that symbol's own history to
+    func. The results are scattered back to the panel layout, with NaN (or
+    False) wherever a symbol has no bar.
+    """
+    if valid.all():
+        return func(*arrays, **kwargs)
+
+    # Flat positions of packed row i of each symbol in the panel layout
+    order = np.argsort(~valid, axis=0, kind='stable')
+    flat_index = (order * valid.shape[1] + np.arange(valid.shape[1])).ravel()
+    packed = [x.ravel()[flat_index].reshape(x.shape) for x in arrays]
+    results = func(*packed, **kwargs)
+
+    n_valid = valid.sum(axis=0)
+    packed_valid = np.arange(valid.shape[0])[:, None] < n_valid[None, :]
+    out = {}
+    for name, values in results.items():
+        if values.dtype == bool:
+            values = values & packed_valid
+        else:
+            values = np.where(packed_valid, values, np.nan)
+        unpacked = np.empty_like(values)
+        unpacked.ravel()[flat_index] = values.ravel()
+        out[name] = unpacked
+    return out
+
+
+def compute_panel(open_, high, low, close, volume, rsi_period=14, volume_lookback=5):
+    """compute_all for N symbols at once on (time x symbol) arrays; a bar is missing where close is NaN"""
+    return panel_apply(
+        compute_all, (open_, high, low, close, volume), ~np.isnan(close),
+        rsi_period=rsi_period, volume_lookback=volume_lookback
+    )
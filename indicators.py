@@ -1,7 +1,13 @@
 import pandas as pd
 import numpy as np
+import indicator_kernels
+import indicator_graph
 
 class TechnicalIndicators:
+    # Columns each signal check reads, for calculate_indicators / indicator_graph.bars_needed
+    LONG_SETUP_COLUMNS = ('close', 'vwap', 'volume', 'volume_ma_5', 'volume_ma_20', 'rsi', 'cvd', 'volume_ratio_5')
+    MOMENTUM_BREAKOUT_COLUMNS = ('close', 'high', 'low', 'ema_5', 'volume', 'volume_ma_5', 'volume_trend', 'rsi', 'volume_ratio_5')
+
     @staticmethod
     def calculate_vwap(df):
         """Calculate VWAP and check for reclaim signal"""
@@ -84,9 +90,9 @@ class TechnicalIndicators:
         # Calculate volume delta for each bar
         # If close > open, volume is buying pressure
         # If close < open, volume is selling pressure
-        df['volume_delta'] = df.apply(
-            lambda x: x['volume'] if x['close'] > x['open'] else -x['volume'] if x['close'] < x['open'] else 0,
-            axis=1
+        df['volume_delta'] = np.where(
+            df['close'] > df['open'], df['volume'],
+            np.where(df['close'] < df['open'], -df['volume'], 0.0)
         )
         
         # Calculate cumulative sum
@@ -101,10 +107,11 @@ class TechnicalIndicators:
     @staticmethod
     def check_cvd_signals(df):
         """Check for CVD-based signals"""
-        current = df.iloc[-1]
-        prev = df.iloc[-2]
-        prev_prev = df.iloc[-3]
-        
+        return TechnicalIndicators.cvd_signals_from_rows(df.iloc[-1], df.iloc[-2], df.iloc[-3])
+
+    @staticmethod
+    def cvd_signals_from_rows(current, prev, prev_prev):
+        """Check for CVD-based signals on the last three indicator rows"""
         signals = {
             'cvd_rising': current['cvd'] > prev['cvd'] and prev['cvd'] > prev_prev['cvd']
         }
@@ -136,9 +143,11 @@ class TechnicalIndicators:
         if len(df) < 20:  # Need enough data for indicators
             return None
             
-        current = df.iloc[-1]
-        prev = df.iloc[-2]
-        
+        return TechnicalIndicators.momentum_breakout_from_rows(df.iloc[-1], df.iloc[-2])
+
+    @staticmethod
+    def momentum_breakout_from_rows(current, prev):
+        """Check for momentum breakout conditions on the last two indicator rows"""
         # Price action signals
         price_above_ema = current['close'] > current['ema_5']
         higher_highs = current['high'] > prev['high']
@@ -183,6 +192,19 @@ class TechnicalIndicators:
         
         return signals, levels, metrics
 
+    @staticmethod
+    def scan_momentum_breakout(df):
+        """Evaluate check_momentum_breakout at every bar of an indicator frame.
+
+        Returns a DataFrame with one boolean column per signal, a combined
+        has_signal column and entry/stop_loss/target levels for each bar.
+        """
+        columns = indicator_kernels.momentum_breakout_signals(
+            *(df[name].to_numpy(dtype=np.float64) for name in
+              ('close', 'high', 'low', 'ema_5', 'volume', 'volume_ma_5', 'volume_trend', 'rsi'))
+        )
+        return pd.DataFrame(columns, index=df.index, copy=False)
+
     @staticmethod
     def calculate_ema(df):
         """Calculate Exponential Moving Averages"""
@@ -194,21 +216,38 @@ class TechnicalIndicators:
     @staticmethod
     def calculate_all_indicators(df):
         """Calculate all technical indicators"""
-        df = TechnicalIndicators.calculate_vwap(df)
-        df = TechnicalIndicators.calculate_rsi(df)
-        df = TechnicalIndicators.calculate_volume(df)
-        df = TechnicalIndicators.calculate_cvd(df)
-        df = TechnicalIndicators.calculate_momentum_indicators(df)  # This includes EMA calculations
-        return df
+        # Same columns as running calculate_vwap, calculate_rsi, calculate_volume,
+        # calculate_cvd and calculate_momentum_indicators in turn, computed in one
+        # pass over the raw arrays
+        columns = indicator_kernels.compute_all(
+            *(df[name].to_numpy(dtype=np.float64) for name in ('open', 'high', 'low', 'close', 'volume'))
+        )
+        # Keep the original columns (with volume zero-filled), replace any stale
+        # indicator columns and wrap the kernel arrays without copying them
+        data = {}
+        for name in df.columns:
+            if name == 'volume':
+                data[name] = columns.pop('volume')
+            elif name not in columns:
+                data[name] = df[name]
+        data.update(columns)
+        return pd.DataFrame(data, index=df.index, copy=False)
+
+    @staticmethod
+    def calculate_indicators(df, columns):
+        """Calculate only the requested indicator columns and what they depend on"""
+        return indicator_graph.LazyIndicators(df).frame(columns)
 
     @staticmethod
     def check_long_setup(df):
         """Check for long setup conditions"""
-        current = df.iloc[-1]
-        prev = df.iloc[-2]
-        
+        return TechnicalIndicators.long_setup_from_rows(df.iloc[-1], df.iloc[-2], df.iloc[-3])
+
+    @staticmethod
+    def long_setup_from_rows(current, prev, prev_prev):
+        """Check for long setup conditions on the last three indicator rows"""
         # Get CVD signals
-        cvd_signals = TechnicalIndicators.check_cvd_signals(df)
+        cvd_signals = TechnicalIndicators.cvd_signals_from_rows(current, prev, prev_prev)
         
         # Check VWAP reclaim
         vwap_reclaim = (
@@ -265,4 +304,64 @@ class TechnicalIndicators:
             cvd_signals['cvd_rising']
         )
         
-        return has_signal, trade_info 
\ No newline at end of file
+        return has_signal, trade_info
+
+    @staticmethod
+    def scan_long_setup(df):
+        """Evaluate check_long_setup at every bar of an indicator frame.
+
+        Returns a DataFrame with one boolean column per signal, a combined
+        has_signal column and entry/stop_loss/target levels for each bar.
+        """
+        columns = indicator_kernels.long_setup_signals(
+            *(df[name].to_numpy(dtype=np.float64) for name in
+              ('close', 'vwap', 'volume', 'volume_ma_5', 'volume_ma_20', 'rsi', 'cvd'))
+        )
+        return pd.DataFrame(columns, index=df.index, copy=False)
+
+    @staticmethod
+    def calculate_panel_indicators(frames):
+        """Calculate all indicators for many symbols in one vectorized pass.
+
+        frames maps symbol -> OHLCV DataFrame; histories may start at different
+        times or have missing bars. Returns a dict mapping each price and
+        indicator column to a time x symbol DataFrame.
+        """
+        fields = ('open', 'high', 'low', 'close', 'volume')
+        symbols = pd.Index(list(frames))
+        index = pd.Index(np.unique(np.concatenate([df.index.to_numpy() for df in frames.values()])), name='timestamp')
+
+        # Scatter every symbol into preallocated time x symbol arrays
+        arrays = {name: np.full((len(index), len(symbols)), np.nan) for name in fields}
+        for column, df in enumerate(frames.values()):
+            rows = index.get_indexer(df.index)
+            for name in fields:
+                arrays[name][rows, column] = df[name].to_numpy(dtype=np.float64)
+
+        columns = {name: arrays[name] for name in ('open', 'high', 'low', 'close')}
+        columns.update(indicator_kernels.compute_panel(*arrays.values()))
+        return TechnicalIndicators._panel_frames(columns, index, symbols)
+
+    @staticmethod
+    def scan_panel_long_setup(panel):
+        """scan_long_setup over a calculate_panel_indicators result, one column per symbol"""
+        arrays = [panel[name].to_numpy(dtype=np.float64) for name in
+                  ('close', 'vwap', 'volume', 'volume_ma_5', 'volume_ma_20', 'rsi', 'cvd')]
+        columns = indicator_kernels.panel_apply(indicator_kernels.long_setup_signals, arrays, ~np.isnan(arrays[0]))
+        return TechnicalIndicators._panel_frames(columns, panel['close'].index, panel['close'].columns)
+
+    @staticmethod
+    def scan_panel_momentum_breakout(panel):
+        """scan_momentum_breakout over a calculate_panel_indicators result, one column per symbol"""
+        arrays = [panel[name].to_numpy(dtype=np.float64) for name in
+                  ('close', 'high', 'low', 'ema_5', 'volume', 'volume_ma_5', 'volume_trend', 'rsi')]
+        columns = indicator_kernels.panel_apply(indicator_kernels.momentum_breakout_signals, arrays, ~np.isnan(arrays[0]))
+        return TechnicalIndicators._panel_frames(columns, panel['close'].index, panel['close'].columns)
+
+    @staticmethod
+    def _panel_frames(columns, index, symbols):
+        """Wrap 2-D kernel outputs as time x symbol DataFrames"""
+        return {
+            name: pd.DataFrame(values, index=index, columns=symbols, copy=False)
+            for name, values in columns.items()
+        }
@@ -0,0 +1,79 @@
+import argparse
+import time
+import tracemalloc
+from operator import itemgetter
+import numpy as np
+import pandas as pd
+from kline_store import FIELDS
+
+
+def decode_klines(klines):
+    """Parse Binance REST kline rows into one typed array per field (see kline_store.FIELDS)"""
+    count = len(klines)
+    arrays = {}
+    # One pass per field straight into its array; no transposed copy of the rows
+    for position, (name, dtype) in enumerate(FIELDS):
+        parse = int if dtype == '<i8' else float
+        arrays[name] = np.fromiter(map(parse, map(itemgetter(position), klines)), dtype=dtype, count=count)
+    return arrays
+
+
+def klines_frame(arrays):
+    """DataFrame over decoded (or KlineStore.read) arrays, without copying them.
+
+    The index is the open time as datetime64[ms], a view of the int64 epoch
+    column; every other field becomes a column ('volume' is the base volume).
+    """
+    index = pd.DatetimeIndex(arrays['timestamp'].view('datetime64[ms]'), name='timestamp', copy=False)
+    return pd.DataFrame({name: arrays[name] for name, _ in FIELDS[1:]}, index=index, copy=False)
+
+
+def klines_to_frame(klines):
+    """Binance REST kline rows to a typed DataFrame indexed by open time"""
+    return klines_frame(decode_klines(klines))
+
+
+def _legacy_frame(klines):
+    """The object-dtype conversion the clients used before klines_to_frame"""
+    df = pd.DataFrame(klines, columns=[
+        'timestamp', 'open', 'high', 'low', 'close', 'volume',
+        'close_time', 'quote_volume', 'trades', 'buy_base_volume',
+        'buy_quote_volume', 'ignore'
+    ])
+    numeric_columns = ['open', 'high', 'low', 'close', 'volume', 'quote_volume']
+    df[numeric_columns] = df[numeric_columns].astype(float)
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    df.set_index('timestamp', inplace=True)
+    return df
+
+
+def _measure(convert, klines, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        started = time.perf_counter()
+        convert(klines)
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    df = convert(klines)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, df.memory_usage(deep=True).sum()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare kline decoding against the old DataFrame conversion")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[200, 1500, 100_000])
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    from test_kline_store import make_klines
+    print(f"{'bars':>8} {'decoder':>30} {'legacy':>30}")
+    for size in args.sizes:
+        klines = make_klines(1_700_000_000_000, size)
+        results = [_measure(convert, klines, args.repeats) for convert in (klines_to_frame, _legacy_frame)]
+        cells = [f"{t * 1000:8.2f}ms {peak / 1e6:7.2f}MB peak {held / 1e6:6.2f}MB" for t, peak, held in results]
+        print(f"{size:>8} {cells[0]:>30} {cells[1]:>30}")
+
+
+if __name__ == "__main__":
+    main()
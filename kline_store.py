@@ -0,0 +1,113 @@
+import os
+import shutil
+from itertools import repeat
+from pathlib import Path
+import numpy as np
+
+# Stored kline fields in Binance REST order (the trailing 'ignore' field is dropped)
+FIELDS = (
+    ('timestamp', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+    ('close_time', '<i8'),
+    ('quote_volume', '<f8'),
+    ('trades', '<i8'),
+    ('buy_base_volume', '<f8'),
+    ('buy_quote_volume', '<f8'),
+)
+
+INTERVAL_MS = {
+    '1m': 60_000, '3m': 180_000, '5m': 300_000, '15m': 900_000, '30m': 1_800_000,
+    '1h': 3_600_000, '2h': 7_200_000, '4h': 14_400_000, '6h': 21_600_000,
+    '8h': 28_800_000, '12h': 43_200_000, '1d': 86_400_000, '3d': 259_200_000, '1w': 604_800_000,
+}
+
+
+def interval_ms(interval):
+    """Length of a Binance kline interval in milliseconds"""
+    return INTERVAL_MS[interval]
+
+
+class KlineStore:
+    """Append-only on-disk store of closed klines.
+
+    Each symbol/interval has its own directory under root/market/ holding one
+    raw little-endian file per field, so new bars are appended without
+    rewriting history and reads are memory-mapped column slices.
+    """
+
+    def __init__(self, root='data/klines'):
+        self.root = Path(root)
+
+    def _dir(self, symbol, interval, market):
+        return self.root / market / symbol / interval
+
+    def count(self, symbol, interval, market='spot'):
+        """Number of complete bars stored"""
+        directory = self._dir(symbol, interval, market)
+        counts = []
+        for name, dtype in FIELDS:
+            path = directory / f"{name}.bin"
+            counts.append(path.stat().st_size // np.dtype(dtype).itemsize if path.exists() else 0)
+        # An interrupted append can leave some fields longer than others
+        return min(counts)
+
+    def read(self, symbol, interval, limit=None, market='spot'):
+        """Read-only arrays of the stored fields, optionally only the last `limit` bars"""
+        directory = self._dir(symbol, interval, market)
+        count = self.count(symbol, interval, market)
+        start = 0 if limit is None else max(count - limit, 0)
+        arrays = {}
+        for name, dtype in FIELDS:
+            if count == 0:
+                arrays[name] = np.empty(0, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(directory / f"{name}.bin", dtype=dtype, mode='r', shape=(count,))[start:]
+        return arrays
+
+    def last_close_time(self, symbol, interval, market='spot'):
+        """Close time (ms) of the newest stored bar, or None if nothing is stored"""
+        count = self.count(symbol, interval, market)
+        if count == 0:
+            return None
+        path = self._dir(symbol, interval, market) / "close_time.bin"
+        return int(np.memmap(path, dtype='<i8', mode='r', shape=(count,))[-1])
+
+    def append(self, symbol, interval, klines, market='spot'):
+        """Append closed klines (Binance REST rows) newer than the last stored bar.
+
+        Returns the number of bars written.
+        """
+        last_close = self.last_close_time(symbol, interval, market)
+        if last_close is not None:
+            klines = [kline for kline in klines if int(kline[0]) > last_close]
+        if not klines:
+            return 0
+
+        directory = self._dir(symbol, interval, market)
+        directory.mkdir(parents=True, exist_ok=True)
+        count = self.count(symbol, interval, market)
+        for position, (name, dtype) in enumerate(FIELDS):
+            values = np.array([kline[position] for kline in klines]).astype(dtype)
+            with open(directory / f"{name}.bin", 'ab') as f:
+                # Drop any partial tail left by an interrupted append
+                f.truncate(count * values.itemsize)
+                f.write(values.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        return len(klines)
+
+    def klines(self, symbol, interval, limit, market='spot'):
+        """The last `limit` stored bars as Binance REST-shaped rows"""
+        if limit <= 0:
+            return []
+        arrays = self.read(symbol, interval, limit, market)
+        columns = [arrays[name].tolist() for name, _ in FIELDS]
+        return [list(row) for row in zip(*columns, repeat('0'))]
+
+    def clear(self, symbol, interval, market='spot'):
+        """Delete everything stored for a symbol/interval"""
+        shutil.rmtree(self._dir(symbol, interval, market), ignore_errors=True)
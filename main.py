@@ -1,4 +1,5 @@
 from binance_client import BinanceClient
+from kline_store import KlineStore
 from alpaca_client import AlpacaClient
 from mexc_client import MEXCClient
 from notification_service import NotificationService
@@ -14,17 +15,23 @@ import argparse
 import traceback
 
 # Initialize clients
-binance_client = BinanceClient()
+binance_client = BinanceClient(kline_store=KlineStore())
 alpaca_client = AlpacaClient()
 mexc_client = MEXCClient()
 trade_history = TradeHistory()
 notifier = NotificationService()
 
+# Indicator columns read by create_market_data
+MARKET_DATA_COLUMNS = (
+    'open', 'high', 'low', 'close', 'volume', 'vwap', 'rsi', 'cvd', 'ema_5',
+    'volume_ma_5', 'volume_ma_20', 'volume_ratio_5'
+)
+
 def create_market_data():
     """Create market data dictionary with technical indicators"""
     try:
         # Get market data from Binance
-        df = binance_client.get_klines(limit=100)
+        df = binance_client.get_klines(columns=MARKET_DATA_COLUMNS)
         if df is None or len(df) == 0:
             print("No data received from Binance")
             notifier.send_error("Failed to get market data from Binance")
@@ -155,13 +162,13 @@ def execute_trade(signal_type, entry_price, stop_loss, take_profit, strategy_nam
             exchange='MEXC',
             symbol=MEXC_SYMBOL,
             signal_type=signal_type,
-                entry_price=entry_price,
-                stop_loss=stop_loss,
-                take_profit=take_profit,
+            entry_price=entry_price,
+            stop_loss=stop_loss,
+            take_profit=take_profit,
             strategy_name=strategy_name
         )
             
-            return True
+        return True
             
     except Exception as e:
         print(f"Error executing trade: {str(e)}")
@@ -235,45 +242,37 @@ def test_signals():
     print("\n=== Testing Signal Detection ===")
     
     # Get more historical data for testing
-    df = binance_client.get_klines(limit=200)  # Get 200 bars for better testing
+    df = binance_client.get_klines(limit=200, columns=TechnicalIndicators.LONG_SETUP_COLUMNS)  # Get 200 bars for better testing
     if df is None or df.empty:
         print("No data received from Binance")
         return
         
-    # Calculate indicators
-    df = TechnicalIndicators.calculate_all_indicators(df)
-    
-    # Look for signals in each bar
-    signals_found = 0
+    # Evaluate the long setup at every bar in one pass
     print("\nScanning for signals...")
+    scan = TechnicalIndicators.scan_long_setup(df)
+    signals = scan[scan['has_signal']]
     
-    for i in range(1, len(df)):
-        test_df = df.iloc[:i+1]  # Use data up to current bar
-        has_signal, trade_info = TechnicalIndicators.check_long_setup(test_df)
+    for signals_found, (timestamp, signal) in enumerate(signals.iterrows(), start=1):
+        current_bar = df.loc[timestamp]
+        print(f"\nSignal {signals_found} found at {timestamp}:")
+        print(f"Price: ${current_bar['close']:,.2f}")
+        print(f"VWAP: ${current_bar['vwap']:,.2f}")
+        print(f"RSI: {current_bar['rsi']:.1f}")
+        print(f"Volume: ${current_bar['volume']:,.2f}")
+        print(f"Volume MA5: ${current_bar['volume_ma_5']:,.2f}")
+        print(f"Volume MA20: ${current_bar['volume_ma_20']:,.2f}")
         
-        if has_signal:
-            signals_found += 1
-            current_bar = test_df.iloc[-1]
-            print(f"\nSignal {signals_found} found at {current_bar.name}:")
-            print(f"Price: ${current_bar['close']:,.2f}")
-            print(f"VWAP: ${current_bar['vwap']:,.2f}")
-            print(f"RSI: {current_bar['rsi']:.1f}")
-            print(f"Volume: ${current_bar['volume']:,.2f}")
-            print(f"Volume MA5: ${current_bar['volume_ma_5']:,.2f}")
-            print(f"Volume MA20: ${current_bar['volume_ma_20']:,.2f}")
-            
-            if trade_info and trade_info['levels']:
-                print("\nTrade Levels:")
-                print(f"Entry: ${trade_info['levels']['entry']:,.2f}")
-                print(f"Stop Loss: ${trade_info['levels']['stop_loss']:,.2f}")
-                print(f"Take Profit: ${trade_info['levels']['take_profit']:,.2f}")
-            
-            print("\nSignal Conditions:")
-            print(f"VWAP Reclaim: {'✓' if trade_info['signals']['vwap_reclaim'] else '✗'}")
-            print(f"Rising Volume: {'✓' if trade_info['signals']['rising_volume'] else '✗'}")
-            print(f"RSI Cross 50: {'✓' if trade_info['signals']['rsi_cross_50'] else '✗'}")
+        print("\nTrade Levels:")
+        print(f"Entry: ${signal['entry']:,.2f}")
+        print(f"Stop Loss: ${signal['stop_loss']:,.2f}")
+        print(f"Take Profit: ${signal['target']:,.2f}")
+        
+        print("\nSignal Conditions:")
+        print(f"VWAP Reclaim: {'✓' if signal['vwap_reclaim'] else '✗'}")
+        print(f"Rising Volume: {'✓' if signal['rising_volume'] else '✗'}")
+        print(f"RSI Cross 50: {'✓' if signal['rsi_cross_50'] else '✗'}")
             
-    print(f"\nFound {signals_found} signals in {len(df)} bars")
+    print(f"\nFound {len(signals)} signals in {len(df)} bars")
 
 def display_position(position, orders=None):
     """Display current position information"""
@@ -312,11 +311,18 @@ def display_position(position, orders=None):
     else:
         print("\nNo open position")
 
-def main(test_mode=False):
+def main(test_mode=False, stream=False):
     """Main function to run the trading bot"""
     if test_mode:
         test_signals()
         return
+
+    if stream:
+        binance_client.start_stream([INTERVAL])
+        # Position and order checks below are then served from the trade update stream
+        alpaca_client.start_account_stream()
+        # and prices before orders from the quote stream
+        alpaca_client.start_quote_stream()
         
     print("\n==================================================")
     print(f"Starting Trading Bot - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -377,12 +383,13 @@ def main(test_mode=False):
                         signals=momentum_signals
                     )
             
-            print("\nWaiting 30 seconds before retrying...")
-            time.sleep(30)
+            # With a live stream this returns as soon as the next bar closes
+            print("\nWaiting for the next bar (up to 30 seconds)...")
+            binance_client.wait_for_update(30)
             
     except KeyboardInterrupt:
         print("\nBot stopped by user")
 
 if __name__ == "__main__":
     test_mode = "--test" in sys.argv
-    main(test_mode) 
\ No newline at end of file
+    main(test_mode, stream="--stream" in sys.argv) 
\ No newline at end of file
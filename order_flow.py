@@ -0,0 +1,71 @@
+import numpy as np
+from indicator_kernels import cumsum
+
+# Columns added by add_order_flow / returned by OrderFlow.update
+COLUMNS = ('taker_buy_volume', 'taker_sell_volume', 'taker_delta', 'taker_cvd', 'taker_buy_ratio', 'taker_imbalance')
+
+
+def taker_delta(quote_volume, buy_quote_volume):
+    """Taker buy minus taker sell volume of each bar"""
+    return 2 * buy_quote_volume - quote_volume
+
+
+def _ratios(quote_volume, buy_quote_volume, delta):
+    """Buy share (0..1) and delta/volume (-1..1), neutral on bars without volume"""
+    traded = quote_volume > 0
+    buy_ratio = np.divide(buy_quote_volume, quote_volume, out=np.full(np.shape(quote_volume), 0.5), where=traded)
+    imbalance = np.divide(delta, quote_volume, out=np.zeros(np.shape(quote_volume)), where=traded)
+    return buy_ratio, imbalance
+
+
+def order_flow(quote_volume, buy_quote_volume):
+    """Order-flow columns from each bar's total and taker-buy quote volume (float64 arrays).
+
+    Binance klines report how much of a bar's volume came from aggressive
+    buyers, so the delta is measured rather than guessed from the candle
+    colour like the 'cvd' indicator does. The CVD starts at the first bar.
+    """
+    delta = taker_delta(quote_volume, buy_quote_volume)
+    buy_ratio, imbalance = _ratios(quote_volume, buy_quote_volume, delta)
+    return {
+        'taker_buy_volume': buy_quote_volume,
+        'taker_sell_volume': quote_volume - buy_quote_volume,
+        'taker_delta': delta,
+        'taker_cvd': cumsum(delta),
+        'taker_buy_ratio': buy_ratio,
+        'taker_imbalance': imbalance,
+    }
+
+
+def add_order_flow(df):
+    """Add the order-flow COLUMNS to a kline frame with quote_volume and buy_quote_volume"""
+    flow = order_flow(df['quote_volume'].to_numpy(np.float64), df['buy_quote_volume'].to_numpy(np.float64))
+    for name, values in flow.items():
+        df[name] = values
+    return df
+
+
+class OrderFlow:
+    """Streaming counterpart of order_flow for one kline series.
+
+    Closed bars advance the CVD; updates of the forming bar are provisional
+    and can repeat until it closes.
+    """
+
+    def __init__(self, cvd=0.0):
+        self.cvd = cvd
+
+    def update(self, quote_volume, buy_quote_volume, closed=True):
+        delta = taker_delta(quote_volume, buy_quote_volume)
+        cvd = self.cvd + delta
+        if closed:
+            self.cvd = cvd
+        traded = quote_volume > 0
+        return {
+            'taker_buy_volume': buy_quote_volume,
+            'taker_sell_volume': quote_volume - buy_quote_volume,
+            'taker_delta': delta,
+            'taker_cvd': cvd,
+            'taker_buy_ratio': buy_quote_volume / quote_volume if traded else 0.5,
+            'taker_imbalance': delta / quote_volume if traded else 0.0,
+        }
@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import namedtuple
+
+# Raw (raw_data=True) quote message fields, see alpaca.data.mappings.QUOTE_MAPPING
+RAW_FIELDS = {'symbol': 'S', 'bid_price': 'bp', 'bid_size': 'bs', 'ask_price': 'ap', 'ask_size': 'as', 'timestamp': 't'}
+
+
+class TopOfBook(namedtuple('TopOfBook', 'bid bid_size ask ask_size timestamp received_at')):
+    """Best bid/ask of one symbol; received_at is time.monotonic() on arrival"""
+
+    __slots__ = ()
+
+    @property
+    def mid(self):
+        return (self.bid + self.ask) / 2
+
+    @property
+    def age(self):
+        return time.monotonic() - self.received_at
+
+
+class QuoteCache:
+    """Best bid/ask per symbol, kept current by Alpaca's crypto quote stream.
+
+    Each quote replaces the symbol's TopOfBook whole, so readers on other
+    threads never see a half-updated book. A book older than `max_age`
+    seconds counts as stale and quote()/mid() return None for it, leaving
+    the caller to fall back to REST (and apply() the answer to prime the
+    cache). Without a running stream nothing is served from the cache.
+    """
+
+    def __init__(self, max_age=10.0):
+        self.max_age = max_age
+        self.stream = None
+        self.updates = 0
+        self._books = {}  # symbol -> TopOfBook
+        self._thread = None
+
+    @property
+    def streaming(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, stream, symbols):
+        """Follow an alpaca-py CryptoDataStream (or anything with its interface) on a background thread"""
+        self.stream = stream
+        stream.subscribe_quotes(self._on_quote, *symbols)
+        self._thread = threading.Thread(target=stream.run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self.stream is not None:
+            self.stream.stop()
+
+    def apply(self, quote):
+        """Store one quote (alpaca.data.models.Quote or its raw message dict)"""
+        if isinstance(quote, dict):
+            quote = {field: quote.get(key) for field, key in RAW_FIELDS.items()}
+        else:
+            quote = {field: getattr(quote, field, None) for field in RAW_FIELDS}
+        self._books[quote['symbol']] = TopOfBook(
+            float(quote['bid_price']), float(quote['bid_size'] or 0),
+            float(quote['ask_price']), float(quote['ask_size'] or 0),
+            quote['timestamp'], time.monotonic(),
+        )
+        self.updates += 1
+
+    def quote(self, symbol, max_age=None):
+        """The symbol's TopOfBook, or None when there is none younger than max_age"""
+        book = self._books.get(symbol)
+        if book is None or not self.streaming or book.age > (self.max_age if max_age is None else max_age):
+            return None
+        return book
+
+    def mid(self, symbol, max_age=None):
+        book = self.quote(symbol, max_age)
+        return None if book is None else book.mid
+
+    async def _on_quote(self, quote):
+        self.apply(quote)
@@ -0,0 +1,220 @@
+import asyncio
+import functools
+import heapq
+import inspect
+import itertools
+import threading
+import time
+from collections import deque
+
+# Request priorities, lower goes first
+ORDER, LIVE, HISTORY = 0, 1, 2
+# Share of each minute's weight that lower priorities leave free for the ones above them
+RESERVE = {ORDER: 0.0, LIVE: 0.05, HISTORY: 0.2}
+
+# Per-minute IP weight limits of the REST APIs BinanceClient talks to
+WEIGHT_PER_MINUTE = {'spot': 1200, 'futures': 2400}
+# Weight charged by the header every Binance response carries
+USED_WEIGHT_HEADER = 'X-MBX-USED-WEIGHT-1M'
+
+
+def _futures_klines_weight(limit=500, **kwargs):
+    limit = int(limit or 500)
+    return 1 if limit < 100 else 2 if limit < 500 else 5 if limit <= 1000 else 10
+
+
+# Request weight by client method; anything not listed costs DEFAULT_WEIGHT.
+# Estimates only: the used-weight header corrects them after every response.
+ENDPOINT_WEIGHTS = {
+    'spot': {
+        'get_klines': 2,
+        'get_historical_klines': 2,
+        'get_symbol_ticker': 2,
+        'get_aggregate_trades': 2,
+        'get_order_book': 5,
+        'get_exchange_info': 20,
+        'get_open_orders': 6,
+        'get_account': 20,
+    },
+    'futures': {
+        'futures_klines': _futures_klines_weight,
+        'futures_historical_klines': 5,
+        'futures_aggregate_trades': 20,
+        'futures_order_book': 10,
+        'futures_exchange_info': 1,
+        'futures_get_open_orders': 1,
+        'futures_account': 5,
+    },
+}
+DEFAULT_WEIGHT = 1
+
+# Client methods that place, replace or cancel orders; they always get ORDER priority.
+# Order queries such as get_open_orders keep the client's own priority.
+ORDER_METHODS = frozenset((
+    'create_order', 'create_test_order', 'create_oco_order', 'cancel_order', 'cancel_replace_order',
+    'order_limit', 'order_limit_buy', 'order_limit_sell', 'order_market', 'order_market_buy',
+    'order_market_sell', 'order_oco_buy', 'order_oco_sell',
+    'futures_create_order', 'futures_place_batch_order', 'futures_modify_order', 'futures_cancel_order',
+    'futures_cancel_orders', 'futures_cancel_all_open_orders',
+))
+
+
+class RateLimiter:
+    """Schedules requests against one exchange weight bucket.
+
+    Callers block in acquire() until the weight spent in the last `window`
+    seconds leaves room for theirs. Waiting callers are served by priority,
+    then arrival, and lower priorities keep a RESERVE of the budget free so
+    orders still go out while a backfill is saturating the bucket. The
+    exchange's own count (observe) and ban/back-off replies (pause) override
+    the local estimate.
+    """
+
+    def __init__(self, weight_per_minute, window=60.0):
+        self.weight_per_minute = weight_per_minute
+        self.window = window
+        self.spent = deque()  # (time, weight)
+        self.waiting = []  # heap of (priority, arrival)
+        self.arrivals = itertools.count()
+        self.condition = threading.Condition()
+        self.server_used = 0
+        self.server_expires = 0.0  # wall clock end of the window server_used counts
+        self.paused_until = 0.0
+
+    def _used(self):
+        now = time.monotonic()
+        while self.spent and now - self.spent[0][0] >= self.window:
+            self.spent.popleft()
+        local = sum(weight for _, weight in self.spent)
+        server = self.server_used if time.time() < self.server_expires else 0
+        return local, server
+
+    def _wait_time(self, weight, priority):
+        """Seconds until `weight` can be spent at `priority` (0 if it can now)"""
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        local, server = self._used()
+        limit = self.weight_per_minute * (1 - RESERVE.get(priority, 0.0))
+        # A request heavier than the whole allowance still goes out once the bucket is empty
+        if max(local, server) + weight <= limit or (local == 0 and server == 0):
+            return 0
+        wait = 0
+        if local + weight > limit and self.spent:
+            wait = self.window - (now - self.spent[0][0])
+        if server + weight > limit:
+            wait = max(wait, self.server_expires - time.time())
+        return max(wait, 0.001)
+
+    def acquire(self, weight=DEFAULT_WEIGHT, priority=LIVE):
+        """Block until `weight` fits in the budget, then charge it"""
+        with self.condition:
+            ticket = (priority, next(self.arrivals))
+            heapq.heappush(self.waiting, ticket)
+            try:
+                while True:
+                    wait = self._wait_time(weight, priority) if self.waiting[0] == ticket else None
+                    if wait == 0:
+                        break
+                    self.condition.wait(wait)
+                heapq.heappop(self.waiting)
+                self.spent.append((time.monotonic(), weight))
+            except BaseException:
+                self.waiting.remove(ticket)
+                heapq.heapify(self.waiting)
+                raise
+            finally:
+                self.condition.notify_all()
+
+    def observe(self, used):
+        """Record the weight the exchange reports as used in its current window"""
+        with self.condition:
+            now = time.time()
+            expires = (now // self.window + 1) * self.window
+            # Responses can arrive out of order, so keep the highest count of a window
+            self.server_used = used if expires > self.server_expires else max(self.server_used, used)
+            self.server_expires = expires
+            self.condition.notify_all()
+
+    def pause(self, seconds):
+        """Hold every request for `seconds`, e.g. after a 429/418 reply"""
+        with self.condition:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.condition.notify_all()
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(market):
+    """The limiter shared by every client of a market ('spot'/'futures') in this process"""
+    with _limiters_lock:
+        if market not in _limiters:
+            _limiters[market] = RateLimiter(WEIGHT_PER_MINUTE.get(market, WEIGHT_PER_MINUTE['spot']))
+        return _limiters[market]
+
+
+class LimitedClient:
+    """Routes the calls of a python-binance Client/AsyncClient through a RateLimiter.
+
+    Order calls run at ORDER priority and everything else at `priority`.
+    After each response the used-weight header resyncs the limiter, and a
+    429/418 reply pauses the whole bucket for its Retry-After.
+    """
+
+    def __init__(self, client, market, priority=LIVE, limiter=None):
+        self.client = client
+        self.market = market
+        self.priority = priority
+        self.limiter = limiter if limiter is not None else get_limiter(market)
+
+    def _cost(self, name, kwargs):
+        weight = ENDPOINT_WEIGHTS.get(self.market, {}).get(name, DEFAULT_WEIGHT)
+        if callable(weight):
+            weight = weight(**kwargs)
+        priority = ORDER if name in ORDER_METHODS else self.priority
+        return weight, priority
+
+    def _observe(self, response):
+        headers = getattr(response, 'headers', None)
+        used = headers.get(USED_WEIGHT_HEADER) if headers is not None else None
+        if used is not None:
+            self.limiter.observe(int(used))
+
+    def _observe_error(self, error):
+        if getattr(error, 'status_code', None) in (418, 429):
+            headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+            retry_after = headers.get('Retry-After')
+            self.limiter.pause(float(retry_after) if retry_after else self.limiter.window)
+            print(f"Binance {self.market} rate limit hit ({error.status_code}), pausing requests")
+
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+        if name.startswith('_') or not callable(method):
+            return method
+
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def call(*args, **kwargs):
+                await asyncio.to_thread(self.limiter.acquire, *self._cost(name, kwargs))
+                try:
+                    result = await method(*args, **kwargs)
+                except Exception as e:
+                    self._observe_error(e)
+                    raise
+                self._observe(getattr(self.client, 'response', None))
+                return result
+            return call
+
+        @functools.wraps(method)
+        def call(*args, **kwargs):
+            self.limiter.acquire(*self._cost(name, kwargs))
+            try:
+                result = method(*args, **kwargs)
+            except Exception as e:
+                self._observe_error(e)
+                raise
+            self._observe(getattr(self.client, 'response', None))
+            return result
+        return call
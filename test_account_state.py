@@ -0,0 +1,140 @@
+import asyncio
+import queue
+import threading
+import time
+from types import SimpleNamespace
+from account_state import AccountState
+
+class LocalTradingStream:
+    """Stands in for alpaca-py's TradingStream: updates published here reach the subscribed handler"""
+
+    def __init__(self):
+        self.handler = None
+        self.updates = queue.Queue()
+        self.delivered = threading.Event()
+
+    def subscribe_trade_updates(self, handler):
+        self.handler = handler
+
+    def publish(self, event, order, timeout=2):
+        self.delivered.clear()
+        self.updates.put(SimpleNamespace(event=event, order=order))
+        assert self.delivered.wait(timeout)
+
+    def run(self):
+        async def consume():
+            while True:
+                update = await asyncio.to_thread(self.updates.get)
+                if update is None:
+                    return
+                await self.handler(update)
+                self.delivered.set()
+        asyncio.run(consume())
+
+    def stop(self):
+        self.updates.put(None)
+
+class FakeTradingClient:
+    """REST TradingClient over an in-memory account, counting requests"""
+
+    def __init__(self):
+        self.calls = 0
+        self.equity = 10000.0
+        self.positions = []
+        self.orders = [order('1', 'new')]
+
+    def get_account(self):
+        self.calls += 1
+        return SimpleNamespace(portfolio_value=str(self.equity))
+
+    def get_all_positions(self):
+        self.calls += 1
+        return list(self.positions)
+
+    def get_orders(self):
+        self.calls += 1
+        return list(self.orders)
+
+def order(order_id, status):
+    return SimpleNamespace(id=order_id, symbol='BTCUSD', status=status)
+
+def cycle(state):
+    """The reads of one bot loop iteration"""
+    return state.positions(), state.open_orders(), state.account()
+
+def test_reads_without_stream_poll_rest():
+    print("\nTesting the account state without a stream...")
+    client = FakeTradingClient()
+    state = AccountState(client)
+    for _ in range(3):
+        cycle(state)
+    assert client.calls == 9
+    print("✓ Every read goes to REST when no stream is running")
+
+def test_stream_keeps_cache_current():
+    print("\nTesting the account state with a trade update stream...")
+    client = FakeTradingClient()
+    stream = LocalTradingStream()
+    state = AccountState(client).start(stream)
+    try:
+        for _ in range(10):
+            positions, orders, account = cycle(state)
+        # One snapshot, then everything is served from the cache
+        assert client.calls == 3
+        assert [o.id for o in orders] == ['1'] and positions == []
+
+        # Order events patch the open orders without a refetch
+        stream.publish('new', order('2', 'new'))
+        stream.publish('canceled', order('1', 'canceled'))
+        assert [o.id for o in state.open_orders()] == ['2']
+        assert client.calls == 3
+
+        # A fill marks positions and the account stale: fetched once, then cached again
+        client.positions = [SimpleNamespace(symbol='BTCUSD', qty='0.1')]
+        client.equity = 10100.0
+        stream.publish('fill', order('2', 'filled'))
+        calls = client.calls
+        for _ in range(5):
+            positions, orders, account = cycle(state)
+        assert client.calls == calls + 2
+        assert positions[0].qty == '0.1' and orders == [] and account.portfolio_value == '10100.0'
+        assert state.events == 3
+        streamed_calls = client.calls
+    finally:
+        state.stop()
+        state._thread.join(2)
+
+    # Back to REST once the stream is gone
+    calls = client.calls
+    cycle(state)
+    assert client.calls == calls + 3
+    print(f"✓ 15 cycles and 3 trade updates took {streamed_calls} REST calls instead of 45")
+
+def test_update_during_fetch_is_not_lost():
+    print("\nTesting an update racing a fetch...")
+    client = FakeTradingClient()
+    stream = LocalTradingStream()
+    state = AccountState(client).start(stream)
+    try:
+        original = client.get_all_positions
+
+        def slow_positions():
+            result = original()
+            # The fill lands after the REST snapshot was taken
+            threading.Thread(target=stream.publish, args=('fill', order('1', 'filled'))).start()
+            time.sleep(0.2)
+            return result
+
+        client.get_all_positions = slow_positions
+        state.positions()
+        client.get_all_positions = original
+        client.positions = [SimpleNamespace(symbol='BTCUSD', qty='0.2')]
+        assert state.positions()[0].qty == '0.2'
+    finally:
+        state.stop()
+    print("✓ A snapshot taken before an update is refetched")
+
+if __name__ == "__main__":
+    test_reads_without_stream_poll_rest()
+    test_stream_keeps_cache_current()
+    test_update_during_fetch_is_not_lost()
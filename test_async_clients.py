@@ -0,0 +1,115 @@
+import asyncio
+import time
+from aiohttp import web
+from async_clients import AsyncAlpacaClient, AsyncBinanceClient, AsyncNotificationService
+from binance_client import BinanceClient
+from indicator_cache import IndicatorCache
+from test_kline_store import make_klines
+
+class SlowFuturesClient:
+    """Stands in for binance.AsyncClient with a fixed latency per request"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.klines = make_klines(1_700_000_000_000, 200)
+
+    async def futures_klines(self, symbol, interval, limit):
+        await asyncio.sleep(self.latency)
+        return self.klines[-limit:]
+
+    async def futures_open_interest(self, symbol):
+        await asyncio.sleep(self.latency)
+        return {'symbol': symbol, 'openInterest': '1234.5'}
+
+def offline_binance_client():
+    """BinanceClient without the REST clients, which would contact Binance"""
+    client = BinanceClient.__new__(BinanceClient)
+    client.indicator_cache = IndicatorCache()
+    client.kline_store = None
+    client.streams = {}
+    return client
+
+def test_binance_requests_run_concurrently():
+    print("\nTesting concurrent Binance requests...")
+    futures_client = SlowFuturesClient(latency=0.3)
+    async_client = AsyncBinanceClient(offline_binance_client(), None, futures_client)
+
+    async def cycle():
+        return await asyncio.gather(
+            async_client.get_futures_klines(interval='30m', limit=50),
+            async_client.get_futures_klines(interval='1m', limit=200),
+            async_client.get_futures_open_interest()
+        )
+
+    started = time.perf_counter()
+    htf, ltf, oi = asyncio.run(cycle())
+    elapsed = time.perf_counter() - started
+
+    assert len(htf) == 50 and len(ltf) == 200 and oi['openInterest'] == '1234.5'
+    # Three 0.3s requests take about as long as one
+    assert elapsed < 0.6, elapsed
+    print(f"✓ Cycle took {elapsed:.2f}s for 3 x 0.3s requests")
+
+def test_alpaca_calls_run_on_threads():
+    print("\nTesting awaitable Alpaca calls...")
+
+    class BlockingAlpaca:
+        symbol = 'BTC/USD'
+
+        def get_position(self):
+            time.sleep(0.3)
+            return {'qty': '1'}
+
+        def get_current_price(self):
+            time.sleep(0.3)
+            return 60000.0
+
+    alpaca = AsyncAlpacaClient(BlockingAlpaca())
+    assert alpaca.symbol == 'BTC/USD'
+
+    async def cycle():
+        return await asyncio.gather(alpaca.get_position(), alpaca.get_current_price())
+
+    started = time.perf_counter()
+    position, price = asyncio.run(cycle())
+    assert position == {'qty': '1'} and price == 60000.0
+    assert time.perf_counter() - started < 0.55
+    print("✓ Blocking Alpaca calls overlap")
+
+def test_async_notifications():
+    print("\nTesting async Pushover notifications...")
+    received = []
+
+    async def pushover(request):
+        received.append(dict(await request.post()))
+        return web.json_response({'status': 1})
+
+    async def run():
+        app = web.Application()
+        app.router.add_post('/1/messages.json', pushover)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        service = AsyncNotificationService()
+        service.base_url = f"http://127.0.0.1:{port}/1/messages.json"
+        try:
+            results = await asyncio.gather(
+                service.send_error("first"),
+                service.send_notification("Title", "second")
+            )
+        finally:
+            await service.close()
+            await runner.cleanup()
+        return results
+
+    assert asyncio.run(run()) == [True, True]
+    assert sorted(message['message'] for message in received) == ['first', 'second']
+    print("✓ Notifications are posted over one session")
+
+if __name__ == "__main__":
+    test_binance_requests_run_concurrently()
+    test_alpaca_calls_run_on_threads()
+    test_async_notifications()
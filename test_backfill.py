@@ -0,0 +1,93 @@
+import tempfile
+import threading
+import time
+from backfill import backfill, plan_pages
+from kline_store import KlineStore, interval_ms
+from test_kline_store import make_klines
+
+class FakeKlinesEndpoint:
+    """Serves klines for startTime/endTime queries like Binance's REST endpoint"""
+
+    def __init__(self, klines, fail_pages=()):
+        self.klines = klines
+        self.fail_pages = set(fail_pages)  # startTimes that always fail
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, symbol, interval, startTime, endTime, limit):
+        with self.lock:
+            self.calls += 1
+        if startTime in self.fail_pages:
+            raise ConnectionError("simulated outage")
+        return [list(k) for k in self.klines if startTime <= k[0] <= endTime][:limit]
+
+def make_history(pages):
+    step = interval_ms('1m')
+    start = (int(time.time() * 1000) // step - pages * 1000 - 10) * step
+    return start, make_klines(start, pages * 1000)
+
+def test_concurrent_backfill_is_contiguous():
+    print("\nTesting concurrent paged backfill...")
+    start, klines = make_history(6)
+    end = klines[-1][6] + 1
+    assert len(plan_pages(start, end, '1m')) == 6
+
+    with tempfile.TemporaryDirectory() as root:
+        store = KlineStore(root)
+        endpoint = FakeKlinesEndpoint(klines)
+        written = backfill(endpoint, store, 'BTCUSDT', '1m', start, end, workers=4)
+        assert written == len(klines) and endpoint.calls == 6
+        assert (store.read('BTCUSDT', '1m')['timestamp'] == [k[0] for k in klines]).all()
+
+        # Nothing left to do on a second run
+        assert backfill(endpoint, store, 'BTCUSDT', '1m', start, end, workers=4) == 0
+    print("✓ Pages are stored in order without gaps or duplicates")
+
+def test_backfill_resumes_after_failure():
+    print("\nTesting resume after an interrupted backfill...")
+    start, klines = make_history(5)
+    end = klines[-1][6] + 1
+    failing_page = klines[3000][0]
+
+    with tempfile.TemporaryDirectory() as root:
+        store = KlineStore(root)
+        try:
+            backfill(FakeKlinesEndpoint(klines, [failing_page]), store, 'BTCUSDT', '1m', start, end, workers=3, retry_delay=0)
+            assert False, "backfill should stop at the failing page"
+        except ConnectionError:
+            pass
+        # Only the contiguous prefix before the failure was written
+        assert store.count('BTCUSDT', '1m') == 3000
+
+        endpoint = FakeKlinesEndpoint(klines)
+        assert backfill(endpoint, store, 'BTCUSDT', '1m', start, end, workers=3) == 2000
+        assert endpoint.calls == 2
+        assert (store.read('BTCUSDT', '1m')['timestamp'] == [k[0] for k in klines]).all()
+    print("✓ A rerun fetches only the missing pages")
+
+def test_symbol_listed_after_start():
+    print("\nTesting a symbol listed after --start...")
+    start, klines = make_history(3)
+    end = klines[-1][6] + 1
+    listed = klines[1000:]
+
+    with tempfile.TemporaryDirectory() as root:
+        store = KlineStore(root)
+        assert backfill(FakeKlinesEndpoint(listed), store, 'BTCUSDT', '1m', start, end) == 2000
+
+        # Only a one-bar probe for older bars, which finds none
+        endpoint = FakeKlinesEndpoint(listed)
+        assert backfill(endpoint, store, 'BTCUSDT', '1m', start, end) == 0
+        assert endpoint.calls == 1 and store.count('BTCUSDT', '1m') == 2000
+
+        # Recent bars stored by the live bot while older ones exist are downloaded again in full
+        store.clear('BTCUSDT', '1m')
+        store.append('BTCUSDT', '1m', klines[-100:])
+        assert backfill(FakeKlinesEndpoint(klines), store, 'BTCUSDT', '1m', start, end) == 3000
+        assert (store.read('BTCUSDT', '1m')['timestamp'] == [k[0] for k in klines]).all()
+    print("✓ A rerun keeps the stored history and downloads nothing")
+
+if __name__ == "__main__":
+    test_concurrent_backfill_is_contiguous()
+    test_backfill_resumes_after_failure()
+    test_symbol_listed_after_start()
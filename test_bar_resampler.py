@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+from bar_resampler import BarResampler, resample_frame, resample_klines
+from kline_store import interval_ms
+from test_kline_store import make_klines
+
+# A 4h boundary, so every resampled timeframe is aligned to it
+BASE = 1_700_000_000_000 // interval_ms('4h') * interval_ms('4h')
+
+def stream(klines, intervals):
+    """Feed klines through a BarResampler (last one still forming) and collect each timeframe's bars"""
+    resampler = BarResampler(intervals)
+    bars = {interval: [] for interval in intervals}
+    for i, row in enumerate(klines):
+        for interval, bar, closed in resampler.update(row, i < len(klines) - 1):
+            if bars[interval] and bars[interval][-1][0] == bar[0]:
+                bars[interval][-1] = bar
+            else:
+                bars[interval].append(bar)
+    return bars
+
+def assert_klines_match(expected, actual):
+    assert [row[0] for row in expected] == [row[0] for row in actual]
+    for a, b in zip(expected, actual):
+        assert np.allclose([float(x) for x in a[:11]], [float(x) for x in b[:11]])
+
+def test_incremental_matches_batch():
+    print("\nTesting incremental resampling against batch resampling...")
+    # Start mid-way through a 4h bucket
+    klines = make_klines(BASE + 37 * 60_000, 600)
+    intervals = ('5m', '15m', '30m', '1h', '4h')
+    streamed = stream(klines, intervals)
+    for interval in intervals:
+        expected = resample_klines(klines, interval)
+        assert_klines_match(expected, streamed[interval])
+        # The leading bucket missing its first minutes is skipped
+        assert expected[0][0] % interval_ms(interval) == 0 and expected[0][0] >= klines[0][0]
+    print("✓ Streamed and batch bars agree for every timeframe")
+
+def test_batch_matches_pandas():
+    print("\nTesting batch resampling against pandas...")
+    klines = make_klines(BASE, 300)
+    df = pd.DataFrame(
+        [[float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5]), float(k[7]), int(k[8])] for k in klines],
+        columns=['open', 'high', 'low', 'close', 'volume', 'quote_volume', 'trades'],
+        index=pd.to_datetime([k[0] for k in klines], unit='ms')
+    )
+    df['vwap'] = (df['high'] + df['low'] + df['close']) / 3
+    for interval in ('5m', '15m', '1h'):
+        expected = df.resample(f"{interval_ms(interval) // 60_000}min").agg(
+            {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum', 'quote_volume': 'sum'}
+        )
+        bars = resample_klines(klines, interval)
+        actual = np.array([[b[1], b[2], b[3], b[4], b[5], b[7]] for b in bars])
+        assert np.allclose(expected.to_numpy(), actual)
+
+        frame = resample_frame(df, interval)
+        assert np.allclose(frame[expected.columns].to_numpy(), expected.to_numpy())
+        weighted = (df['vwap'] * df['volume']).resample(f"{interval_ms(interval) // 60_000}min").sum() / expected['volume']
+        assert np.allclose(frame['vwap'], weighted)
+    print("✓ Resampled bars match pandas")
+
+def test_missing_minutes():
+    print("\nTesting buckets with missing minutes...")
+    klines = make_klines(BASE, 30)
+    # Lose the last minute of the first 15m bucket and one in the middle of the second
+    gappy = klines[:14] + klines[15:20] + klines[21:]
+    expected = resample_klines(gappy, '15m')
+    assert [row[0] for row in expected] == [BASE, BASE + interval_ms('15m')]
+    assert expected[0][4] == float(klines[13][4])
+    assert_klines_match(expected, stream(gappy, ['15m'])['15m'])
+    print("✓ Incomplete buckets close when the next one starts")
+
+if __name__ == "__main__":
+    test_incremental_matches_batch()
+    test_batch_matches_pandas()
+    test_missing_minutes()
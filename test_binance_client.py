@@ -0,0 +1,71 @@
+import tempfile
+import time
+from kline_store import KlineStore
+from test_async_clients import offline_binance_client
+from test_kline_store import make_klines
+
+STEP = 60_000
+
+class Exchange:
+    """1m klines up to the bar forming now, served like Binance's klines endpoint"""
+
+    def __init__(self, n):
+        forming = int(time.time() * 1000) // STEP * STEP
+        self.klines = make_klines(forming - (n - 1) * STEP, n)
+        self.limits = []  # limit of each request
+
+    def __call__(self, symbol, interval, limit, startTime=None):
+        self.limits.append(limit)
+        rows = self.klines
+        if startTime is not None:
+            return [list(k) for k in rows if k[0] >= startTime][:limit]
+        return [list(k) for k in rows[-limit:]]
+
+def store_client(root):
+    client = offline_binance_client()
+    client.kline_store = KlineStore(root)
+    return client
+
+def test_delta_polls_request_only_new_bars():
+    print("\nTesting kline polls against the store...")
+    exchange = Exchange(3000)
+    with tempfile.TemporaryDirectory() as root:
+        client = store_client(root)
+        store = client.kline_store
+        # Backfilled history that ends 2500 bars ago
+        store.append('BTCUSDT', '1m', exchange.klines[:500])
+        first = store.read('BTCUSDT', '1m')['timestamp'][0]
+
+        klines = client._fetch_klines(exchange, 'BTCUSDT', '1m', 100, 'spot')
+        assert [k[0] for k in klines] == [k[0] for k in exchange.klines[-100:]]
+        # The gap was filled in pages and the backfilled bars kept
+        assert exchange.limits[:2] == [1000, 1000] and len(exchange.limits) == 3
+        assert store.read('BTCUSDT', '1m')['timestamp'][0] == first
+        # Everything but the forming bar (and one just closed, within the grace period)
+        assert store.count('BTCUSDT', '1m') >= 2998
+
+        # The next poll asks for the forming bar and at most one more
+        exchange.limits.clear()
+        client._fetch_klines(exchange, 'BTCUSDT', '1m', 100, 'spot')
+        assert exchange.limits[0] <= 3
+    print("✓ A 2500-bar gap took 3 pages; a caught-up poll requests only the newest bars")
+
+def test_short_store_serves_fresh_window():
+    print("\nTesting a window longer than the stored history...")
+    exchange = Exchange(600)
+    with tempfile.TemporaryDirectory() as root:
+        client = store_client(root)
+        store = client.kline_store
+        store.append('BTCUSDT', '1m', exchange.klines[-60:-10])
+
+        klines = client._fetch_klines(exchange, 'BTCUSDT', '1m', 500, 'spot')
+        assert [k[0] for k in klines] == [k[0] for k in exchange.klines[-500:]]
+        assert exchange.limits == [500]
+        # Stored history is kept and topped up with the newer closed bars
+        arrays = store.read('BTCUSDT', '1m')
+        assert arrays['timestamp'][0] == exchange.klines[-60][0] and len(arrays['timestamp']) >= 58
+    print("✓ The window is fetched without deleting stored bars")
+
+if __name__ == "__main__":
+    test_delta_polls_request_only_new_bars()
+    test_short_store_serves_fresh_window()
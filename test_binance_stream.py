@@ -0,0 +1,130 @@
+import asyncio
+import json
+import threading
+import time
+import numpy as np
+import pandas as pd
+import websockets
+from bar_resampler import resample_klines
+from binance_stream import KlineStream
+from indicators import TechnicalIndicators
+from kline_store import interval_ms
+from order_flow import order_flow
+from test_indicator_engine import assert_rows_match
+from test_kline_store import make_klines
+
+class FakeExchange:
+    """Local stand-in for Binance: a WebSocket server replaying scripted
+    connections plus a REST get_klines over the same bars."""
+
+    def __init__(self, klines, available, connections):
+        self.klines = klines
+        self.available = available  # bars the REST endpoint knows about
+        self.connections = list(connections)
+        self.fetches = []  # startTime of each REST call
+        self.loop = asyncio.new_event_loop()
+        self.ready = threading.Event()
+        self.port = None
+        threading.Thread(target=self._run, daemon=True).start()
+        self.ready.wait(5)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self._serve())
+
+    async def _serve(self):
+        async with websockets.serve(self._handler, '127.0.0.1', 0) as server:
+            self.port = server.sockets[0].getsockname()[1]
+            self.ready.set()
+            await asyncio.Future()
+
+    async def _handler(self, ws):
+        if not self.connections:
+            await ws.wait_closed()
+            return
+        script = self.connections.pop(0)
+        await script(self, ws)
+
+    async def send_bar(self, ws, index, updates=2):
+        """Send a few in-progress versions of a bar, then the closed one"""
+        row = self.klines[index]
+        for i in range(updates + 1):
+            closed = i == updates
+            close = row[4] if closed else f"{float(row[4]) + 10 * (i + 1):.2f}"
+            k = {
+                't': row[0], 'T': row[6], 's': 'BTCUSDT', 'i': '1m', 'o': row[1], 'c': close, 'h': row[2],
+                'l': row[3], 'v': row[5], 'n': row[8], 'x': closed, 'q': row[7], 'V': row[9], 'Q': row[10], 'B': '0'
+            }
+            await ws.send(json.dumps({'stream': 'btcusdt@kline_1m', 'data': {'e': 'kline', 'E': row[6], 's': 'BTCUSDT', 'k': k}}))
+
+    def fetch(self, symbol, interval, limit, startTime=None):
+        self.fetches.append(startTime)
+        rows = self.klines[:self.available]
+        if startTime is not None:
+            rows = [row for row in rows if row[0] >= startTime][:limit]
+        return [list(row) for row in rows[-limit:]]
+
+def test_stream_reconnects_and_backfills():
+    print("\nTesting kline streaming with reconnects and gap backfill...")
+    step = interval_ms('1m')
+    klines = make_klines((int(time.time() * 1000) // step - 100) * step, 80)
+
+    async def first_connection(exchange, ws):
+        # Wait for the initial history fetch before going live
+        while None not in exchange.fetches:
+            await asyncio.sleep(0.01)
+        for index in range(50, 60):
+            await exchange.send_bar(ws, index)
+        await ws.send(json.dumps({'stream': 'btcusdt@ticker', 'data': {'e': '24hrTicker', 'E': 1, 'c': '61234.5'}}))
+        # Bars 60-65 close while the client is disconnected
+        exchange.available = 66
+        await ws.close()
+
+    async def second_connection(exchange, ws):
+        # Let the client catch up on 60-65 before going live
+        while klines[60][0] not in exchange.fetches:
+            await asyncio.sleep(0.01)
+        for index in range(66, 80):
+            if index == 70:
+                # A message lost in transit, which REST still has
+                exchange.available = 71
+                continue
+            await exchange.send_bar(ws, index)
+        await ws.wait_closed()
+
+    exchange = FakeExchange(klines, 50, [first_connection, second_connection])
+    closed_rows = []
+    stream = KlineStream(
+        'BTCUSDT', ['1m'], exchange.fetch, url=f"ws://127.0.0.1:{exchange.port}/stream", history=100,
+        on_bar=lambda interval, row, closed: interval == '1m' and closed and closed_rows.append(dict(row)),
+        resample=['5m']
+    ).start()
+    try:
+        deadline = time.time() + 15
+        while len(closed_rows) < 80 and time.time() < deadline:
+            stream.wait_for_update(1)
+    finally:
+        stream.stop()
+
+    assert stream.reconnects >= 1
+    assert exchange.fetches == [None, klines[60][0], klines[70][0]]
+    assert stream.last_price == 61234.5
+    buffered = stream.klines['1m']
+    assert [row[0] for row in buffered] == [row[0] for row in klines]
+    # 5m bars built from the stream match resampling the whole history at once
+    expected = resample_klines(klines, '5m')
+    assert [row[0] for row in stream.klines['5m']] == [row[0] for row in expected]
+    for streamed, batch in zip(stream.klines['5m'], expected):
+        assert all(abs(float(a) - float(b)) < 1e-6 for a, b in zip(streamed[:11], batch[:11]))
+
+    df = pd.DataFrame(
+        [[float(value) for value in (row[1], row[2], row[3], row[4], row[7])] for row in klines],
+        columns=['open', 'high', 'low', 'close', 'volume']
+    )
+    assert_rows_match(TechnicalIndicators.calculate_all_indicators(df), closed_rows)
+    flow = order_flow(df['volume'].to_numpy(), np.array([float(row[10]) for row in klines]))
+    assert np.allclose(flow['taker_cvd'], [row['taker_cvd'] for row in closed_rows])
+    print("✓ Streamed bars match a batch calculation after reconnect and backfill")
+
+if __name__ == "__main__":
+    test_stream_reconnects_and_backfills()
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+import numpy as np
+from binance_stream import KlineStream
+from footprint import Footprint, load_agg_trades
+
+START = 1_700_000_040_000  # a 1m boundary
+
+def make_trades(n, start=START, seed=7):
+    """aggTrade payloads drifting around 60000, a few per second"""
+    rng = np.random.default_rng(seed)
+    prices = 60000 + np.cumsum(rng.normal(0, 2, n))
+    times = start + np.cumsum(rng.integers(0, 400, n))
+    return [
+        {'a': 1000 + i, 'p': f"{prices[i]:.1f}", 'q': f"{rng.uniform(0.001, 0.5):.3f}", 'f': i, 'l': i,
+         'T': int(times[i]), 'm': bool(rng.random() < 0.5)}
+        for i in range(n)
+    ]
+
+def test_streamed_and_batched_trades_agree():
+    print("\nTesting footprint ingestion...")
+    trades = make_trades(2000)
+    streamed = Footprint('1m', tick_size=5.0)
+    for trade in trades:
+        streamed.add_trade(float(trade['p']), float(trade['q']), trade['T'], trade['m'], trade['a'])
+    batched = Footprint('1m', tick_size=5.0)
+    batched.add_trades(trades[:1200])
+    batched.add_trades(trades[1000:])  # overlapping page: already seen ids are skipped
+
+    assert len(streamed) == len(batched) > 1
+    for a, b in zip(streamed.recent(len(streamed)), batched.recent(len(batched))):
+        assert a.open_time == b.open_time and a.trades == b.trades
+        for x, y in zip(a.levels(), b.levels()):
+            assert np.allclose(x, y)
+    notional = sum(float(t['p']) * float(t['q']) for t in trades)
+    assert np.isclose(sum(bar.volume for bar in batched.recent(len(batched))), notional)
+    print("✓ Stream and batch ingestion build the same footprint")
+
+def test_profile_queries():
+    print("\nTesting POC, value area and delta clusters...")
+    footprint = Footprint('1m', tick_size=10.0)
+    # (price, quantity, buyer is maker)
+    fills = [(100, 1, False), (110, 5, False), (110, 2, True), (120, 1, True), (130, 1, True), (90, 0.5, True)]
+    for i, (price, quantity, buyer_maker) in enumerate(fills):
+        footprint.add_trade(float(price), float(quantity), START + i, buyer_maker, i)
+
+    bar = footprint.recent(1)[0]
+    assert bar.poc() == 110.0
+    assert np.isclose(bar.delta, 100 + 550 - 220 - 120 - 130 - 45)
+    # 1165 notional in total; from 110 (770) the busier neighbour 120 (120) brings it past 70%
+    assert bar.value_area(0.7) == (110.0, 120.0)
+    assert bar.delta_levels(200) == [{'price': 110.0, 'delta': 330.0}]
+
+    footprint.add_trade(110.0, 10.0, START + 60_000, True, 10)
+    assert footprint.delta_clusters(n_bars=2, threshold=200) == [{'price': 110.0, 'delta': -770.0}]
+    summary = footprint.summary(n=2)
+    assert [row['poc'] for row in summary] == [110.0, 110.0]
+    assert summary[1]['value_area_low'] == summary[1]['value_area_high'] == 110.0
+    print("✓ Profile queries match a hand calculation")
+
+def test_recorded_files():
+    print("\nTesting recorded aggTrade files...")
+    trades = make_trades(500)
+    expected = Footprint('1m')
+    expected.add_trades(trades)
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'BTCUSDT-aggTrades.csv')
+        with open(csv_path, 'w') as f:
+            f.write("agg_trade_id,price,quantity,first_trade_id,last_trade_id,transact_time,is_buyer_maker\n")
+            for t in trades:
+                # Microsecond timestamps, as in newer dumps
+                f.write(f"{t['a']},{t['p']},{t['q']},{t['f']},{t['l']},{t['T'] * 1000},{str(t['m']).lower()}\n")
+        jsonl_path = os.path.join(directory, 'trades.jsonl')
+        with open(jsonl_path, 'w') as f:
+            for t in trades:
+                f.write(json.dumps({'stream': 'btcusdt@aggTrade', 'data': {'e': 'aggTrade', **t}}) + "\n")
+
+        assert (load_agg_trades(csv_path)['time'] == [t['T'] for t in trades]).all()
+        for path in (csv_path, jsonl_path):
+            loaded = Footprint.from_file(path)
+            assert [bar.open_time for bar in loaded.recent(10)] == [bar.open_time for bar in expected.recent(10)]
+            assert np.allclose([bar.delta for bar in loaded.recent(10)], [bar.delta for bar in expected.recent(10)])
+    print("✓ CSV dumps and JSON lines load into the same footprint")
+
+def test_stream_feeds_footprint():
+    print("\nTesting aggTrade stream messages...")
+    footprint = Footprint('1m')
+    stream = KlineStream('BTCUSDT', ['1m'], fetch=None, footprint=footprint)
+    assert 'btcusdt@aggTrade' in stream.stream_url
+    trades = make_trades(3000)
+
+    async def feed():
+        for t in trades:
+            await stream._handle({'stream': 'btcusdt@aggTrade', 'data': {'e': 'aggTrade', 'E': t['T'], 's': 'BTCUSDT', **t}})
+
+    started = time.perf_counter()
+    asyncio.run(feed())
+    elapsed = time.perf_counter() - started
+    assert sum(bar.trades for bar in footprint.recent(len(footprint))) == 3000
+    print(f"✓ {len(trades) / elapsed:,.0f} trades/s through the stream handler")
+
+if __name__ == "__main__":
+    test_streamed_and_batched_trades_agree()
+    test_profile_queries()
+    test_recorded_files()
+    test_stream_feeds_footprint()
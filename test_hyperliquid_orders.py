@@ -0,0 +1,69 @@
+import threading
+import time
+from hyperliquid_orders import OrderManager, FILLED, CANCELED, REJECTED, RESTING
+from test_hyperliquid_prices import LocalInfo
+
+USER = "0xabc"
+
+def order_update(oid, status, size="0.01"):
+    return {"order": {"coin": "BTC", "side": "B", "limitPx": "94000", "sz": size, "oid": oid,
+                      "timestamp": 1_700_000_000_000, "origSz": "0.01"}, "status": status, "statusTimestamp": 1_700_000_000_000}
+
+def fill(oid, size, price, tid):
+    return {"coin": "BTC", "px": str(price), "sz": str(size), "side": "B", "time": 1_700_000_000_000, "startPosition": "0",
+            "dir": "Open Long", "closedPnl": "0", "hash": "0x0", "oid": oid, "crossed": True, "fee": "0", "tid": tid, "feeToken": "USDC"}
+
+def test_order_states():
+    print("\nTesting order states from the order feeds...")
+    info = LocalInfo()
+    manager = OrderManager().start(info, USER)
+    assert [s["type"] for s, _ in info.subscriptions] == ["orderUpdates", "userFills"]
+
+    # The snapshot replays old fills and is ignored
+    manager.on_message({"channel": "userFills", "data": {"user": USER, "isSnapshot": True, "fills": [fill(1, 1, 90000, 1)]}})
+    assert manager.order(1) is None
+
+    manager.track(10, "BTC", 0.01)
+    manager.on_message({"channel": "orderUpdates", "data": [order_update(10, "open")]})
+    assert manager.order(10).state == RESTING
+    manager.on_message({"channel": "userFills", "data": {"user": USER, "fills": [fill(10, 0.004, 94000, 2)]}})
+    assert manager.order(10).state == RESTING
+    manager.on_message({"channel": "userFills", "data": {"user": USER, "fills": [fill(10, 0.006, 94010, 3)]}})
+    order = manager.order(10)
+    assert order.state == FILLED and abs(order.avg_price - 94006.0) < 1e-9
+
+    # A late update cannot move a finished order
+    manager.on_message({"channel": "orderUpdates", "data": [order_update(10, "canceled")]})
+    assert manager.order(10).state == FILLED
+
+    # An update may beat the order response
+    manager.on_message({"channel": "orderUpdates", "data": [order_update(11, "iocCancelRejected")]})
+    assert manager.track(11, "BTC", 0.01).state == REJECTED
+    manager.on_message({"channel": "orderUpdates", "data": [order_update(12, "marginCanceled")]})
+    assert manager.order(12).state == CANCELED
+    print("✓ Orders move from resting to filled, cancelled or rejected")
+
+def test_wait_for_fill():
+    print("\nTesting waiting for a fill...")
+    info = LocalInfo()
+    manager = OrderManager().start(info, USER)
+    manager.track(20, "BTC", 0.01)
+
+    def fill_later():
+        time.sleep(0.05)
+        info.publish({"channel": "userFills", "data": {"user": USER, "fills": [fill(20, 0.01, 94000, 4)]}})
+
+    threading.Thread(target=fill_later).start()
+    started = time.perf_counter()
+    order = manager.wait_for_fill(20, timeout=2)
+    waited = time.perf_counter() - started
+    assert order.state == FILLED and waited < 1
+
+    # Already filled in the order response: no wait at all
+    assert manager.wait_for_fill(manager.track(21, "BTC", 0.01, FILLED).oid, timeout=0).state == FILLED
+    assert manager.wait_for_fill(22, timeout=0.05) is None
+    print(f"✓ Returned {waited * 1000:.0f}ms after the fill was sent, instead of a fixed 2s sleep")
+
+if __name__ == "__main__":
+    test_order_states()
+    test_wait_for_fill()
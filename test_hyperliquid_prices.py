@@ -0,0 +1,55 @@
+import time
+from hyperliquid_prices import MidCache
+
+class LocalInfo:
+    """Stands in for the SDK's Info with a WebSocket: messages published here reach the subscribers"""
+
+    def __init__(self):
+        self.subscriptions = []
+
+    def subscribe(self, subscription, callback):
+        self.subscriptions.append((subscription, callback))
+        return len(self.subscriptions)
+
+    def publish(self, message):
+        for subscription, callback in self.subscriptions:
+            if subscription["type"] == message["channel"] and subscription.get("coin", message["data"].get("coin")) == message["data"].get("coin"):
+                callback(message)
+
+def book(coin, bid, ask):
+    return {"channel": "l2Book", "data": {"coin": coin, "time": 1_700_000_000_000, "levels": [
+        [{"px": str(bid), "sz": "1.5", "n": 3}, {"px": str(bid - 1), "sz": "4", "n": 5}],
+        [{"px": str(ask), "sz": "0.5", "n": 1}, {"px": str(ask + 1), "sz": "2", "n": 2}],
+    ]}}
+
+def test_streamed_mids():
+    print("\nTesting the Hyperliquid mid cache...")
+    info = LocalInfo()
+    prices = MidCache(max_age=0.2).start(info, ["BTC"])
+    assert [s for s, _ in info.subscriptions] == [{"type": "allMids"}, {"type": "l2Book", "coin": "BTC"}]
+    assert prices.mid("BTC") is None
+
+    info.publish({"channel": "allMids", "data": {"mids": {"BTC": "94000.5", "ETH": "3100.25"}}})
+    assert prices.mid("BTC") == 94000.5 and prices.mid("ETH") == 3100.25
+
+    # The subscribed book's top is preferred over allMids
+    info.publish(book("BTC", 94010, 94012))
+    top = prices.book("BTC")
+    assert (top.bid, top.bid_size, top.ask, top.ask_size) == (94010.0, 1.5, 94012.0, 0.5)
+    assert prices.mid("BTC") == 94011.0
+
+    started = time.perf_counter()
+    for _ in range(10000):
+        prices.mid("BTC")
+    elapsed = time.perf_counter() - started
+
+    # Stale entries are not served; a REST answer primes the cache again
+    time.sleep(0.25)
+    assert prices.mid("BTC") is None and prices.book("BTC") is None
+    prices.apply_mids({"BTC": "93990.0"})
+    assert prices.mid("BTC") == 93990.0
+    assert prices.mid("BTC", max_age=0) is None
+    print(f"✓ Mid lookups take {elapsed / 10000 * 1e6:.1f}µs each")
+
+if __name__ == "__main__":
+    test_streamed_mids()
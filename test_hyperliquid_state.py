@@ -0,0 +1,59 @@
+import time
+from hyperliquid_state import UserState, LONG, SHORT, NONE
+from test_hyperliquid_prices import LocalInfo
+
+USER = "0xabc"
+
+class FakeExchangeAccount:
+    """Info.user_state over an in-memory account, counting requests"""
+
+    def __init__(self):
+        self.calls = 0
+        self.equity = 10000.0
+        self.btc = 0.0
+
+    def user_state(self):
+        self.calls += 1
+        positions = [{"type": "oneWay", "position": {"coin": "ETH", "szi": "0.0", "entryPx": None}}]
+        if self.btc:
+            positions.append({"type": "oneWay", "position": {"coin": "BTC", "szi": str(self.btc), "entryPx": "94000.0"}})
+        return {
+            "marginSummary": {"accountValue": str(self.equity), "totalNtlPos": "0", "totalRawUsd": str(self.equity), "totalMarginUsed": "0.0"},
+            "assetPositions": positions,
+            "withdrawable": str(self.equity),
+        }
+
+def signal_reads(state):
+    """The state reads of one signal: flip check, sizing and the second position check"""
+    state.position("BTC")
+    state.equity()
+    return state.position("BTC")
+
+def test_snapshot_shared_between_reads():
+    print("\nTesting the cached Hyperliquid user state...")
+    account = FakeExchangeAccount()
+    info = LocalInfo()
+    state = UserState(account.user_state, max_age=0.2).start(info, USER)
+    assert signal_reads(state) == {'side': NONE, 'size': 0.0, 'entry_price': None}
+    assert account.calls == 1
+
+    # The fill snapshot on subscribing is not a new fill
+    info.publish({"channel": "userFills", "data": {"user": USER, "isSnapshot": True, "fills": []}})
+    signal_reads(state)
+    assert account.calls == 1
+
+    # A fill makes the next read fetch again
+    account.btc = -0.05
+    info.publish({"channel": "userFills", "data": {"user": USER, "fills": [{"coin": "BTC", "oid": 1, "sz": "0.05", "px": "94000"}]}})
+    assert signal_reads(state) == {'side': SHORT, 'size': 0.05, 'entry_price': 94000.0}
+    assert account.calls == 2
+
+    # So does age
+    account.btc, account.equity = 0.02, 9900.0
+    time.sleep(0.25)
+    assert signal_reads(state)['side'] == LONG and state.equity() == 9900.0
+    assert account.calls == 3
+    print(f"✓ 4 signals read the state with {account.calls} requests instead of 12")
+
+if __name__ == "__main__":
+    test_snapshot_shared_between_reads()
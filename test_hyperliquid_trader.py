@@ -0,0 +1,175 @@
+import threading
+import hyperliquid_trader as trader
+from hyperliquid_trader import HyperliquidSession, execute_trade, leg_status, trigger_order
+from hyperliquid_orders import OrderManager
+from hyperliquid_prices import MidCache
+from hyperliquid_state import UserState
+from test_hyperliquid_prices import LocalInfo
+
+class FakeExchange:
+    """Records bulk_orders calls and answers with the given leg statuses"""
+
+    def __init__(self, statuses, status="ok"):
+        self.statuses = statuses
+        self.status = status
+        self.calls = []
+
+    def bulk_orders(self, requests, grouping="na"):
+        self.calls.append((requests, grouping))
+        if self.status != "ok":
+            return {"status": "err", "response": "Insufficient margin"}
+        return {"status": "ok", "response": {"type": "order", "data": {"statuses": self.statuses}}}
+
+class FakeSession:
+    """A connected HyperliquidSession without the network"""
+
+    def __init__(self, exchange):
+        self.exchange = exchange
+        self.address = "0xabc"
+
+    def get(self, timeout=None):
+        return self
+
+def run_trade(signal, exchange):
+    session = trader.session
+    trader.session = FakeSession(exchange)
+    try:
+        return execute_trade(signal)
+    finally:
+        trader.session = session
+
+def signal(side, **extra):
+    return {"side": side, "symbol": "BTC", "size": 0.01, "order_type": "limit", "limit_price": 94000.0, **extra}
+
+def test_trigger_orders():
+    print("\nTesting SL/TP trigger orders...")
+    # (entry is_buy, tpsl, trigger, expected order price): 1% past the trigger, away from the position
+    cases = [
+        (True, "sl", 93000, 92070), (True, "tp", 96000, 96960),
+        (False, "sl", 95000, 95950), (False, "tp", 92000, 91080),
+    ]
+    for is_buy, tpsl, trigger, price in cases:
+        order = trigger_order("BTC", is_buy, 0.01, trigger, tpsl)
+        assert order["is_buy"] is (not is_buy) and order["reduce_only"] is True
+        assert order["limit_px"] == price, (is_buy, tpsl, order["limit_px"])
+        assert order["order_type"] == {"trigger": {"triggerPx": trigger, "isMarket": True, "tpsl": tpsl}}
+    print("✓ Triggers close the entry's side with the order price past the trigger")
+
+def test_leg_status():
+    print("\nTesting bulk response statuses...")
+    assert leg_status({"resting": {"oid": 7}}) == {"status": "resting", "oid": 7}
+    assert leg_status({"filled": {"totalSz": "0.01", "avgPx": "94000.0", "oid": 8}}) == {"status": "filled", "oid": 8}
+    assert leg_status({"error": "Order has invalid price."}) == {"status": "error", "error": "Order has invalid price.", "oid": None}
+    assert leg_status("waitingForFill") == {"status": "waitingForFill", "oid": None}
+    print("✓ Resting, filled, error and waiting statuses are parsed")
+
+def test_bracket_is_one_request():
+    print("\nTesting a bracket entry...")
+    exchange = FakeExchange([{"resting": {"oid": 1}}, {"resting": {"oid": 2}}, "waitingForFill"])
+    result = run_trade(signal("BUY", stop_loss=93000.0, take_profit=96000.0), exchange)
+
+    assert len(exchange.calls) == 1
+    requests, grouping = exchange.calls[0]
+    assert grouping == "normalTpsl"
+    assert [r["order_type"].get("trigger", {}).get("tpsl") for r in requests] == [None, "sl", "tp"]
+    assert requests[0]["is_buy"] and requests[0]["limit_px"] == 94000 and not requests[0]["reduce_only"]
+    assert requests[0]["order_type"] == {"limit": {"tif": "Gtc"}}
+
+    assert result["main_order"]["status"] == "ok"
+    assert result["main_order"]["response"]["data"]["statuses"] == [{"resting": {"oid": 1}}]
+    assert result["sl_order_id"] == 2 and result["tp_order_id"] is None
+    assert result["legs"]["tp"] == {"status": "waitingForFill", "oid": None}
+    print("✓ Entry, stop loss and take profit go out in one normalTpsl request")
+
+def test_plain_and_rejected_entries():
+    print("\nTesting entries without protection and rejected entries...")
+    exchange = FakeExchange([{"filled": {"totalSz": "0.01", "avgPx": "94000.0", "oid": 3}}])
+    result = run_trade(signal("SELL", reduce_only=True), exchange)
+    requests, grouping = exchange.calls[0]
+    assert grouping == "na" and len(requests) == 1 and requests[0]["reduce_only"]
+    assert result["legs"] == {"entry": {"status": "filled", "oid": 3}}
+    assert result["sl_order_id"] is None and result["tp_order_id"] is None
+
+    rejected = FakeExchange([{"error": "Insufficient margin to place order."}, "waitingForFill"])
+    result = run_trade(signal("BUY", stop_loss=93000.0), rejected)
+    assert "main_order" not in result and result["status"] == "ok"
+
+    failed = run_trade(signal("BUY", stop_loss=93000.0), FakeExchange([], status="err"))
+    assert "main_order" not in failed and failed["status"] == "err"
+    print("✓ A rejected entry returns the raw response as the failure")
+
+def test_waiting_callers_see_the_connection_error():
+    print("\nTesting failed connections seen by concurrent callers...")
+    attempts = []
+
+    def failing_setup(base_url=None):
+        attempts.append(base_url)
+        raise ConnectionError(f"attempt {len(attempts)} refused")
+
+    setup = trader.setup_exchange
+    trader.setup_exchange = failing_setup
+    session = HyperliquidSession(None, None, None)
+    raised = []
+
+    def caller():
+        for _ in range(200):
+            try:
+                session.get(timeout=5)
+            except BaseException as e:
+                raised.append(e)
+
+    try:
+        callers = [threading.Thread(target=caller) for _ in range(8)]
+        for thread in callers:
+            thread.start()
+        for thread in callers:
+            thread.join()
+    finally:
+        trader.setup_exchange = setup
+    assert len(raised) == 1600
+    assert all(isinstance(e, ConnectionError) for e in raised), {type(e).__name__ for e in raised}
+    print(f"✓ {len(raised)} calls over {len(attempts)} attempts all raised the connection error")
+
+class ClosableInfo(LocalInfo):
+    """LocalInfo that records disconnect_websocket"""
+
+    def __init__(self):
+        super().__init__()
+        self.disconnected = False
+
+    def disconnect_websocket(self):
+        self.disconnected = True
+
+def test_close_disconnects_websocket():
+    print("\nTesting closing the session...")
+    infos = []
+
+    def setup(base_url=None):
+        infos.append(ClosableInfo())
+        return "0xabc", infos[-1], FakeExchange([])
+
+    setup_exchange = trader.setup_exchange
+    trader.setup_exchange = setup
+    try:
+        session = HyperliquidSession(MidCache(), OrderManager(), UserState(None))
+        session.connect()
+        session.close()
+        assert len(infos) == 1 and infos[0].disconnected
+        assert session.info is None and session.exchange is None
+
+        # The next use connects again, and closing twice is harmless
+        assert session.get(timeout=5).info is infos[1] and not infos[1].disconnected
+        session.close()
+        session.close()
+        assert infos[1].disconnected and len(infos) == 2
+    finally:
+        trader.setup_exchange = setup_exchange
+    print("✓ close() stops the WebSocket and a later get() reconnects")
+
+if __name__ == "__main__":
+    test_trigger_orders()
+    test_leg_status()
+    test_bracket_is_one_request()
+    test_plain_and_rejected_entries()
+    test_waiting_callers_see_the_connection_error()
+    test_close_disconnects_websocket()
@@ -0,0 +1,100 @@
+import numpy as np
+from indicators import TechnicalIndicators
+from indicator_cache import IndicatorCache
+from test_indicator_engine import make_bars
+from test_indicator_kernels import assert_frames_match
+from kline_decoder import klines_to_frame
+from test_kline_store import make_klines
+
+def test_forming_bar_hits_cache():
+    print("\nTesting cache hits while the forming bar changes...")
+    df = make_bars(201)
+    cache = IndicatorCache()
+    rng = np.random.default_rng(5)
+
+    first = cache.indicators('BTCUSDT', '1m', df)
+    assert_frames_match(TechnicalIndicators.calculate_all_indicators(df.copy()), first)
+    for _ in range(3):
+        # Same closed bars, new version of the last one
+        polled = df.copy()
+        polled.iloc[-1, polled.columns.get_loc('close')] += rng.normal(0, 30)
+        polled.iloc[-1, polled.columns.get_loc('volume')] *= rng.uniform(1.0, 2.0)
+        cached = cache.indicators('BTCUSDT', '1m', polled)
+        assert_frames_match(TechnicalIndicators.calculate_all_indicators(polled.copy()), cached)
+
+    assert cache.stats()['hits'] == 3 and cache.stats()['misses'] == 1
+    print("✓ Cached frames match a full recalculation")
+
+def test_column_subsets_and_new_bars():
+    print("\nTesting cache keys for column subsets and newly closed bars...")
+    df = make_bars(202)
+    columns = TechnicalIndicators.LONG_SETUP_COLUMNS
+    cache = IndicatorCache()
+
+    cache.indicators('BTCUSDT', '1m', df.iloc[:-1], columns)
+    cached = cache.indicators('BTCUSDT', '1m', df.iloc[:-1], columns)
+    assert_frames_match(TechnicalIndicators.calculate_indicators(df.iloc[:-1], columns), cached)
+    assert cache.hits == 1
+
+    # Another indicator set, interval or a new closed bar are all misses
+    cache.indicators('BTCUSDT', '1m', df.iloc[:-1])
+    cache.indicators('BTCUSDT', '5m', df.iloc[:-1], columns)
+    cache.indicators('BTCUSDT', '1m', df.iloc[1:], columns)
+    assert cache.hits == 1 and cache.misses == 4
+    print("✓ Changed keys are recomputed")
+
+def test_lru_eviction():
+    print("\nTesting LRU eviction...")
+    df = make_bars(50)
+    cache = IndicatorCache(max_entries=2)
+    cache.indicators('A', '1m', df)
+    cache.indicators('B', '1m', df)
+    cache.indicators('A', '1m', df)  # A becomes most recently used
+    cache.indicators('C', '1m', df)  # evicts B
+    assert len(cache) == 2
+    cache.indicators('A', '1m', df)
+    cache.indicators('B', '1m', df)
+    assert cache.hits == 2 and cache.misses == 4
+    print("✓ Least recently used entry is evicted first")
+
+def test_hit_keeps_column_dtypes():
+    print("\nTesting column dtypes on a cache hit...")
+    cache = IndicatorCache()
+    df = klines_to_frame(make_klines(1_700_000_000_000, 100))
+    miss = cache.indicators('BTCUSDT', '1m', df, ['rsi'])
+    hit = cache.indicators('BTCUSDT', '1m', df, ['rsi'])
+    assert cache.hits == 1
+    assert dict(hit.dtypes) == dict(miss.dtypes) and hit['trades'].dtype == np.int64
+    assert hit['close_time'].iloc[-1] == df['close_time'].iloc[-1]
+    print("✓ Decoded int64 columns stay int64")
+
+def test_zero_volume_forming_bar():
+    print("\nTesting a zero-volume forming bar on hits and misses...")
+    df = make_bars(60)
+    volume = df.columns.get_loc('volume')
+    polled = df.copy()
+    polled.iloc[-1, volume] = 0.0
+
+    cache = IndicatorCache()
+    cache.indicators('BTCUSDT', '1m', df)
+    hit = cache.indicators('BTCUSDT', '1m', polled)
+    assert cache.hits == 1
+    assert_frames_match(IndicatorCache().indicators('BTCUSDT', '1m', polled), hit)
+    assert_frames_match(TechnicalIndicators.calculate_all_indicators(polled.copy()), hit)
+
+    # A zero-volume closed bar is filled from a mean that includes the forming bar
+    df.iloc[-10, volume] = 0.0
+    polled.iloc[-10, volume] = 0.0
+    cache = IndicatorCache()
+    cache.indicators('BTCUSDT', '1m', df)
+    result = cache.indicators('BTCUSDT', '1m', polled)
+    assert cache.hits == 0 and len(cache) == 0
+    assert_frames_match(TechnicalIndicators.calculate_all_indicators(polled.copy()), result)
+    print("✓ Hits and misses fill zero volumes the same way")
+
+if __name__ == "__main__":
+    test_forming_bar_hits_cache()
+    test_column_subsets_and_new_bars()
+    test_lru_eviction()
+    test_hit_keeps_column_dtypes()
+    test_zero_volume_forming_bar()
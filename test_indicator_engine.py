@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+from indicators import TechnicalIndicators
+from indicator_engine import IndicatorEngine
+
+def make_bars(n=500, seed=7):
+    """Generate a synthetic OHLCV frame"""
+    rng = np.random.default_rng(seed)
+    close = 60000 + np.cumsum(rng.normal(0, 40, n))
+    open_ = np.r_[close[0], close[:-1]] + rng.normal(0, 5, n)
+    high = np.maximum(open_, close) + rng.uniform(0, 30, n)
+    low = np.minimum(open_, close) - rng.uniform(0, 30, n)
+    volume = rng.uniform(1e5, 5e6, n)
+    index = pd.date_range('2024-01-01', periods=n, freq='1min', name='timestamp')
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}, index=index)
+
+def assert_rows_match(batch, rows):
+    """Compare engine rows against the batch indicator frame"""
+    for column in IndicatorEngine.COLUMNS:
+        expected = batch[column].to_numpy()
+        actual = np.array([row[column] for row in rows])
+        if expected.dtype == bool:
+            assert (expected == actual.astype(bool)).all(), column
+        else:
+            assert np.allclose(expected.astype(float), actual.astype(float), rtol=1e-9, atol=1e-9, equal_nan=True), column
+
+def test_streaming_matches_batch():
+    print("\nTesting streaming indicators against batch calculation...")
+    df = make_bars()
+    batch = TechnicalIndicators.calculate_all_indicators(df.copy())
+
+    engine = IndicatorEngine()
+    rows = [engine.update(bar) for bar in df.to_dict('records')]
+
+    assert_rows_match(batch, rows)
+    print("✓ Streaming indicators match batch output")
+
+def test_from_frame_then_update():
+    print("\nTesting warm-up from a frame followed by live updates...")
+    df = make_bars(300)
+    batch = TechnicalIndicators.calculate_all_indicators(df.copy())
+
+    engine = IndicatorEngine.from_frame(df.iloc[:250])
+    rows = [engine.update(bar) for bar in df.iloc[250:].to_dict('records')]
+
+    assert_rows_match(batch.iloc[250:], rows)
+    assert engine.bar_count == 300
+    print("✓ Warm-started engine continues in step with batch output")
+
+def test_provisional_updates_roll_back():
+    print("\nTesting provisional bar updates with rollback...")
+    df = make_bars(120)
+    batch = TechnicalIndicators.calculate_all_indicators(df.copy())
+    rng = np.random.default_rng(3)
+
+    engine = IndicatorEngine()
+    rows = []
+    for bar in df.to_dict('records'):
+        # Feed a few intrabar versions of the bar before it closes
+        for _ in range(3):
+            partial = dict(bar)
+            partial['close'] = bar['close'] + rng.normal(0, 20)
+            partial['volume'] = bar['volume'] * rng.uniform(0.2, 1.0)
+            engine.update_provisional(partial)
+            assert engine.is_provisional
+        rows.append(engine.commit(bar))
+        assert not engine.is_provisional
+
+    assert_rows_match(batch, rows)
+    print("✓ Provisional updates leave no trace once the bar is committed")
+
+def test_intrabar_signal_checks():
+    print("\nTesting intrabar signal checks against the DataFrame versions...")
+    df = make_bars(60)
+    engine = IndicatorEngine.from_frame(df.iloc[:-1])
+    engine.update_provisional(df.iloc[-1].to_dict())
+
+    batch = TechnicalIndicators.calculate_all_indicators(df.copy())
+    has_signal, trade_info = TechnicalIndicators.check_long_setup(batch)
+    engine_signal, engine_info = engine.check_long_setup()
+    assert bool(has_signal) == bool(engine_signal)
+    assert {k: bool(v) for k, v in trade_info['signals'].items()} == {k: bool(v) for k, v in engine_info['signals'].items()}
+
+    signals, levels, metrics = TechnicalIndicators.check_momentum_breakout(batch)
+    engine_signals, engine_levels, _ = engine.check_momentum_breakout()
+    assert {k: bool(v) for k, v in signals.items()} == {k: bool(v) for k, v in engine_signals.items()}
+    assert np.isclose(levels['entry'], engine_levels['entry'])
+
+    # Committing the same bar gives the same state as a plain update
+    engine.commit()
+    assert engine.bar_count == len(df)
+    print("✓ Engine signal checks agree with the DataFrame checks")
+
+if __name__ == "__main__":
+    test_streaming_matches_batch()
+    test_from_frame_then_update()
+    test_provisional_updates_roll_back()
+    test_intrabar_signal_checks()
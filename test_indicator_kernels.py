@@ -0,0 +1,144 @@
+import time
+import numpy as np
+import pandas as pd
+from indicators import TechnicalIndicators
+import indicator_graph
+from test_indicator_engine import make_bars
+
+def calculate_step_by_step(df, row_wise_cvd=False):
+    """The original column-by-column pipeline behind calculate_all_indicators"""
+    df = TechnicalIndicators.calculate_vwap(df)
+    df = TechnicalIndicators.calculate_rsi(df)
+    df = TechnicalIndicators.calculate_volume(df)
+    if row_wise_cvd:
+        # calculate_cvd as it was before vectorization
+        df['volume_delta'] = df.apply(
+            lambda x: x['volume'] if x['close'] > x['open'] else -x['volume'] if x['close'] < x['open'] else 0,
+            axis=1
+        )
+        df['cvd'] = df['volume_delta'].cumsum()
+        df['cvd_ma5'] = df['cvd'].rolling(window=5).mean()
+        df['cvd_ma20'] = df['cvd'].rolling(window=20).mean()
+    else:
+        df = TechnicalIndicators.calculate_cvd(df)
+    return TechnicalIndicators.calculate_momentum_indicators(df)
+
+def assert_frames_match(expected, actual):
+    """Compare every column of the expected frame"""
+    for column in expected.columns:
+        a = expected[column].to_numpy()
+        b = actual[column].to_numpy()
+        if a.dtype == bool:
+            assert (a == b).all(), column
+        else:
+            assert np.allclose(a, b, rtol=1e-9, atol=1e-9, equal_nan=True), column
+
+def test_kernels_match_pandas_pipeline():
+    print("\nTesting NumPy kernels against the pandas pipeline...")
+    df = make_bars(2000)
+    df.iloc[[10, 500], df.columns.get_loc('volume')] = 0.0  # exercise the zero-volume fill
+    df.iloc[[40, 41], df.columns.get_loc('close')] = df['open'].iloc[[40, 41]]  # flat bars
+
+    expected = calculate_step_by_step(df.copy(), row_wise_cvd=True)
+    actual = TechnicalIndicators.calculate_all_indicators(df.copy())
+
+    assert list(actual.columns) == list(expected.columns)
+    assert_frames_match(expected, actual)
+    print("✓ Kernel output matches the pandas pipeline")
+
+def test_short_frames():
+    print("\nTesting kernels on frames shorter than the indicator windows...")
+    for n in (1, 2, 3, 13, 14, 15):
+        df = make_bars(n)
+        assert_frames_match(calculate_step_by_step(df.copy()), TechnicalIndicators.calculate_all_indicators(df.copy()))
+    print("✓ Warm-up rows match for short frames")
+
+def test_kernel_speed():
+    print("\nTiming kernels on a 100k-bar frame...")
+    df = make_bars(100_000)
+    start = time.perf_counter()
+    calculate_step_by_step(df.copy(), row_wise_cvd=True)
+    pandas_time = time.perf_counter() - start
+    start = time.perf_counter()
+    TechnicalIndicators.calculate_all_indicators(df.copy())
+    kernel_time = time.perf_counter() - start
+    print(f"Pandas pipeline: {pandas_time*1000:.1f}ms, kernels: {kernel_time*1000:.1f}ms")
+    assert kernel_time * 10 < pandas_time
+
+def test_vectorized_signal_scans():
+    print("\nTesting vectorized signal scans against bar-by-bar checks...")
+    df = TechnicalIndicators.calculate_all_indicators(make_bars(400, seed=22))
+    long_scan = TechnicalIndicators.scan_long_setup(df)
+    momentum_scan = TechnicalIndicators.scan_momentum_breakout(df)
+
+    for i in range(2, len(df)):
+        has_signal, trade_info = TechnicalIndicators.check_long_setup(df.iloc[:i + 1])
+        assert bool(has_signal) == long_scan['has_signal'].iloc[i], i
+        for name, value in trade_info['signals'].items():
+            assert bool(value) == long_scan[name].iloc[i], (i, name)
+        assert trade_info['levels']['target'] == long_scan['target'].iloc[i]
+
+        result = TechnicalIndicators.check_momentum_breakout(df.iloc[:i + 1])
+        if result is None:
+            assert not momentum_scan['has_signal'].iloc[i]
+            continue
+        signals, levels, _ = result
+        for name, value in signals.items():
+            assert bool(value) == momentum_scan[name].iloc[i], (i, name)
+        assert levels['stop_loss'] == momentum_scan['stop_loss'].iloc[i]
+
+    assert long_scan['has_signal'].any()
+    print(f"✓ Scans agree with per-bar checks ({int(long_scan['has_signal'].sum())} long setups)")
+
+def test_panel_matches_single_symbol():
+    print("\nTesting panel indicators on ragged multi-symbol histories...")
+    frames = {
+        'BTCUSDT': make_bars(300, seed=1),
+        'ETHUSDT': make_bars(300, seed=2).iloc[120:],  # listed later
+        'SOLUSDT': make_bars(300, seed=22).drop(make_bars(300).index[[50, 51, 200]]),  # missing bars
+    }
+    panel = TechnicalIndicators.calculate_panel_indicators(frames)
+    long_scan = TechnicalIndicators.scan_panel_long_setup(panel)
+    momentum_scan = TechnicalIndicators.scan_panel_momentum_breakout(panel)
+
+    for symbol, df in frames.items():
+        expected = TechnicalIndicators.calculate_all_indicators(df.copy())
+        actual = pd.DataFrame({name: panel[name][symbol] for name in panel}).loc[df.index]
+        assert_frames_match(expected, actual)
+        assert panel['close'][symbol].drop(df.index).isna().all()
+
+        expected_long = TechnicalIndicators.scan_long_setup(expected)
+        expected_momentum = TechnicalIndicators.scan_momentum_breakout(expected)
+        assert_frames_match(expected_long, pd.DataFrame({name: long_scan[name][symbol] for name in long_scan}).loc[df.index])
+        assert_frames_match(expected_momentum, pd.DataFrame({name: momentum_scan[name][symbol] for name in momentum_scan}).loc[df.index])
+        assert not long_scan['has_signal'][symbol].drop(df.index).any()
+    print("✓ Panel results match per-symbol calculations")
+
+def test_lazy_indicators():
+    print("\nTesting lazy indicator columns and warm-up sizes...")
+    df = make_bars(300)
+    full = TechnicalIndicators.calculate_all_indicators(df.copy())
+    partial = TechnicalIndicators.calculate_indicators(df.copy(), TechnicalIndicators.MOMENTUM_BREAKOUT_COLUMNS)
+
+    assert 'cvd' not in partial.columns and 'vwap' not in partial.columns
+    assert_frames_match(full[partial.columns], partial)
+
+    # Only the window-based columns are requested, so far fewer bars are needed
+    bars = indicator_graph.bars_needed(TechnicalIndicators.MOMENTUM_BREAKOUT_COLUMNS)
+    assert bars == indicator_graph.warmup('ema_5') + 1 < indicator_graph.DEFAULT_ANCHOR_BARS
+    assert indicator_graph.bars_needed(TechnicalIndicators.LONG_SETUP_COLUMNS) == indicator_graph.DEFAULT_ANCHOR_BARS
+
+    # A column is settled once its warm-up is available
+    for column in ('rsi', 'ema_20', 'volume_trend', 'volume_ma_20'):
+        bars = indicator_graph.warmup(column)
+        tail = TechnicalIndicators.calculate_indicators(df.iloc[-bars:].copy(), [column])
+        assert np.isclose(tail[column].iloc[-1], full[column].iloc[-1], rtol=5e-3), column
+    print(f"✓ Lazy columns match; momentum checks need {indicator_graph.bars_needed(TechnicalIndicators.MOMENTUM_BREAKOUT_COLUMNS)} bars")
+
+if __name__ == "__main__":
+    test_kernels_match_pandas_pipeline()
+    test_short_frames()
+    test_kernel_speed()
+    test_vectorized_signal_scans()
+    test_panel_matches_single_symbol()
+    test_lazy_indicators()
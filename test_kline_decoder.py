@@ -0,0 +1,52 @@
+import tempfile
+import numpy as np
+import pandas as pd
+from kline_decoder import _legacy_frame, decode_klines, klines_frame, klines_to_frame
+from kline_store import FIELDS, KlineStore
+from test_kline_store import make_klines
+
+def test_decoded_types():
+    print("\nTesting kline decoding...")
+    klines = make_klines(1_700_000_000_000, 50)
+    arrays = decode_klines(klines)
+    assert list(arrays) == [name for name, _ in FIELDS]
+    for name, dtype in FIELDS:
+        assert arrays[name].dtype == np.dtype(dtype) and len(arrays[name]) == 50
+    assert arrays['trades'][3] == klines[3][8]
+    assert arrays['buy_quote_volume'][3] == float(klines[3][10])
+
+    empty = klines_to_frame([])
+    assert len(empty) == 0 and isinstance(empty.index, pd.DatetimeIndex)
+    print("✓ Every field is parsed into its typed array")
+
+def test_frame_matches_legacy_conversion():
+    print("\nTesting the decoded frame...")
+    klines = make_klines(1_700_000_000_000, 300)
+    df = klines_to_frame(klines)
+    legacy = _legacy_frame(klines)
+    assert (df.index == legacy.index).all() and df.index.name == 'timestamp'
+    for column in ('open', 'high', 'low', 'close', 'volume', 'quote_volume'):
+        assert np.array_equal(df[column].to_numpy(), legacy[column].to_numpy())
+    assert df['trades'].dtype == np.int64 and df['buy_base_volume'].dtype == np.float64
+    print("✓ Same values and index as the old conversion, with every field typed")
+
+def test_frame_is_zero_copy():
+    print("\nTesting that frames share the decoded arrays...")
+    arrays = decode_klines(make_klines(1_700_000_000_000, 100))
+    df = klines_frame(arrays)
+    assert np.shares_memory(df.index.asi8, arrays['timestamp'])
+    assert np.shares_memory(df['close'].to_numpy(), arrays['close'])
+
+    with tempfile.TemporaryDirectory() as root:
+        store = KlineStore(root)
+        klines = make_klines(1_700_000_000_000, 100)
+        store.append('BTCUSDT', '1m', klines)
+        stored = klines_frame(store.read('BTCUSDT', '1m', limit=20))
+        assert len(stored) == 20 and stored['close'].iloc[-1] == float(klines[-1][4])
+        del stored
+    print("✓ Decoded and stored arrays are wrapped without copying")
+
+if __name__ == "__main__":
+    test_decoded_types()
+    test_frame_matches_legacy_conversion()
+    test_frame_is_zero_copy()
@@ -0,0 +1,66 @@
+import tempfile
+import numpy as np
+from kline_store import KlineStore, interval_ms
+
+def make_klines(start, n, interval='1m'):
+    """Binance REST-shaped kline rows starting at `start` (ms)"""
+    step = interval_ms(interval)
+    rng = np.random.default_rng(start % 1000)
+    klines = []
+    for i in range(n):
+        open_time = start + i * step
+        price = 60000 + rng.normal(0, 50)
+        klines.append([
+            open_time, f"{price:.2f}", f"{price + 20:.2f}", f"{price - 20:.2f}", f"{price + 5:.2f}",
+            f"{rng.uniform(1, 10):.5f}", open_time + step - 1, f"{rng.uniform(1e5, 1e6):.2f}",
+            int(rng.integers(100, 1000)), f"{rng.uniform(0, 1):.5f}", f"{rng.uniform(1e4, 1e5):.2f}", '0'
+        ])
+    return klines
+
+def test_append_and_read():
+    print("\nTesting kline store append and read...")
+    with tempfile.TemporaryDirectory() as root:
+        store = KlineStore(root)
+        assert store.last_close_time('BTCUSDT', '1m') is None
+        assert store.klines('BTCUSDT', '1m', 10) == []
+
+        klines = make_klines(1_700_000_000_000, 50)
+        assert store.append('BTCUSDT', '1m', klines[:30]) == 30
+        # Overlapping bars are skipped
+        assert store.append('BTCUSDT', '1m', klines[20:]) == 20
+        assert store.count('BTCUSDT', '1m') == 50
+        assert store.last_close_time('BTCUSDT', '1m') == klines[-1][6]
+
+        rows = store.klines('BTCUSDT', '1m', 5)
+        assert len(rows) == 5
+        for stored, original in zip(rows, klines[-5:]):
+            assert stored[0] == original[0] and stored[8] == original[8]
+            assert np.isclose(stored[4], float(original[4]))
+
+        arrays = store.read('BTCUSDT', '1m')
+        assert len(arrays['close']) == 50 and arrays['timestamp'][0] == klines[0][0]
+        # Other markets and intervals are stored separately
+        assert store.count('BTCUSDT', '1m', market='futures') == 0
+        assert store.count('BTCUSDT', '5m') == 0
+    print("✓ Stored klines round-trip and overlaps are dropped")
+
+def test_interrupted_append_is_repaired():
+    print("\nTesting recovery from an interrupted append...")
+    with tempfile.TemporaryDirectory() as root:
+        store = KlineStore(root)
+        klines = make_klines(1_700_000_000_000, 20)
+        store.append('BTCUSDT', '1m', klines[:10])
+
+        # Simulate a crash after only some field files were written
+        with open(store._dir('BTCUSDT', '1m', 'spot') / 'timestamp.bin', 'ab') as f:
+            f.write(np.array([klines[10][0]], dtype='<i8').tobytes())
+        assert store.count('BTCUSDT', '1m') == 10
+
+        store.append('BTCUSDT', '1m', klines[10:])
+        arrays = store.read('BTCUSDT', '1m')
+        assert (arrays['timestamp'] == [kline[0] for kline in klines]).all()
+    print("✓ Partial tails are truncated before the next append")
+
+if __name__ == "__main__":
+    test_append_and_read()
+    test_interrupted_append_is_repaired()
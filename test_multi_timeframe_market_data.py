@@ -1,15 +1,21 @@
+import asyncio
 import json
-import time
 from datetime import datetime, timezone, timedelta
 from binance_client import BinanceClient
-from indicators import TechnicalIndicators
-import pandas as pd
+from async_clients import AsyncBinanceClient
+from kline_store import KlineStore
+from kline_decoder import klines_to_frame
+from order_flow import add_order_flow
+from footprint import Footprint
+from bar_resampler import resample_klines
 from config import SYMBOL
 import os
+import sys
 from openai import OpenAI
 from config import OPENAI_API_KEY
 from notification_service import NotificationService
-from hyperliquid_trader import execute_trade, get_open_position, calculate_position_size
+import hyperliquid_trader
+from hyperliquid_trader import execute_trade, wait_for_fill, get_open_position, calculate_position_size
 import tiktoken
 import logging
 
@@ -20,20 +26,42 @@ logging.getLogger("httpx").setLevel(logging.WARNING)
 client = OpenAI(api_key=OPENAI_API_KEY)
 notification_service = NotificationService()
 
-def get_klines_df(client, interval, limit):
-    klines = client.get_futures_klines(interval=interval, limit=limit)
-    columns = [
-        'timestamp', 'open', 'high', 'low', 'close', 'volume',
-        'close_time', 'quote_volume', 'trades', 'buy_base_volume',
-        'buy_quote_volume', 'ignore'
-    ]
-    df = pd.DataFrame(klines, columns=columns)
-    df[['open', 'high', 'low', 'close', 'volume', 'quote_volume']] = df[['open', 'high', 'low', 'close', 'volume', 'quote_volume']].astype(float)
-    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-    df.set_index('timestamp', inplace=True)
+# Indicator columns read when building the market snapshot
+SNAPSHOT_COLUMNS = (
+    'open', 'high', 'low', 'close', 'volume', 'quote_volume', 'vwap', 'ema_20', 'rsi', 'cvd',
+    'volume_ratio_5', 'volume_ratio_20', 'volume_trend'
+)
+
+def klines_to_df(client, interval, klines):
+    df = klines_to_frame(klines)
     # Always use quote_volume for volume analysis
     df['volume'] = df['quote_volume']
-    return TechnicalIndicators.calculate_all_indicators(df)
+    # Futures bars differ from spot ones, so keep them apart in the cache
+    symbol = SYMBOL.replace('/', '') + 'T:futures'
+    df = client.indicator_cache.indicators(symbol, interval, df, SNAPSHOT_COLUMNS)
+    # Measured taker delta and CVD for the footprint and delta clusters
+    return add_order_flow(df)
+
+# The 30m bars are built from 1m klines: 50 of them need 1500 minutes,
+# which is also the most Binance futures returns in one request
+HTF_LIMIT = 50
+LTF_LIMIT = 200
+LTF_HISTORY = 1500
+# Price bucket of the aggTrade footprint (USD), streaming mode only
+FOOTPRINT_TICK_SIZE = 10.0
+
+async def fetch_cycle(async_client):
+    """Fetch one cycle's 1m klines and open interest concurrently, deriving the 30m bars locally"""
+    ltf_klines, oi = await asyncio.gather(
+        async_client.get_futures_klines(interval='1m', limit=LTF_HISTORY),
+        async_client.get_futures_open_interest()
+    )
+    htf_klines = resample_klines(ltf_klines, '30m')[-HTF_LIMIT:]
+    return (
+        klines_to_df(async_client.sync, '30m', htf_klines),
+        klines_to_df(async_client.sync, '1m', ltf_klines[-LTF_LIMIT:]),
+        oi
+    )
 
 def detect_trend(df):
     if 'ema_20' in df.columns:
@@ -68,36 +96,28 @@ def get_volume_metrics(df):
         "trend": float(last['volume_trend']*100) if 'volume_trend' in last else None
     }
 
+def bar_deltas(df):
+    """Per-bar delta: the taker delta when the klines carry it, else the change in CVD"""
+    if 'taker_delta' in df.columns:
+        return df['taker_delta']
+    return df['cvd'].diff().fillna(df['cvd'])
+
 def get_recent_footprint(df, n=3):
-    footprints = []
-    for i in range(-n, 0):
-        if len(df) + i < 1:
-            continue
-        bar = df.iloc[i]
-        prev_cvd = df.iloc[i-1]['cvd'] if (i-1) >= -len(df) else 0
-        delta = bar['cvd'] - prev_cvd
-        volume = bar['quote_volume'] if 'quote_volume' in bar else bar['volume']
-        footprints.append({
-            "time": bar.name.strftime("%H:%M"),
-            "delta": delta,
-            "volume": volume
-        })
-    return footprints
+    recent = df.iloc[max(len(df) - n, 1):]
+    deltas = bar_deltas(df).iloc[len(df) - len(recent):]
+    volumes = recent['quote_volume'] if 'quote_volume' in recent.columns else recent['volume']
+    return [
+        {"time": bar_time.strftime("%H:%M"), "delta": float(delta), "volume": float(volume)}
+        for bar_time, delta, volume in zip(recent.index, deltas, volumes)
+    ]
 
 def get_delta_clusters(df, threshold=500_000):
-    clusters = []
-    for i in range(-5, 0):
-        if len(df) + i < 1:
-            continue
-        bar = df.iloc[i]
-        prev_cvd = df.iloc[i-1]['cvd'] if (i-1) >= -len(df) else 0
-        delta = bar['cvd'] - prev_cvd
-        if abs(delta) > threshold:
-            clusters.append({
-                "price": bar['close'],
-                "delta": delta
-            })
-    return clusters
+    recent = df.iloc[max(len(df) - 5, 1):]
+    deltas = bar_deltas(df).iloc[len(df) - len(recent):]
+    return [
+        {"price": float(price), "delta": float(delta)}
+        for price, delta in zip(recent['close'], deltas) if abs(delta) > threshold
+    ]
 
 def get_oi_change_ma(oi_change_history, window=5):
     if len(oi_change_history) < window:
@@ -167,7 +187,7 @@ def count_tokens(text, model="gpt-4"):
     enc = tiktoken.encoding_for_model(model)
     return len(enc.encode(text))
 
-def flatten_snapshot(htf_df, ltf_df):
+def flatten_snapshot(htf_df, ltf_df, footprint=None):
     # Get last values
     htf_price = round(float(htf_df.iloc[-1]['close']), 2)
     htf_vwap = round(float(htf_df.iloc[-1]['vwap']), 2) if 'vwap' in htf_df.columns else None
@@ -182,15 +202,22 @@ def flatten_snapshot(htf_df, ltf_df):
     ltf_cvd = None
     if 'oi' in ltf_df.columns:
         ltf_oi = round(float(ltf_df.iloc[-1]['oi']), 2)
-    if 'cvd' in ltf_df.columns:
+    if 'taker_cvd' in ltf_df.columns:
+        ltf_cvd = round(float(ltf_df.iloc[-1]['taker_cvd']), 2)
+    elif 'cvd' in ltf_df.columns:
         ltf_cvd = round(float(ltf_df.iloc[-1]['cvd']), 2)
     ltf_volume = round(float(ltf_df.iloc[-1]['volume']), 2)
     
-    # Delta clusters (last 2)
-    delta_clusters = get_delta_clusters(ltf_df, threshold=500_000)
-    delta_clusters = delta_clusters[-2:] if len(delta_clusters) > 2 else delta_clusters
-    # Recent footprint (last 2)
-    recent_footprint = get_recent_footprint(ltf_df, n=2)
+    if footprint is not None and len(footprint):
+        # Price-level clusters and per-bar POC/value area from the aggTrade footprint
+        delta_clusters = footprint.delta_clusters(n_bars=5, threshold=500_000)[:2]
+        recent_footprint = footprint.summary(n=2)
+    else:
+        # Delta clusters (last 2)
+        delta_clusters = get_delta_clusters(ltf_df, threshold=500_000)
+        delta_clusters = delta_clusters[-2:] if len(delta_clusters) > 2 else delta_clusters
+        # Recent footprint (last 2)
+        recent_footprint = get_recent_footprint(ltf_df, n=2)
     
     # Flattened dict
     return {
@@ -210,7 +237,7 @@ def flatten_snapshot(htf_df, ltf_df):
             {"price": round(c["price"], 2), "delta": round(c["delta"], 2)} for c in delta_clusters
         ],
         "recent_footprint": [
-            {"time": f["time"], "delta": round(f["delta"], 2), "volume": round(f["volume"], 2)} for f in recent_footprint
+            {key: round(value, 2) if isinstance(value, float) else value for key, value in f.items()} for f in recent_footprint
         ]
     }
 
@@ -324,212 +351,229 @@ def calculate_risk_reward(entry, stop_loss, take_profit, side):
     return reward / risk
 
 if __name__ == "__main__":
-    binance_client = BinanceClient()
+    # Connects in the background while the market data loads
+    hyperliquid_trader.connect()
+    binance_client = BinanceClient(kline_store=KlineStore())
+    footprint = None
+    if "--stream" in sys.argv:
+        footprint = Footprint('1m', tick_size=FOOTPRINT_TICK_SIZE)
+        binance_client.start_stream(['1m'], market='futures', history=LTF_HISTORY, footprint=footprint)
     prev_oi = None
     last_sent_time = None
     last_recommendation = None
     last_confidence = None
     oi_change_history = []
     first_run = True
+    # One event loop for the whole run keeps the async clients' connection pools alive
+    loop = asyncio.new_event_loop()
+    async_client = loop.run_until_complete(AsyncBinanceClient.create(binance_client))
 
-    while True:
-        now = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
-        # --- HTF (30m) ---
-        htf_df = get_klines_df(binance_client, interval='30m', limit=50)
-        # --- LTF (1m) ---
-        ltf_df = get_klines_df(binance_client, interval='1m', limit=200)
-
-        if first_run:
-            print("[INFO] Initial data pull complete. Waiting for next data to enable signal detection.")
-            first_run = False
-            time.sleep(30)
-            continue
-
-        htf_price = float(htf_df.iloc[-1]['close'])
-        htf_vwap = float(htf_df.iloc[-1]['vwap']) if 'vwap' in htf_df.columns else None
-        htf_trend = detect_trend(htf_df)
-        htf_swing_high, htf_swing_low = find_last_swing_high_low(htf_df)
-        htf_key_levels = [
-            {"type": "resistance", "label": "HTF_SwingHigh", "price": float(htf_swing_high)},
-            {"type": "support", "label": "HTF_SwingLow", "price": float(htf_swing_low)}
-        ]
-        htf_rsi = get_rsi(htf_df)
-        htf_volume = get_volume_metrics(htf_df)
-
-        ltf_price = float(ltf_df.iloc[-1]['close'])
-        ltf_vwap = float(ltf_df.iloc[-1]['vwap']) if 'vwap' in ltf_df.columns else None
-        ltf_session_open, ltf_session_high, ltf_session_low = get_session_stats(ltf_df)
-        ltf_oi_now = binance_client.get_futures_open_interest()
-        ltf_oi = float(ltf_oi_now['openInterest']) if ltf_oi_now and 'openInterest' in ltf_oi_now else None
-        ltf_cvd = float(ltf_df.iloc[-1]['cvd']) if 'cvd' in ltf_df.columns else None
-        ltf_rsi = get_rsi(ltf_df)
-        ltf_volume = get_volume_metrics(ltf_df)
-
-        # OI change
-        ltf_oi_change = None
-        if prev_oi is not None and ltf_oi is not None:
-            ltf_oi_change = ltf_oi - prev_oi
-        prev_oi = ltf_oi
-        if ltf_oi_change is not None:
-            oi_change_history.append(ltf_oi_change)
-
-        # Recent footprint
-        recent_footprint = get_recent_footprint(ltf_df, n=3)
-        # Delta clusters
-        delta_clusters = get_delta_clusters(ltf_df, threshold=500_000)
-
-        # Compose the payload
-        payload = flatten_snapshot(htf_df, ltf_df)
-
-        # Check if we should send to GPT
-        should_send, trigger_reason = shouldSendToGPT(payload, last_sent_time, oi_change_history, last_recommendation=last_recommendation, last_confidence=last_confidence)
-
-        if should_send:
-            print(f"\nSignal detected: {trigger_reason}")
-            last_recommendation, last_confidence, gpt_data = send_to_gpt(payload, trigger_reason)
-            last_sent_time = datetime.now(timezone.utc)
-            # --- Hyperliquid trade execution ---
-            if last_recommendation and last_recommendation.startswith("ENTER"):
-                entry_price = float(gpt_data.get('entry')) if gpt_data and gpt_data.get('entry') not in [None, "null", "None", ""] else None
-                stop_loss = float(gpt_data.get('stop_loss')) if gpt_data and gpt_data.get('stop_loss') not in [None, "null", "None", ""] else None
-                take_profit = float(gpt_data.get('take_profit')) if gpt_data and gpt_data.get('take_profit') not in [None, "null", "None", ""] else None
-                side = 'BUY' if "LONG" in last_recommendation else 'SELL'
-                rr = calculate_risk_reward(entry_price, stop_loss, take_profit, side)
-                confidence = last_confidence
-                # New trade entry logic
-                should_trade = (
-                    (confidence >= 0.7 and rr is not None and rr >= 1.0) or
-                    (confidence >= 0.8 and rr is not None and rr >= 0.8) or
-                    (confidence >= 0.9 and rr is not None and rr >= 0.7)
-                )
-                # Check for high-confidence sell signal to close long
-                pos = get_open_position("BTC")
-                if last_recommendation == "ENTER SHORT" and confidence > 0.8 and pos['side'] == 'LONG' and abs(pos['size']) > 0:
-                    print(f"🔻 High-confidence SELL signal: Closing LONG position of size {pos['size']} for BTC.")
-                    close_signal = {
-                        "side": 'SELL',
-                        "symbol": "BTC",
-                        "size": abs(pos['size']),
-                        "order_type": "market",
-                        "limit_price": None,
-                        "stop_loss": None,
-                        "take_profit": None,
-                        "reduce_only": True
-                    }
-                    try:
-                        close_result = execute_trade(close_signal)
-                        print("Position close result:", close_result)
-                        print("✅ LONG position closed on high-confidence SELL signal.")
-                    except Exception as e:
-                        print(f"❌ Error closing LONG position: {e}")
-                # Check for high-confidence buy signal to close short
-                if last_recommendation == "ENTER LONG" and confidence > 0.8 and pos['side'] == 'SHORT' and abs(pos['size']) > 0:
-                    print(f"🔺 High-confidence BUY signal: Closing SHORT position of size {pos['size']} for BTC.")
-                    close_signal = {
-                        "side": 'BUY',
-                        "symbol": "BTC",
-                        "size": abs(pos['size']),
-                        "order_type": "market",
-                        "limit_price": None,
-                        "stop_loss": None,
-                        "take_profit": None,
-                        "reduce_only": True
-                    }
-                    try:
-                        close_result = execute_trade(close_signal)
-                        print("Position close result:", close_result)
-                        print("✅ SHORT position closed on high-confidence BUY signal.")
-                    except Exception as e:
-                        print(f"❌ Error closing SHORT position: {e}")
-                if not should_trade:
-                    print(f"❌ \033[1mSKIPPED\033[0m: Trade does not meet confidence/RR criteria (confidence={confidence:.2f}, RR={rr})")
-                    continue
-                # Calculate dynamic position size (risk 1% of equity)
-                position_size = calculate_position_size(entry_price, stop_loss)
-                if position_size is None or position_size == 0:
-                    print(f"❌ \033[1mSKIPPED\033[0m: Could not calculate position size (missing equity or stop loss).")
-                    continue
-                signal = {
-                    "side": side,
-                    "symbol": "BTC",  # or dynamic if you want
-                    "size": position_size,
-                    "order_type": "market",
-                    "limit_price": None,
-                    "stop_loss": stop_loss,
-                    "take_profit": take_profit
-                }
-                pos = get_open_position(signal["symbol"])
-                new_side = 'LONG' if signal["side"] == 'BUY' else 'SHORT'
-                # --- Position flip logic ---
-                if pos['side'] == new_side and abs(pos['size']) > 0:
-                    print(f"⏸️ \033[1mSKIPPED\033[0m: Already in a {pos['side']} position of size {pos['size']} for {signal['symbol']}.")
-                elif pos['side'] != 'NONE' and pos['side'] != new_side and abs(pos['size']) > 0:
-                    print(f"🔄 \033[1mFLIP\033[0m: Closing {pos['side']} position of size {pos['size']} for {signal['symbol']} before opening {new_side}.")
-                    # 1. Close current position
-                    close_signal = {
-                        "side": 'SELL' if pos['side'] == 'LONG' else 'BUY',
-                        "symbol": signal["symbol"],
-                        "size": abs(pos['size']),
+    try:
+        while True:
+            now = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+            # --- LTF (1m) and open interest fetched together, HTF (30m) resampled from LTF ---
+            htf_df, ltf_df, ltf_oi_now = loop.run_until_complete(fetch_cycle(async_client))
+
+            if first_run:
+                print("[INFO] Initial data pull complete. Waiting for next data to enable signal detection.")
+                first_run = False
+                binance_client.wait_for_update(30, market='futures')
+                continue
+
+            htf_price = float(htf_df.iloc[-1]['close'])
+            htf_vwap = float(htf_df.iloc[-1]['vwap']) if 'vwap' in htf_df.columns else None
+            htf_trend = detect_trend(htf_df)
+            htf_swing_high, htf_swing_low = find_last_swing_high_low(htf_df)
+            htf_key_levels = [
+                {"type": "resistance", "label": "HTF_SwingHigh", "price": float(htf_swing_high)},
+                {"type": "support", "label": "HTF_SwingLow", "price": float(htf_swing_low)}
+            ]
+            htf_rsi = get_rsi(htf_df)
+            htf_volume = get_volume_metrics(htf_df)
+
+            ltf_price = float(ltf_df.iloc[-1]['close'])
+            ltf_vwap = float(ltf_df.iloc[-1]['vwap']) if 'vwap' in ltf_df.columns else None
+            ltf_session_open, ltf_session_high, ltf_session_low = get_session_stats(ltf_df)
+            ltf_oi = float(ltf_oi_now['openInterest']) if ltf_oi_now and 'openInterest' in ltf_oi_now else None
+            ltf_cvd = float(ltf_df.iloc[-1]['cvd']) if 'cvd' in ltf_df.columns else None
+            ltf_rsi = get_rsi(ltf_df)
+            ltf_volume = get_volume_metrics(ltf_df)
+
+            # OI change
+            ltf_oi_change = None
+            if prev_oi is not None and ltf_oi is not None:
+                ltf_oi_change = ltf_oi - prev_oi
+            prev_oi = ltf_oi
+            if ltf_oi_change is not None:
+                oi_change_history.append(ltf_oi_change)
+
+            # Recent footprint
+            recent_footprint = get_recent_footprint(ltf_df, n=3)
+            # Delta clusters
+            delta_clusters = get_delta_clusters(ltf_df, threshold=500_000)
+
+            # Compose the payload
+            payload = flatten_snapshot(htf_df, ltf_df, footprint)
+
+            # Check if we should send to GPT
+            should_send, trigger_reason = shouldSendToGPT(payload, last_sent_time, oi_change_history, last_recommendation=last_recommendation, last_confidence=last_confidence)
+
+            if should_send:
+                print(f"\nSignal detected: {trigger_reason}")
+                last_recommendation, last_confidence, gpt_data = send_to_gpt(payload, trigger_reason)
+                last_sent_time = datetime.now(timezone.utc)
+                # --- Hyperliquid trade execution ---
+                if last_recommendation and last_recommendation.startswith("ENTER"):
+                    entry_price = float(gpt_data.get('entry')) if gpt_data and gpt_data.get('entry') not in [None, "null", "None", ""] else None
+                    stop_loss = float(gpt_data.get('stop_loss')) if gpt_data and gpt_data.get('stop_loss') not in [None, "null", "None", ""] else None
+                    take_profit = float(gpt_data.get('take_profit')) if gpt_data and gpt_data.get('take_profit') not in [None, "null", "None", ""] else None
+                    side = 'BUY' if "LONG" in last_recommendation else 'SELL'
+                    rr = calculate_risk_reward(entry_price, stop_loss, take_profit, side)
+                    confidence = last_confidence
+                    # New trade entry logic
+                    should_trade = (
+                        (confidence >= 0.7 and rr is not None and rr >= 1.0) or
+                        (confidence >= 0.8 and rr is not None and rr >= 0.8) or
+                        (confidence >= 0.9 and rr is not None and rr >= 0.7)
+                    )
+                    # Check for high-confidence sell signal to close long
+                    pos = get_open_position("BTC")
+                    if last_recommendation == "ENTER SHORT" and confidence > 0.8 and pos['side'] == 'LONG' and abs(pos['size']) > 0:
+                        print(f"🔻 High-confidence SELL signal: Closing LONG position of size {pos['size']} for BTC.")
+                        close_signal = {
+                            "side": 'SELL',
+                            "symbol": "BTC",
+                            "size": abs(pos['size']),
+                            "order_type": "market",
+                            "limit_price": None,
+                            "stop_loss": None,
+                            "take_profit": None,
+                            "reduce_only": True
+                        }
+                        try:
+                            close_result = execute_trade(close_signal)
+                            print("Position close result:", close_result)
+                            print("✅ LONG position closed on high-confidence SELL signal.")
+                        except Exception as e:
+                            print(f"❌ Error closing LONG position: {e}")
+                    # Check for high-confidence buy signal to close short
+                    if last_recommendation == "ENTER LONG" and confidence > 0.8 and pos['side'] == 'SHORT' and abs(pos['size']) > 0:
+                        print(f"🔺 High-confidence BUY signal: Closing SHORT position of size {pos['size']} for BTC.")
+                        close_signal = {
+                            "side": 'BUY',
+                            "symbol": "BTC",
+                            "size": abs(pos['size']),
+                            "order_type": "market",
+                            "limit_price": None,
+                            "stop_loss": None,
+                            "take_profit": None,
+                            "reduce_only": True
+                        }
+                        try:
+                            close_result = execute_trade(close_signal)
+                            print("Position close result:", close_result)
+                            print("✅ SHORT position closed on high-confidence BUY signal.")
+                        except Exception as e:
+                            print(f"❌ Error closing SHORT position: {e}")
+                    if not should_trade:
+                        print(f"❌ \033[1mSKIPPED\033[0m: Trade does not meet confidence/RR criteria (confidence={confidence:.2f}, RR={rr})")
+                        continue
+                    # Calculate dynamic position size (risk 1% of equity)
+                    position_size = calculate_position_size(entry_price, stop_loss)
+                    if position_size is None or position_size == 0:
+                        print(f"❌ \033[1mSKIPPED\033[0m: Could not calculate position size (missing equity or stop loss).")
+                        continue
+                    signal = {
+                        "side": side,
+                        "symbol": "BTC",  # or dynamic if you want
+                        "size": position_size,
                         "order_type": "market",
                         "limit_price": None,
-                        "stop_loss": None,
-                        "take_profit": None,
-                        "reduce_only": True
+                        "stop_loss": stop_loss,
+                        "take_profit": take_profit
                     }
-                    try:
-                        close_result = execute_trade(close_signal)
-                        print("Position close result:", close_result)
-                        print("✅ \033[1mPosition closed. Waiting before opening new position...\033[0m")
-                        time.sleep(2)  # Short delay to ensure position is closed
-                    except Exception as e:
-                        print(f"❌ \033[1mError closing position: {e}\033[0m")
-                    # 2. Open new position
-                    print(f"📊 \033[1mRisk/Reward\033[0m: {rr:.3f}")
-                    print(f"🚀 \033[1mPLACING NEW TRADE\033[0m: {signal}")
-                    try:
-                        result = execute_trade(signal)
-                        print("Hyperliquid trade result:", result)
-                        if result and result.get("main_order") and result["main_order"].get("status") == "ok":
-                            print("✅ \033[1mTrade placed successfully on Hyperliquid.\033[0m")
-                            if result.get("sl_order_id"):
-                                print(f"🛑 Stop loss order ID: {result['sl_order_id']}")
-                            if result.get("tp_order_id"):
-                                print(f"🎯 Take profit order ID: {result['tp_order_id']}")
-                            notification_service.send_notification(
-                                title=f"{side} | R/R {rr:.1f} | BTCUSD",
-                                message=f"{side} trade placed at {entry_price} (SL: {stop_loss}, TP: {take_profit}, R/R: {rr:.1f})",
-                                priority=1
-                            )
-                            print(f"[Pushover] Notification sent.")
-                        else:
-                            print("❌ \033[1mTrade failed or was not accepted by Hyperliquid.\033[0m")
-                    except Exception as e:
-                        print(f"❌ \033[1mError placing trade on Hyperliquid: {e}\033[0m")
-                else:
-                    print(f"📊 \033[1mRisk/Reward\033[0m: {rr:.3f}")
-                    print(f"🚀 \033[1mPLACING TRADE\033[0m: {signal}")
-                    try:
-                        result = execute_trade(signal)
-                        print("Hyperliquid trade result:", result)
-                        if result and result.get("main_order") and result["main_order"].get("status") == "ok":
-                            print("✅ \033[1mTrade placed successfully on Hyperliquid.\033[0m")
-                            if result.get("sl_order_id"):
-                                print(f"🛑 Stop loss order ID: {result['sl_order_id']}")
-                            if result.get("tp_order_id"):
-                                print(f"🎯 Take profit order ID: {result['tp_order_id']}")
-                            notification_service.send_notification(
-                                title=f"{side} | R/R {rr:.1f} | BTCUSD",
-                                message=f"{side} trade placed at {entry_price} (SL: {stop_loss}, TP: {take_profit}, R/R: {rr:.1f})",
-                                priority=1
-                            )
-                            print(f"[Pushover] Notification sent.")
-                        else:
-                            print("❌ \033[1mTrade failed or was not accepted by Hyperliquid.\033[0m")
-                    except Exception as e:
-                        print(f"❌ \033[1mError placing trade on Hyperliquid: {e}\033[0m")
-                print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n")
-            # --- End Hyperliquid trade execution ---
-        else:
-            print(f"Pull: No signal detected (last trigger: {trigger_reason})")
-
-        time.sleep(30) 
\ No newline at end of file
+                    pos = get_open_position(signal["symbol"])
+                    new_side = 'LONG' if signal["side"] == 'BUY' else 'SHORT'
+                    # --- Position flip logic ---
+                    if pos['side'] == new_side and abs(pos['size']) > 0:
+                        print(f"⏸️ \033[1mSKIPPED\033[0m: Already in a {pos['side']} position of size {pos['size']} for {signal['symbol']}.")
+                    elif pos['side'] != 'NONE' and pos['side'] != new_side and abs(pos['size']) > 0:
+                        print(f"🔄 \033[1mFLIP\033[0m: Closing {pos['side']} position of size {pos['size']} for {signal['symbol']} before opening {new_side}.")
+                        # 1. Close current position
+                        close_signal = {
+                            "side": 'SELL' if pos['side'] == 'LONG' else 'BUY',
+                            "symbol": signal["symbol"],
+                            "size": abs(pos['size']),
+                            "order_type": "market",
+                            "limit_price": None,
+                            "stop_loss": None,
+                            "take_profit": None,
+                            "reduce_only": True
+                        }
+                        try:
+                            close_result = execute_trade(close_signal)
+                            print("Position close result:", close_result)
+                            # Returns as soon as the close fills
+                            if wait_for_fill(close_result):
+                                print("✅ \033[1mPosition closed.\033[0m")
+                            else:
+                                print("⚠️ \033[1mClose not confirmed as filled.\033[0m")
+                        except Exception as e:
+                            print(f"❌ \033[1mError closing position: {e}\033[0m")
+                        # 2. Open new position
+                        print(f"📊 \033[1mRisk/Reward\033[0m: {rr:.3f}")
+                        print(f"🚀 \033[1mPLACING NEW TRADE\033[0m: {signal}")
+                        try:
+                            result = execute_trade(signal)
+                            print("Hyperliquid trade result:", result)
+                            if result and result.get("main_order") and result["main_order"].get("status") == "ok":
+                                print("✅ \033[1mTrade placed successfully on Hyperliquid.\033[0m")
+                                if result.get("sl_order_id"):
+                                    print(f"🛑 Stop loss order ID: {result['sl_order_id']}")
+                                if result.get("tp_order_id"):
+                                    print(f"🎯 Take profit order ID: {result['tp_order_id']}")
+                                notification_service.send_notification(
+                                    title=f"{side} | R/R {rr:.1f} | BTCUSD",
+                                    message=f"{side} trade placed at {entry_price} (SL: {stop_loss}, TP: {take_profit}, R/R: {rr:.1f})",
+                                    priority=1
+                                )
+                                print(f"[Pushover] Notification sent.")
+                            else:
+                                print("❌ \033[1mTrade failed or was not accepted by Hyperliquid.\033[0m")
+                        except Exception as e:
+                            print(f"❌ \033[1mError placing trade on Hyperliquid: {e}\033[0m")
+                    else:
+                        print(f"📊 \033[1mRisk/Reward\033[0m: {rr:.3f}")
+                        print(f"🚀 \033[1mPLACING TRADE\033[0m: {signal}")
+                        try:
+                            result = execute_trade(signal)
+                            print("Hyperliquid trade result:", result)
+                            if result and result.get("main_order") and result["main_order"].get("status") == "ok":
+                                print("✅ \033[1mTrade placed successfully on Hyperliquid.\033[0m")
+                                if result.get("sl_order_id"):
+                                    print(f"🛑 Stop loss order ID: {result['sl_order_id']}")
+                                if result.get("tp_order_id"):
+                                    print(f"🎯 Take profit order ID: {result['tp_order_id']}")
+                                notification_service.send_notification(
+                                    title=f"{side} | R/R {rr:.1f} | BTCUSD",
+                                    message=f"{side} trade placed at {entry_price} (SL: {stop_loss}, TP: {take_profit}, R/R: {rr:.1f})",
+                                    priority=1
+                                )
+                                print(f"[Pushover] Notification sent.")
+                            else:
+                                print("❌ \033[1mTrade failed or was not accepted by Hyperliquid.\033[0m")
+                        except Exception as e:
+                            print(f"❌ \033[1mError placing trade on Hyperliquid: {e}\033[0m")
+                    print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n")
+                # --- End Hyperliquid trade execution ---
+            else:
+                print(f"Pull: No signal detected (last trigger: {trigger_reason})")
+
+            stats = binance_client.indicator_cache.stats()
+            print(f"[INFO] Indicator cache: {stats['hits']} hits, {stats['misses']} misses")
+            binance_client.wait_for_update(30, market='futures') 
+    except KeyboardInterrupt:
+        print("\nBot stopped by user")
+    finally:
+        # The SDK's WebSocket threads would otherwise keep the process alive
+        hyperliquid_trader.close()
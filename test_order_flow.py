@@ -0,0 +1,36 @@
+import numpy as np
+from kline_decoder import klines_to_frame
+from order_flow import COLUMNS, OrderFlow, add_order_flow, order_flow
+from test_kline_store import make_klines
+
+def test_batch_order_flow():
+    print("\nTesting batch order flow...")
+    quote_volume = np.array([100.0, 200.0, 0.0, 50.0])
+    buy_quote_volume = np.array([70.0, 50.0, 0.0, 25.0])
+    flow = order_flow(quote_volume, buy_quote_volume)
+    assert list(flow) == list(COLUMNS)
+    assert np.array_equal(flow['taker_delta'], [40.0, -100.0, 0.0, 0.0])
+    assert np.array_equal(flow['taker_cvd'], [40.0, -60.0, -60.0, -60.0])
+    assert np.array_equal(flow['taker_sell_volume'], [30.0, 150.0, 0.0, 25.0])
+    assert np.allclose(flow['taker_buy_ratio'], [0.7, 0.25, 0.5, 0.5])
+    assert np.allclose(flow['taker_imbalance'], [0.4, -0.5, 0.0, 0.0])
+    print("✓ Delta, CVD and imbalance follow the taker buy volume")
+
+def test_streaming_matches_batch():
+    print("\nTesting streaming order flow...")
+    klines = make_klines(1_700_000_000_000, 100)
+    df = add_order_flow(klines_to_frame(klines))
+    flow = OrderFlow()
+    for i, row in enumerate(klines):
+        quote_volume, buy_quote_volume = float(row[7]), float(row[10])
+        # The forming bar is updated a few times before it closes
+        for fraction in (0.3, 0.6):
+            flow.update(quote_volume * fraction, buy_quote_volume * fraction, closed=False)
+        values = flow.update(quote_volume, buy_quote_volume, closed=True)
+        for name in COLUMNS:
+            assert np.isclose(values[name], df[name].iloc[i]), name
+    print("✓ Provisional updates don't leak into the streamed CVD")
+
+if __name__ == "__main__":
+    test_batch_order_flow()
+    test_streaming_matches_batch()
@@ -0,0 +1,94 @@
+import asyncio
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from quote_cache import QuoteCache
+
+class LocalQuoteStream:
+    """Stands in for alpaca-py's CryptoDataStream: quotes published here reach the subscribed handler"""
+
+    def __init__(self):
+        self.handler = None
+        self.symbols = ()
+        self.quotes = queue.Queue()
+        self.delivered = threading.Event()
+
+    def subscribe_quotes(self, handler, *symbols):
+        self.handler = handler
+        self.symbols = symbols
+
+    def publish(self, quote, timeout=2):
+        self.delivered.clear()
+        self.quotes.put(quote)
+        assert self.delivered.wait(timeout)
+
+    def run(self):
+        async def consume():
+            while True:
+                quote = await asyncio.to_thread(self.quotes.get)
+                if quote is None:
+                    return
+                await self.handler(quote)
+                self.delivered.set()
+        asyncio.run(consume())
+
+    def stop(self):
+        self.quotes.put(None)
+
+def quote(bid, ask, symbol='BTC/USD'):
+    return SimpleNamespace(symbol=symbol, bid_price=bid, bid_size=0.5, ask_price=ask, ask_size=0.25,
+                           timestamp=datetime.now(timezone.utc))
+
+class PriceSource:
+    """get_current_price's read path: the cache first, REST (counted) when it has nothing fresh"""
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.requests = 0
+        self.rest_quote = quote(59990.0, 60010.0)
+
+    def get_current_price(self, symbol='BTC/USD'):
+        price = self.cache.mid(symbol)
+        if price is not None:
+            return price
+        self.requests += 1
+        self.cache.apply(self.rest_quote)
+        return (self.rest_quote.bid_price + self.rest_quote.ask_price) / 2
+
+def test_streamed_quotes_serve_prices():
+    print("\nTesting the quote cache with a quote stream...")
+    cache = QuoteCache(max_age=0.3)
+    stream = LocalQuoteStream()
+    source = PriceSource(cache)
+    assert source.get_current_price() == 60000.0 and source.requests == 1
+    assert cache.quote('BTC/USD') is None  # nothing is cached without a stream
+
+    cache.start(stream, ['BTC/USD'])
+    try:
+        assert stream.symbols == ('BTC/USD',)
+        stream.publish(quote(60100.0, 60102.0))
+        stream.publish({'S': 'ETH/USD', 'bp': 3000.0, 'bs': 2.0, 'ap': 3001.0, 'as': 1.0, 't': '2024-01-01T00:00:00Z'})
+        started = time.perf_counter()
+        for _ in range(10000):
+            price = source.get_current_price()
+        elapsed = time.perf_counter() - started
+        assert price == 60101.0 and source.requests == 1
+        book = cache.quote('ETH/USD')
+        assert (book.bid, book.ask, book.ask_size) == (3000.0, 3001.0, 1.0)
+
+        # A quiet stream goes stale: REST again, and its answer primes the cache
+        time.sleep(0.35)
+        assert cache.quote('BTC/USD') is None
+        assert source.get_current_price() == 60000.0 and source.requests == 2
+        assert source.get_current_price() == 60000.0 and source.requests == 2
+        assert cache.mid('BTC/USD', max_age=0) is None
+    finally:
+        cache.stop()
+        cache._thread.join(2)
+    assert not cache.streaming and cache.quote('BTC/USD') is None
+    print(f"✓ 10,000 price lookups took 1 REST request, {elapsed / 10000 * 1e6:.1f}µs each")
+
+if __name__ == "__main__":
+    test_streamed_quotes_serve_prices()
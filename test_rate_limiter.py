@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+from rate_limiter import HISTORY, ORDER, LimitedClient, RateLimiter
+
+class FakeResponse:
+    def __init__(self, used):
+        self.headers = {'X-MBX-USED-WEIGHT-1M': str(used)}
+
+class RateLimitError(Exception):
+    """Looks like python-binance's BinanceAPIException for a 429"""
+
+    def __init__(self, retry_after):
+        super().__init__("Too many requests")
+        self.status_code = 429
+        self.response = type('Response', (), {'headers': {'Retry-After': str(retry_after)}})()
+
+class FakeClient:
+    """Stands in for python-binance's Client, reporting a used weight like Binance does"""
+
+    def __init__(self, used=0):
+        self.used = used
+        self.response = None
+        self.calls = []
+
+    def futures_klines(self, symbol, interval, limit=500):
+        self.calls.append(('futures_klines', limit))
+        self.response = FakeResponse(self.used)
+        return []
+
+    def futures_create_order(self, **params):
+        self.calls.append(('futures_create_order', params))
+        return {'orderId': 1}
+
+    def futures_symbol_ticker(self, symbol):
+        raise RateLimitError(retry_after=0.2)
+
+    async def futures_open_interest(self, symbol):
+        self.calls.append(('futures_open_interest', symbol))
+        self.response = FakeResponse(self.used)
+        return {'openInterest': '1'}
+
+def test_weight_window():
+    print("\nTesting the request weight window...")
+    limiter = RateLimiter(10, window=0.2)
+    started = time.monotonic()
+    for _ in range(4):
+        limiter.acquire(5, ORDER)
+    # Two calls fit in the first window, the other two wait for the next one
+    assert time.monotonic() - started >= 0.2
+    print("✓ Calls beyond the weight limit wait for the window to roll over")
+
+def test_orders_go_first():
+    print("\nTesting request priorities...")
+    limiter = RateLimiter(10, window=0.3)
+    limiter.acquire(10, ORDER)
+    served = []
+
+    def request(name, priority):
+        limiter.acquire(1, priority)
+        served.append(name)
+
+    threads = [threading.Thread(target=request, args=(f"history-{i}", HISTORY)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    threads.append(threading.Thread(target=request, args=("order", ORDER)))
+    threads[-1].start()
+    for thread in threads:
+        thread.join(timeout=2)
+    assert served[0] == "order", served
+    assert sorted(served[1:]) == ["history-0", "history-1", "history-2"]
+    print("✓ An order queued after history requests is served first")
+
+def test_history_leaves_reserve():
+    print("\nTesting the reserve kept for orders...")
+    limiter = RateLimiter(10, window=0.3)
+    for _ in range(8):
+        limiter.acquire(1, HISTORY)
+    started = time.monotonic()
+    limiter.acquire(2, ORDER)
+    assert time.monotonic() - started < 0.05
+    limiter.acquire(1, HISTORY)
+    assert time.monotonic() - started >= 0.25
+    print("✓ History stops at 80% of the budget, orders use the rest")
+
+def test_client_follows_exchange_weight():
+    print("\nTesting used-weight headers and back-off...")
+    limiter = RateLimiter(100, window=0.3)
+    fake = FakeClient(used=100)
+    client = LimitedClient(fake, 'futures', limiter=limiter)
+
+    client.futures_klines(symbol='BTCUSDT', interval='1m', limit=1000)
+    assert [weight for _, weight in limiter.spent] == [5]
+    # Binance says the window is used up, though only 5 was spent locally
+    started = time.monotonic()
+    client.futures_create_order(symbol='BTCUSDT', side='BUY', type='MARKET', quantity=1)
+    assert time.monotonic() - started > 0.001
+    assert limiter.waiting == []
+
+    try:
+        client.futures_symbol_ticker(symbol='BTCUSDT')
+        assert False, "429 should be raised"
+    except RateLimitError:
+        pass
+    fake.used = 0
+    started = time.monotonic()
+    assert asyncio.run(client.futures_open_interest(symbol='BTCUSDT')) == {'openInterest': '1'}
+    assert time.monotonic() - started >= 0.15
+    print("✓ Exchange weight counts and 429s hold back later requests")
+
+def test_order_priority():
+    print("\nTesting which requests get order priority...")
+    client = LimitedClient(FakeClient(), 'spot', priority=HISTORY, limiter=RateLimiter(100))
+    for name in ('create_order', 'order_market_buy', 'cancel_order', 'futures_cancel_all_open_orders'):
+        assert client._cost(name, {})[1] == ORDER, name
+    for name in ('get_open_orders', 'get_all_orders', 'get_order', 'futures_get_order', 'get_order_book'):
+        assert client._cost(name, {})[1] == HISTORY, name
+    print("✓ Only placing, replacing and cancelling orders jumps the queue")
+
+if __name__ == "__main__":
+    test_weight_window()
+    test_orders_go_first()
+    test_history_leaves_reserve()
+    test_client_follows_exchange_weight()
+    test_order_priority()
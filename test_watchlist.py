@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+from watchlist import Watchlist, split_by_symbol, alpaca_bars_frame
+
+START = pd.Timestamp('2024-01-01', tz='UTC')
+
+def bar_set_frame(symbols, n, start=START):
+    """A frame shaped like alpaca-py's BarSet.df: (symbol, timestamp) index, symbols in order"""
+    rng = np.random.default_rng(3)
+    rows = []
+    for symbol in symbols:
+        close = 100 + np.cumsum(rng.normal(0, 1, n))
+        for i in range(n):
+            rows.append({
+                'symbol': symbol, 'timestamp': start + pd.Timedelta(minutes=i),
+                'open': close[i] - 0.5, 'high': close[i] + 1, 'low': close[i] - 1, 'close': close[i],
+                'volume': rng.uniform(1, 10), 'trade_count': float(rng.integers(1, 50)), 'vwap': close[i],
+            })
+    return pd.DataFrame(rows).set_index(['symbol', 'timestamp'])
+
+def test_split_by_symbol():
+    print("\nTesting the per-symbol split of a batched bar frame...")
+    symbols = [f"C{i:02d}/USD" for i in range(50)]
+    df = bar_set_frame(symbols, 60)
+    frames = split_by_symbol(df)
+    assert list(frames) == symbols
+    for symbol in ('C00/USD', 'C31/USD'):
+        frame = frames[symbol]
+        assert frame.index.name == 'timestamp' and len(frame) == 60
+        assert frame.equals(df.xs(symbol, level='symbol'))
+        assert np.shares_memory(frame['close'].to_numpy(), df['close'].to_numpy())
+    assert split_by_symbol(df.iloc[::-1])['C05/USD'].equals(frames['C05/USD'])
+    print("✓ 50 symbols split into row slices of the batch frame")
+
+def test_alpaca_bars_frame():
+    print("\nTesting Alpaca bars in kline format...")
+    frame = split_by_symbol(bar_set_frame(['BTC/USD'], 60))['BTC/USD']
+    bars = alpaca_bars_frame(frame)
+    assert bars.index.name == 'time' and 'trades' in bars
+    assert np.allclose(bars['quote_volume'], frame['volume'] * frame['close'])
+    last = alpaca_bars_frame(frame, limit=3)
+    assert len(last) == 3 and last.index[-1] == START + pd.Timedelta(minutes=59)
+    print("✓ Columns renamed and quote volume added")
+
+def test_watchlist_refresh():
+    print("\nTesting a watchlist refresh...")
+    symbols = [f"C{i:02d}/USD" for i in range(50)]
+    requests = []
+
+    def fetch(symbols, interval, limit):
+        # One batched request per refresh, as get_historical_bars_batch makes
+        requests.append(list(symbols))
+        frames = split_by_symbol(bar_set_frame(symbols, limit))
+        return {symbol: alpaca_bars_frame(frame) for symbol, frame in frames.items()}
+
+    watchlist = Watchlist(fetch, symbols, '1m', limit=100, columns=['rsi'])
+    for _ in range(2):
+        indicators = watchlist.refresh()
+    assert len(requests) == 2 and len(indicators) == 50
+    assert 'rsi' in indicators['C07/USD'] and indicators['C07/USD']['rsi'].notna().iloc[-1]
+    # The second refresh brought no new closed bar: every symbol was a cache hit
+    assert watchlist.indicator_cache.hits == 50
+    print("✓ 50 symbols refreshed with one request per refresh")
+
+if __name__ == "__main__":
+    test_split_by_symbol()
+    test_alpaca_bars_frame()
+    test_watchlist_refresh()
@@ -0,0 +1,61 @@
+import numpy as np
+from indicator_cache import IndicatorCache
+
+# Alpaca bar columns renamed to the names the rest of the bot uses
+ALPACA_COLUMNS = {'timestamp': 'time', 'trade_count': 'trades'}
+
+
+def split_by_symbol(df):
+    """Per-symbol frames of a (symbol, timestamp) indexed bar frame, e.g. BarSet.df.
+
+    Each symbol's bars are one contiguous run of rows, so every frame is a
+    row slice sharing the batch frame's memory rather than a copy.
+    """
+    if df.empty:
+        return {}
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+    symbols = df.index.levels[0]
+    codes = df.index.codes[0]
+    bounds = np.searchsorted(codes, np.arange(len(symbols) + 1))
+    frames = {}
+    for i, symbol in enumerate(symbols):
+        if bounds[i] < bounds[i + 1]:
+            frame = df.iloc[bounds[i]:bounds[i + 1]]
+            frame.index = frame.index.droplevel(0)
+            frames[symbol] = frame
+    return frames
+
+
+def alpaca_bars_frame(df, limit=None):
+    """Alpaca bars of one symbol in our kline format, optionally only the last `limit`"""
+    df = df.rename(columns=ALPACA_COLUMNS).rename_axis('time')
+    # Alpaca volume is base volume; quote volume is what the indicators use
+    df['quote_volume'] = df['volume'] * df['close']
+    return df if limit is None else df.tail(limit)
+
+
+class Watchlist:
+    """Indicator frames for many symbols, refreshed with batched bar requests.
+
+    `fetch(symbols, interval, limit)` returns {symbol: bar frame}, such as
+    AlpacaClient.get_historical_bars_batch. Indicators go through an
+    IndicatorCache, so a refresh that brings no new closed bar only
+    recomputes each symbol's last row.
+    """
+
+    def __init__(self, fetch, symbols, interval, limit=100, columns=None, indicator_cache=None):
+        self.fetch = fetch
+        self.symbols = list(symbols)
+        self.interval = interval
+        self.limit = limit
+        self.columns = columns
+        self.indicator_cache = indicator_cache if indicator_cache is not None else IndicatorCache(max(32, 2 * len(self.symbols)))
+
+    def refresh(self):
+        """{symbol: indicator frame} for the symbols that returned bars"""
+        frames = self.fetch(self.symbols, self.interval, self.limit) or {}
+        return {
+            symbol: self.indicator_cache.indicators(symbol, self.interval, df, self.columns)
+            for symbol, df in frames.items()
+        }